@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the hot helper functions in fcs.py.
+
+Each helper is timed over a fixed, seeded fixture (best of --repeat passes) and
+run once more under tracemalloc. Reports ns/op, the peak bytes allocated while
+one op runs and the bytes it leaves allocated. Fixtures come from the bundled
+Types/ICAO_TYPES.csv and a synthetic bills_operators.csv of --bills-rows rows.
+
+Usage:
+    python bench/helpers.py [--bills-rows 10000] [--ops 20000] [--repeat 5]
+        [--only search_bills,find_helis] [--json result.json]
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+import fcs  # noqa: E402
+from synth_aircraft import SyntheticFleet, write_bills_csv  # noqa: E402
+
+ICAO_TYPES_CSV = os.path.join(BENCH_DIR, "..", "Types", "ICAO_TYPES.csv")
+SOURCES = ("adsb_icao", "adsb_icao_nt", "mlat", "tisb_other", "adsr_icao", "mode_s")
+SOURCES += ("adsc", "other", "unknown", None)
+
+
+def load_type_designators(path: str = ICAO_TYPES_CSV) -> list:
+    """Return the type designators listed in ICAO_TYPES.csv (exported as cp1252)."""
+    with open(path, encoding="cp1252", newline="") as csvfile:
+        return [
+            row["_Type Designator"]
+            for row in csv.DictReader(csvfile)
+            if row["_Type Designator"]
+        ]
+
+
+def build_fixtures(bills_hexes: list, ops: int, seed: int) -> dict:
+    """
+    Build the argument tuples for each benchmark, ops entries each.
+    """
+    rng = random.Random(seed)
+    types = load_type_designators()
+    # Half the lookups hit Bills, half miss
+    hexes = [
+        (
+            rng.choice(bills_hexes)
+            if rng.random() < 0.5
+            else "%06x" % rng.randrange(1 << 24)
+        )
+        for _ in range(ops)
+    ]
+    categories = ("A1", "A2", "A3", "A7", "B1", None)
+    fleet = SyntheticFleet(
+        max(ops // 10, 100), rotorcraft=0.5, bills_hexes=bills_hexes, seed=seed
+    )
+    planes = fleet.snapshot(1792192824.5)["aircraft"]
+    helis = []
+    for plane in planes:
+        classified = fcs.classify_plane(plane)
+        if classified is not None:
+            helis.append((plane, classified))
+    context = fcs.SnapshotContext(1792192824.5)
+
+    return {
+        "clean_source": (
+            fcs.clean_source,
+            [(rng.choice(SOURCES),) for _ in range(ops)],
+        ),
+        "search_bills": (
+            fcs.search_bills,
+            [(icao_hex, "type") for icao_hex in hexes],
+        ),
+        "find_helis": (fcs.find_helis, [(icao_hex,) for icao_hex in hexes]),
+        "add_to_htypes": (
+            fcs.add_to_htypes,
+            [(icao_hex, "src", "spot") for icao_hex in hexes],
+        ),
+        "classify": (
+            fcs._rotorcraft_classifier.classify,
+            [
+                (icao_hex, rng.choice(types), rng.choice(categories))
+                for icao_hex in hexes
+            ],
+        ),
+        "classify_plane": (fcs.classify_plane, [(plane,) for plane in planes]),
+        "build_heli_document": (
+            fcs.build_heli_document,
+            [(plane, context, 15, classified) for plane, classified in helis],
+        ),
+        "load_helis_from_file": (
+            fcs.load_helis_from_file,
+            [()] * max(1, ops // 2000),
+        ),
+    }
+
+
+def time_ops(func, inputs: list, repeat: int) -> float:
+    """Best-of-repeat nanoseconds per call of func over inputs."""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        for args in inputs:
+            func(*args)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(inputs) * 1e9
+
+
+def trace_ops(func, inputs: list) -> tuple:
+    """
+    Return (peak bytes during one op, bytes left allocated per op) under tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        start_current = tracemalloc.get_traced_memory()[0]
+        for args in inputs:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+        retained = tracemalloc.get_traced_memory()[0] - start_current
+    finally:
+        tracemalloc.stop()
+    return peak_total / len(inputs), retained / len(inputs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bills-rows", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="Comma separated benchmark names")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    fcs.logger.setLevel(logging.WARNING)
+    fcs.FEEDER_ID = "bench"
+    fcs.init_prometheus()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fcs.bills_operators = os.path.join(tmp, "bills_operators.csv")
+        bills_hexes = write_bills_csv(fcs.bills_operators, args.bills_rows, args.seed)
+        fcs.heli_types = fcs.load_helis_from_file()[0]
+        fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+
+        fixtures = build_fixtures(bills_hexes, args.ops, args.seed)
+        names = args.only.split(",") if args.only else list(fixtures)
+        unknown = set(names) - set(fixtures)
+        if unknown:
+            parser.error("unknown benchmark(s): %s" % ", ".join(sorted(unknown)))
+
+        print(
+            "bills rows %d, %d ops, best of %d"
+            % (args.bills_rows, args.ops, args.repeat)
+        )
+        print("%-22s %12s %14s %14s" % ("", "ns/op", "peak B/op", "retained B/op"))
+        results = {}
+        for name in names:
+            func, inputs = fixtures[name]
+            fcs.recent_flights.clear()
+            ns = time_ops(func, inputs, args.repeat)
+            fcs.recent_flights.clear()
+            peak, retained = trace_ops(func, inputs)
+            results[name] = {
+                "ops": len(inputs),
+                "ns_per_op": round(ns, 1),
+                "peak_bytes_per_op": round(peak, 1),
+                "retained_bytes_per_op": round(retained, 1),
+            }
+            print("%-22s %12.0f %14.0f %14.0f" % (name, ns, peak, retained))
+
+    if args.json:
+        with open(args.json, "w", encoding="UTF-8") as output_file:
+            json.dump(
+                {
+                    "version": fcs.VERSION,
+                    "bills_rows": args.bills_rows,
+                    "seed": args.seed,
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
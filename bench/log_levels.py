@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Per-plane cost of build_heli_document with logging at WARNING vs INFO (and DEBUG).
+
+Runs a synthetic snapshot through the document builder with log output going to
+/dev/null (same format as fcs), so the numbers are the cost of building and
+formatting log records, not of writing them to a terminal.
+
+Usage:
+    python bench/log_levels.py [--planes 2000] [--rotorcraft 0.1] [--repeat 20]
+
+Prints ns per plane at each level and what INFO adds over WARNING, both per
+plane and per "Heli Reported" line.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fcs  # noqa: E402
+
+LEVELS = ("WARNING", "INFO", "DEBUG")
+
+
+def make_planes(count: int, rotorcraft_fraction: float, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    types = sorted(fcs.ROTORCRAFT_TYPES)
+    planes = []
+    for _ in range(count):
+        is_heli = rng.random() < rotorcraft_fraction
+        planes.append(
+            {
+                "hex": "%06x" % rng.randrange(1 << 24),
+                "t": rng.choice(types) if is_heli else "B738",
+                "r": "N%dX" % rng.randrange(1000),
+                "flight": "HELI%02d  " % rng.randrange(100) if is_heli else "AAL12 ",
+                "category": "A7" if is_heli else "A3",
+                "alt_baro": rng.randrange(0, 3000),
+                "alt_geom": rng.randrange(0, 3000),
+                "gs": rng.random() * 150,
+                "track": rng.random() * 360,
+                "lat": 38.5 + rng.random(),
+                "lon": -77.5 + rng.random(),
+                "squawk": "1200",
+                "rssi": -20.5,
+                "type": "adsb_icao",
+                "seen_pos": rng.random() * 5,
+            }
+        )
+    return planes
+
+
+def run(planes: list, level: str, repeat: int) -> float:
+    """Return nanoseconds per plane for one log level (best of repeat passes)."""
+    logging.getLogger().setLevel(level)
+    fcs.logger.setLevel(level)
+    context = fcs.SnapshotContext(1792192824.5)
+    best = None
+    for _ in range(repeat):
+        fcs.recent_flights.clear()
+        start = perf_counter()
+        for plane in planes:
+            fcs.build_heli_document(plane, context, 15)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(planes) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--planes", type=int, default=2000)
+    parser.add_argument("--rotorcraft", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    sink = logging.StreamHandler(open(os.devnull, "w"))
+    sink.setFormatter(
+        logging.Formatter("%(asctime)s - %(module)s - %(levelname)s - %(message)s")
+    )
+    root.addHandler(sink)
+
+    fcs.FEEDER_ID = "bench"
+    fcs.heli_types = {}
+    fcs.init_prometheus()
+
+    planes = make_planes(args.planes, args.rotorcraft)
+    print(
+        "%d planes, %.0f%% rotorcraft, best of %d"
+        % (args.planes, args.rotorcraft * 100, args.repeat)
+    )
+    results = {}
+    for level in LEVELS:
+        ns = results[level] = run(planes, level, args.repeat)
+        print("%-8s %8.0f ns/plane  (x%.2f)" % (level, ns, ns / results["WARNING"]))
+
+    # INFO's cost is the "Heli Reported" line, written once per rotorcraft.
+    reported = sum(1 for plane in planes if plane["category"] == "A7")
+    extra = results["INFO"] - results["WARNING"]
+    print(
+        "INFO vs WARNING: +%.0f ns/plane, %.1f us per Heli Reported line"
+        % (extra, extra * len(planes) / max(reported, 1) / 1000)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Per-plane metric overhead: per-aircraft counter calls vs the per-cycle batch.
+
+Takes the rotorcraft of a synthetic snapshot (1,000 by default) and times the
+metric work a cycle does for them: fcs_rx_msgs, fcs_msg_srcs and
+fcs_rotorcraft_matches. "per-plane" increments each counter for every aircraft
+as fcs used to; "batched" counts through count_rx / count_source /
+count_rotorcraft_match and writes once with flush_cycle_metrics(). When the
+OpenTelemetry SDK is installed the OTel mirrors are timed too (in-memory reader).
+
+Usage:
+    python bench/metrics_batch.py [--rotorcraft 1000] [--cycles 200]
+"""
+
+import argparse
+import logging
+import os
+import sys
+from time import perf_counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+import fcs  # noqa: E402
+from synth_aircraft import SyntheticFleet  # noqa: E402
+
+
+def enable_otel() -> bool:
+    """Point the fcs OTel mirrors at an in-memory meter, if the SDK is installed."""
+    try:
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    except ImportError:
+        return False
+    meter = MeterProvider(metric_readers=[InMemoryMetricReader()]).get_meter("bench")
+    fcs._otel_fcs_rx = meter.create_counter("fcs_rx_msgs")
+    fcs._otel_fcs_sources = meter.create_counter("fcs_msg_srcs")
+    fcs._otel_fcs_rotorcraft_matches = meter.create_counter("fcs_rotorcraft_matches")
+    return True
+
+
+def make_rows(count: int) -> list:
+    """Return (icao, callsign label, source, match reason) for count rotorcraft."""
+    fleet = SyntheticFleet(
+        count, rotorcraft=1.0, missing_position=0.0, missing_type=0.0
+    )
+    rows = []
+    for plane in fleet.snapshot(1792192824.5)["aircraft"]:
+        reason = fcs._rotorcraft_classifier.classify(
+            plane["hex"], plane.get("t"), plane.get("category", "Unk")
+        )
+        if reason is None:
+            continue
+        callsign = str(plane.get("flight", "")).strip() or "no_call"
+        rows.append((plane["hex"], callsign, fcs.clean_source(plane["type"]), reason))
+    return rows
+
+
+def per_plane_cycle(rows: list, now: float) -> None:
+    """One cycle's metric calls made per aircraft, as before batching."""
+    feeder_id = fcs.FEEDER_ID
+    for icao_hex, callsign, source, reason in rows:
+        fcs.fcs_rotorcraft_matches.labels(reason=reason, feeder_id=feeder_id).inc()
+        if fcs._otel_fcs_rotorcraft_matches is not None:
+            fcs._otel_fcs_rotorcraft_matches.add(
+                1, {"reason": reason, "feeder_id": feeder_id or "unknown"}
+            )
+        icao_label, cs_label = fcs._rx_series.labels_for(icao_hex, callsign, now)
+        fcs.fcs_rx.labels(icao=icao_label, cs=cs_label, feeder_id=feeder_id).inc(1)
+        if fcs._otel_fcs_rx is not None:
+            fcs._otel_fcs_rx.add(
+                1,
+                {
+                    "icao": icao_label,
+                    "cs": cs_label,
+                    "feeder_id": feeder_id or "unknown",
+                },
+            )
+        fcs.fcs_sources.labels(source=source, feeder_id=feeder_id).inc(1)
+        if fcs._otel_fcs_sources is not None:
+            fcs._otel_fcs_sources.add(
+                1, {"source": source, "feeder_id": feeder_id or "unknown"}
+            )
+
+
+def batched_cycle(rows: list, now: float) -> None:
+    """One cycle's metric calls through the per-cycle buffer."""
+    for icao_hex, callsign, source, reason in rows:
+        fcs.count_rotorcraft_match(reason)
+        fcs.count_rx(icao_hex, callsign, now)
+        fcs.count_source(source)
+    fcs.flush_cycle_metrics()
+
+
+def time_cycles(cycle, rows: list, cycles: int) -> float:
+    """Best per-plane nanoseconds over cycles runs of cycle."""
+    best = None
+    for _ in range(cycles):
+        start = perf_counter()
+        cycle(rows, 1792192824.5)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(rows) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rotorcraft", type=int, default=1000)
+    parser.add_argument("--cycles", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    fcs.FEEDER_ID = "bench"
+    fcs.init_prometheus()
+    otel = enable_otel()
+
+    rows = make_rows(args.rotorcraft)
+    # Create every series first so neither side pays for first-time label creation
+    batched_cycle(rows, 1792192824.5)
+
+    print(
+        "%d rotorcraft per cycle, best of %d cycles, OTel %s"
+        % (len(rows), args.cycles, "on" if otel else "off (SDK not installed)")
+    )
+    before = time_cycles(per_plane_cycle, rows, args.cycles)
+    after = time_cycles(batched_cycle, rows, args.cycles)
+    print("%-10s %8.0f ns/plane" % ("per-plane", before))
+    print("%-10s %8.0f ns/plane  (x%.2f)" % ("batched", after, after / before))
+
+
+if __name__ == "__main__":
+    main()
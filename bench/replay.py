@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Replay recorded aircraft.json snapshots through fcs_update_helidb and report throughput.
+
+Each snapshot in the corpus directory (aircraft.json files, plain or gzip) is
+served in turn from a local HTTP endpoint shaped like the receiver's
+/data/aircraft.json, so every cycle runs the full fetch, decode, classify, build
+and sink path. Documents go to a stand-in sink instead of Atlas: kept in memory,
+appended to a JSON lines file, or inserted into a local mongod.
+
+The result (aircraft/s, rotorcraft docs/s, p50/p99 cycle latency, peak RSS) is
+printed as JSON and optionally written to a file, so runs can be compared across
+versions and hosts.
+
+Usage:
+    python bench/replay.py CORPUS_DIR [--repeat 1] [--interval 15]
+        [--ingest json|stream] [--bills bills_operators.csv]
+        [--sink memory|file|mongo] [--sink-file docs.jsonl]
+        [--mongo-uri mongodb://localhost:27017] [--mongo-db fcs_bench]
+        [--output result.json]
+"""
+
+import argparse
+import gzip
+import http.server
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import threading
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fcs  # noqa: E402
+
+SNAPSHOT_SUFFIXES = (".json", ".json.gz")
+
+
+def load_corpus(directory: str) -> list:
+    """
+    Return (name, body, gzipped) for each snapshot in directory, in name order.
+
+    Bodies are kept as recorded; gzip files are served with Content-Encoding: gzip
+    like readsb's compressed output, so decompression is part of the fetch.
+    """
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(SNAPSHOT_SUFFIXES):
+            continue
+        with open(os.path.join(directory, name), "rb") as snapshot_file:
+            body = snapshot_file.read()
+        gzipped = body[:2] == b"\x1f\x8b"
+        if gzipped:
+            # Fail early on a truncated recording rather than mid-run
+            gzip.decompress(body)
+        corpus.append((name, body, gzipped))
+    return corpus
+
+
+class SnapshotServer:
+    """
+    Local HTTP server answering /data/aircraft.json with the current snapshot.
+    """
+
+    def __init__(self):
+        self.current = (b"{}", False)
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body, gzipped = server.current
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:%d/data/aircraft.json" % self.httpd.server_port
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class MemorySink:
+    """Keeps the (mydict, dbFlags) pairs handed to mongo_insert_many."""
+
+    def __init__(self):
+        self.docs = []
+
+    def insert_many(self, docs, spool_on_failure: bool = True):
+        self.docs.extend(docs)
+        return [True] * len(docs)
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink:
+    """Appends each document to a JSON lines file with its target collection."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "w", encoding="UTF-8")
+
+    def insert_many(self, docs, spool_on_failure: bool = True):
+        for mydict, dbFlags in docs:
+            record = {"collection": fcs.mongo_collection_name(dbFlags), "doc": mydict}
+            self.file.write(json.dumps(record, default=str) + "\n")
+        return [True] * len(docs)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class MongoSink:
+    """Inserts into a local mongod, one insert_many per collection as fcs does."""
+
+    def __init__(self, uri: str, database: str):
+        from pymongo import MongoClient
+
+        self.client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+        self.db = self.client[database]
+        self.client.admin.command("ping")
+
+    def insert_many(self, docs, spool_on_failure: bool = True):
+        by_collection = {}
+        for mydict, dbFlags in docs:
+            by_collection.setdefault(fcs.mongo_collection_name(dbFlags), []).append(
+                dict(mydict)
+            )
+        for collection, batch in by_collection.items():
+            self.db[collection].insert_many(batch, ordered=False)
+        return [True] * len(docs)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def replay(corpus: list, server: SnapshotServer, interval: int, repeat: int) -> dict:
+    """Run every snapshot through fcs_update_helidb repeat times."""
+    latencies = []
+    aircraft = 0
+    docs = 0
+    start = perf_counter()
+    for _ in range(repeat):
+        # Each pass replays the same positions; start without filter state
+        fcs.reset_position_filters()
+        for _name, body, gzipped in corpus:
+            server.current = (body, gzipped)
+            # Replayed snapshots may repeat "now"; process each one
+            fcs._last_processed_now = None
+            cycle_start = perf_counter()
+            fcs.fcs_update_helidb(interval)
+            latencies.append(perf_counter() - cycle_start)
+            aircraft += fcs._cycle_aircraft_scanned
+            docs += fcs._cycle_rotorcraft_emitted
+    elapsed = perf_counter() - start
+    return {
+        "cycles": len(latencies),
+        "aircraft": aircraft,
+        "docs": docs,
+        "elapsed_secs": round(elapsed, 4),
+        "aircraft_per_sec": round(aircraft / elapsed, 1) if elapsed else 0.0,
+        "docs_per_sec": round(docs / elapsed, 1) if elapsed else 0.0,
+        "cycle_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "cycle_p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("corpus", help="Directory of recorded aircraft.json snapshots")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--interval", type=int, default=15)
+    parser.add_argument("--ingest", choices=("json", "stream"), default="json")
+    parser.add_argument("--bills", help="bills_operators.csv to classify against")
+    parser.add_argument("--sink", choices=("memory", "file", "mongo"), default="memory")
+    parser.add_argument("--sink-file", default="replay_docs.jsonl")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--mongo-db", default="fcs_bench")
+    parser.add_argument("--output", help="Also write the result JSON to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    fcs.logger.setLevel(logging.WARNING)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error("no .json or .json.gz snapshots in %s" % args.corpus)
+
+    if args.sink == "file":
+        sink = FileSink(args.sink_file)
+    elif args.sink == "mongo":
+        sink = MongoSink(args.mongo_uri, args.mongo_db)
+    else:
+        sink = MemorySink()
+
+    fcs.FEEDER_ID = "bench"
+    fcs.INGEST_MODE = args.ingest
+    fcs.heli_types = {}
+    if args.bills:
+        fcs.bills_operators = args.bills
+        fcs.heli_types = fcs.load_helis_from_file()[0]
+    fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+    fcs.mongo_insert_many = sink.insert_many
+    fcs.init_prometheus()
+
+    server = SnapshotServer()
+    server.start()
+    fcs.AIRCRAFT_URL = server.url
+    try:
+        result = replay(corpus, server, args.interval, args.repeat)
+    finally:
+        server.close()
+        sink.close()
+        fcs.close_aircraft_session()
+
+    result = {
+        "version": fcs.VERSION,
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "corpus": os.path.abspath(args.corpus),
+        "snapshots": len(corpus),
+        "ingest": args.ingest,
+        "json_decoder": fcs._json_decoder_name,
+        "sink": args.sink,
+        **result,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as output_file:
+            output_file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic readsb-style aircraft.json snapshots for scale testing.
+
+A fleet of COUNT aircraft (a ROTORCRAFT fraction of them helicopters) moves
+between successive snapshots according to a motion model. Optional fields are
+dropped with the configured sparsity, and part of the rotorcraft can be taken
+from a bills_operators.csv so Bills lookups are exercised as well.
+
+Snapshots can be written to a directory (a corpus for bench/replay.py) or
+served from a local HTTP server at /data/aircraft.json, so fcs can be pointed
+at it unmodified with AIRCRAFT_URL=http://127.0.0.1:PORT/data/aircraft.json.
+
+Usage:
+    python bench/synth_aircraft.py --count 50000 --serve 8080
+    python bench/synth_aircraft.py --count 5000 --snapshots 60 --out corpus/ [--gzip]
+    python bench/synth_aircraft.py --write-bills bills_operators.csv --bills-rows 10000
+"""
+
+import argparse
+import csv
+import gzip
+import http.server
+import json
+import math
+import os
+import random
+import sys
+import threading
+from time import sleep, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from icao_heli_types import icao_heli_types  # noqa: E402
+
+ROTORCRAFT_TYPES = sorted(set(icao_heli_types))
+FIXED_WING_TYPES = ("B738", "A320", "A321", "E75L", "CRJ9", "C172", "PC12", "B38M")
+SOURCES = ("adsb_icao", "adsb_icao", "adsb_icao", "mlat", "tisb_icao", "adsr_icao")
+MOTION_MODELS = ("static", "linear", "random-walk")
+
+# Snapshots are centred on Washington DC, about 220 km across
+CENTER_LAT = 38.9
+CENTER_LON = -77.0
+SPAN_DEG = 2.0
+
+
+def write_bills_csv(path: str, rows: int, seed: int = 1) -> list:
+    """
+    Write a synthetic bills_operators.csv with rows rotorcraft and return its hexes.
+    """
+    rng = random.Random(seed)
+    hexes = random_hexes(rng, rows)
+    with open(path, "w", encoding="UTF-8", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(("hex", "type", "tail", "operator"))
+        for icao_hex in hexes:
+            writer.writerow(
+                (
+                    icao_hex.upper(),
+                    rng.choice(ROTORCRAFT_TYPES),
+                    "N%d%s" % (rng.randrange(1, 99999), rng.choice("ABCDEFGH")),
+                    "Operator %d" % rng.randrange(500),
+                )
+            )
+    return hexes
+
+
+def read_bills_hexes(path: str) -> list:
+    """Return the lowercase hexes listed in a bills_operators.csv."""
+    with open(path, encoding="UTF-8") as csvfile:
+        return [row["hex"].lower() for row in csv.DictReader(csvfile)]
+
+
+def random_hexes(rng: random.Random, count: int, exclude=()) -> list:
+    """Return count distinct ICAO addresses not in exclude."""
+    seen = set(exclude)
+    hexes = []
+    while len(hexes) < count:
+        icao_hex = "%06x" % rng.randrange(1, 1 << 24)
+        if icao_hex not in seen:
+            seen.add(icao_hex)
+            hexes.append(icao_hex)
+    return hexes
+
+
+class SyntheticAircraft:
+    """Motion state of one aircraft plus the fields it reports."""
+
+    __slots__ = (
+        "hex",
+        "type",
+        "reg",
+        "flight",
+        "category",
+        "source",
+        "squawk",
+        "lat",
+        "lon",
+        "alt",
+        "gs",
+        "track",
+    )
+
+
+class SyntheticFleet:
+    """
+    A fixed set of aircraft moved between snapshots by a motion model.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        rotorcraft: float = 0.02,
+        sparsity: float = 0.1,
+        missing_position: float = 0.05,
+        missing_type: float = 0.1,
+        bills_hexes=(),
+        bills_overlap: float = 0.5,
+        motion: str = "linear",
+        seed: int = 1,
+    ):
+        self.rng = random.Random(seed)
+        self.sparsity = sparsity
+        self.missing_position = missing_position
+        self.missing_type = missing_type
+        self.motion = motion
+
+        rng = self.rng
+        helis = int(round(count * rotorcraft))
+        from_bills = min(int(round(helis * bills_overlap)), len(bills_hexes))
+        hexes = rng.sample(list(bills_hexes), from_bills)
+        hexes += random_hexes(rng, count - from_bills, exclude=bills_hexes)
+
+        self.aircraft = []
+        for index, icao_hex in enumerate(hexes):
+            is_heli = index < helis
+            plane = SyntheticAircraft()
+            plane.hex = icao_hex
+            plane.type = rng.choice(ROTORCRAFT_TYPES if is_heli else FIXED_WING_TYPES)
+            plane.reg = "N%d%s" % (rng.randrange(1, 99999), rng.choice("ABCDEFGH"))
+            plane.flight = (
+                "%s%d" % (rng.choice(("N", "LIFE", "PHI", "CFC")), rng.randrange(999))
+                if is_heli
+                else "%s%d"
+                % (rng.choice(("AAL", "UAL", "DAL", "SWA")), rng.randrange(9999))
+            )
+            plane.category = "A7" if is_heli else rng.choice(("A1", "A2", "A3"))
+            plane.source = rng.choice(SOURCES)
+            plane.squawk = "%04o" % rng.randrange(0o10000)
+            plane.lat = CENTER_LAT + (rng.random() - 0.5) * SPAN_DEG
+            plane.lon = CENTER_LON + (rng.random() - 0.5) * SPAN_DEG
+            plane.alt = rng.randrange(0, 3000) if is_heli else rng.randrange(0, 40000)
+            plane.gs = rng.uniform(0, 140) if is_heli else rng.uniform(120, 480)
+            plane.track = rng.uniform(0, 360)
+            self.aircraft.append(plane)
+        rng.shuffle(self.aircraft)
+
+    def step(self, secs: float) -> None:
+        """Advance every aircraft by secs seconds."""
+        if self.motion == "static":
+            return
+        rng = self.rng
+        for plane in self.aircraft:
+            if self.motion == "random-walk":
+                plane.track = (plane.track + rng.gauss(0, 15)) % 360
+                plane.gs = max(0.0, plane.gs + rng.gauss(0, 5))
+                plane.alt = max(0, plane.alt + int(rng.gauss(0, 100)))
+            # knots -> degrees of latitude (1 nm = 1/60 degree)
+            distance = plane.gs * secs / 3600 / 60
+            heading = math.radians(plane.track)
+            plane.lat += distance * math.cos(heading)
+            plane.lon += (
+                distance
+                * math.sin(heading)
+                / max(0.1, math.cos(math.radians(plane.lat)))
+            )
+            # Turn back at the edge of the box so the fleet stays in range
+            north = (plane.lat - CENTER_LAT) * math.cos(heading)
+            if abs(plane.lat - CENTER_LAT) > SPAN_DEG / 2 and north > 0:
+                plane.track = (180 - plane.track) % 360
+            east = (plane.lon - CENTER_LON) * math.sin(heading)
+            if abs(plane.lon - CENTER_LON) > SPAN_DEG / 2 and east > 0:
+                plane.track = (360 - plane.track) % 360
+
+    def snapshot(self, now: float) -> dict:
+        """Return an aircraft.json document for the fleet's current state."""
+        rng = self.rng
+        sparsity = self.sparsity
+        entries = []
+        for plane in self.aircraft:
+            entry = {"hex": plane.hex, "type": plane.source}
+            if rng.random() >= sparsity:
+                entry["flight"] = "%-8s" % plane.flight
+            if rng.random() >= sparsity:
+                entry["r"] = plane.reg
+            if rng.random() >= self.missing_type:
+                entry["t"] = plane.type
+            entry["alt_baro"] = plane.alt if plane.alt > 0 else "ground"
+            if rng.random() >= sparsity:
+                entry["alt_geom"] = plane.alt + 125
+            if rng.random() >= sparsity:
+                entry["gs"] = round(plane.gs, 1)
+            if rng.random() >= sparsity:
+                entry["track"] = round(plane.track, 2)
+            if rng.random() >= sparsity:
+                entry["squawk"] = plane.squawk
+            if rng.random() >= sparsity:
+                entry["category"] = plane.category
+            if rng.random() >= self.missing_position:
+                entry["lat"] = round(plane.lat, 6)
+                entry["lon"] = round(plane.lon, 6)
+                entry["nic"] = 8
+                entry["seen_pos"] = round(rng.random() * 2, 1)
+            entry["messages"] = rng.randrange(10, 50000)
+            entry["seen"] = round(rng.random(), 1)
+            entry["rssi"] = round(rng.uniform(-35, -3), 1)
+            entries.append(entry)
+        return {"now": round(now, 1), "messages": 0, "aircraft": entries}
+
+
+class SyntheticServer:
+    """
+    Serves /data/aircraft.json from a fleet, advancing it every interval seconds.
+
+    Snapshots are built on a background thread so a request never waits for a
+    50k-aircraft snapshot to be encoded; gzip is used when the client asks for it.
+    """
+
+    def __init__(self, fleet: SyntheticFleet, port: int, interval: float):
+        self.fleet = fleet
+        self.interval = interval
+        self.body = self.gzip_body = b""
+        self.lock = threading.Lock()
+        self.refresh(time())
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/data/aircraft.json":
+                    self.send_error(404)
+                    return
+                gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+                with server.lock:
+                    body = server.gzip_body if gzipped else server.body
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("0.0.0.0", port), Handler)
+
+    def refresh(self, now: float) -> None:
+        body = json.dumps(self.fleet.snapshot(now), separators=(",", ":")).encode()
+        gzip_body = gzip.compress(body, compresslevel=1)
+        with self.lock:
+            self.body, self.gzip_body = body, gzip_body
+
+    def _advance(self) -> None:
+        while True:
+            sleep(self.interval)
+            self.fleet.step(self.interval)
+            self.refresh(time())
+
+    def serve_forever(self) -> None:
+        threading.Thread(target=self._advance, daemon=True).start()
+        print(
+            "Serving %d aircraft at http://127.0.0.1:%d/data/aircraft.json"
+            % (len(self.fleet.aircraft), self.httpd.server_port)
+        )
+        self.httpd.serve_forever()
+
+
+def write_snapshots(
+    fleet: SyntheticFleet,
+    directory: str,
+    snapshots: int,
+    interval: float,
+    gzipped: bool,
+) -> None:
+    """Write snapshots successive snapshots, interval seconds apart, to directory."""
+    os.makedirs(directory, exist_ok=True)
+    now = time()
+    for index in range(snapshots):
+        body = json.dumps(fleet.snapshot(now), separators=(",", ":")).encode()
+        name = os.path.join(directory, "aircraft-%05d.json" % index)
+        if gzipped:
+            with open(name + ".gz", "wb") as snapshot_file:
+                snapshot_file.write(gzip.compress(body))
+        else:
+            with open(name, "wb") as snapshot_file:
+                snapshot_file.write(body)
+        fleet.step(interval)
+        now += interval
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--rotorcraft", type=float, default=0.02)
+    parser.add_argument(
+        "--sparsity",
+        type=float,
+        default=0.1,
+        help="Chance each optional field is dropped",
+    )
+    parser.add_argument("--missing-position", type=float, default=0.05)
+    parser.add_argument("--missing-type", type=float, default=0.1)
+    parser.add_argument(
+        "--bills", help="bills_operators.csv to draw rotorcraft hexes from"
+    )
+    parser.add_argument(
+        "--bills-overlap",
+        type=float,
+        default=0.5,
+        help="Fraction of rotorcraft from --bills",
+    )
+    parser.add_argument("--motion", choices=MOTION_MODELS, default="linear")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--serve", type=int, metavar="PORT")
+    parser.add_argument("--out", metavar="DIR")
+    parser.add_argument("--snapshots", type=int, default=10)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--write-bills", metavar="PATH")
+    parser.add_argument("--bills-rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.write_bills:
+        write_bills_csv(args.write_bills, args.bills_rows, args.seed)
+        print("Wrote %d rows to %s" % (args.bills_rows, args.write_bills))
+        if not (args.serve or args.out):
+            return
+        if not args.bills:
+            args.bills = args.write_bills
+
+    if not (args.serve or args.out):
+        parser.error("one of --serve, --out or --write-bills is required")
+
+    fleet = SyntheticFleet(
+        args.count,
+        rotorcraft=args.rotorcraft,
+        sparsity=args.sparsity,
+        missing_position=args.missing_position,
+        missing_type=args.missing_type,
+        bills_hexes=read_bills_hexes(args.bills) if args.bills else (),
+        bills_overlap=args.bills_overlap,
+        motion=args.motion,
+        seed=args.seed,
+    )
+
+    if args.out:
+        write_snapshots(fleet, args.out, args.snapshots, args.interval, args.gzip)
+        print("Wrote %d snapshots to %s" % (args.snapshots, args.out))
+    if args.serve:
+        SyntheticServer(fleet, args.serve, args.interval).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the upload filters: track error vs compression.
+
+Builds every rotorcraft position document from recorded aircraft.json snapshots
+(a replay corpus directory, see bench/replay.py) or from a synthetic fleet, runs
+them through the repeat filter and each upload filter configuration, and rebuilds
+every dropped position from the last one uploaded for that aircraft. Reports the
+compression (positions built per position uploaded) and the rebuild error in
+metres: "reckoned" moves the last upload along its heading at its groundspeed as
+the deadreckon filter predicts, "held" keeps the aircraft at its last upload.
+
+Usage:
+    python bench/track_compression.py [CORPUS_DIR] [--interval 15]
+        [--synth 200] [--snapshots 240] [--step 5] [--motion random-walk]
+        [--tolerances 25,50,100,200,500] [--bills bills_operators.csv]
+        [--json result.json]
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+import fcs  # noqa: E402
+from replay import load_corpus, percentile  # noqa: E402
+from synth_aircraft import MOTION_MODELS, SyntheticFleet  # noqa: E402
+
+
+def corpus_snapshots(directory: str):
+    """Yield the decoded snapshots of a replay corpus, in name order."""
+    for _name, body, gzipped in load_corpus(directory):
+        yield json.loads(gzip.decompress(body) if gzipped else body)
+
+
+def synthetic_snapshots(count: int, snapshots: int, step: float, motion: str):
+    """Yield snapshots of a synthetic rotorcraft fleet, step seconds apart."""
+    fleet = SyntheticFleet(
+        count, rotorcraft=1.0, missing_position=0.0, motion=motion, seed=1
+    )
+    now = 1792192824.5
+    for _ in range(snapshots):
+        yield fleet.snapshot(now)
+        fleet.step(step)
+        now += step
+
+
+def build_batches(snapshots, interval: int) -> list:
+    """Return the position documents of each snapshot, one list per snapshot."""
+    batches = []
+    for snapshot in snapshots:
+        context = fcs.SnapshotContext(snapshot["now"])
+        docs = []
+        for plane in snapshot["aircraft"]:
+            doc = fcs.build_heli_document(plane, context, interval)
+            if doc is not None:
+                docs.append(doc)
+        batches.append(docs)
+    return batches
+
+
+def evaluate(batches: list, upload_filter) -> dict:
+    """
+    Run batches through the repeat filter and upload_filter (None for no upload
+    filter) and measure how far each dropped position is from its rebuild.
+    """
+    repeat_filter = fcs.RepeatFilter()
+    uploaded = {}
+    reckoned = []
+    held = []
+    built = 0
+    for docs in batches:
+        built += len(docs)
+        kept = repeat_filter.filter(docs)
+        if upload_filter is not None:
+            kept = upload_filter.filter(kept)
+        kept_ids = {id(doc) for doc in kept}
+        for doc in docs:
+            position = fcs.LastPosition.from_doc(doc)
+            icao_hex = doc[0]["properties"]["icao"]
+            if id(doc) in kept_ids:
+                uploaded[icao_hex] = position
+                continue
+            last = uploaded[icao_hex]
+            lat, lon = fcs.dead_reckon(last, position.date)
+            reckoned.append(
+                fcs.position_distance_m(lat, lon, position.lat, position.lon)
+            )
+            held.append(
+                fcs.position_distance_m(last.lat, last.lon, position.lat, position.lon)
+            )
+    count = built - len(reckoned)
+    return {
+        "built": built,
+        "uploaded": count,
+        "compression": round(built / count, 2) if count else 1.0,
+        "reckoned_p50_m": round(percentile(reckoned, 50), 1),
+        "reckoned_p95_m": round(percentile(reckoned, 95), 1),
+        "reckoned_max_m": round(max(reckoned, default=0.0), 1),
+        "held_p95_m": round(percentile(held, 95), 1),
+        "held_max_m": round(max(held, default=0.0), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "corpus", nargs="?", help="Directory of recorded aircraft.json snapshots"
+    )
+    parser.add_argument("--interval", type=int, default=15)
+    parser.add_argument(
+        "--synth", type=int, default=200, help="Rotorcraft in the synthetic fleet"
+    )
+    parser.add_argument("--snapshots", type=int, default=240)
+    parser.add_argument("--step", type=float, default=5)
+    parser.add_argument("--motion", choices=MOTION_MODELS, default="random-walk")
+    parser.add_argument("--tolerances", default="25,50,100,200,500")
+    parser.add_argument(
+        "--altitude-ft", type=int, default=fcs.DEFAULT_DEADRECKON_ALTITUDE_FT
+    )
+    parser.add_argument("--turn-deg", type=int, default=fcs.DEFAULT_DEADRECKON_TURN_DEG)
+    parser.add_argument(
+        "--heartbeat-secs", type=int, default=fcs.DEFAULT_DEADRECKON_HEARTBEAT_SECS
+    )
+    parser.add_argument("--bills", help="bills_operators.csv to classify against")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    fcs.logger.setLevel(logging.WARNING)
+    fcs.FEEDER_ID = "bench"
+    fcs.heli_types = {}
+    if args.bills:
+        fcs.bills_operators = args.bills
+        fcs.heli_types = fcs.load_helis_from_file()[0]
+    fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+    fcs.init_prometheus()
+
+    if args.corpus:
+        snapshots = corpus_snapshots(args.corpus)
+        source = os.path.abspath(args.corpus)
+    else:
+        snapshots = synthetic_snapshots(
+            args.synth, args.snapshots, args.step, args.motion
+        )
+        source = "synthetic %d rotorcraft, %d snapshots %gs apart, %s" % (
+            args.synth,
+            args.snapshots,
+            args.step,
+            args.motion,
+        )
+    batches = build_batches(snapshots, args.interval)
+
+    configurations = [
+        ("none", None),
+        (
+            "change",
+            fcs.ChangeFilter(
+                fcs.DEFAULT_CHANGE_MIN_DISTANCE_M,
+                fcs.DEFAULT_CHANGE_MIN_ALTITUDE_FT,
+                fcs.DEFAULT_CHANGE_MIN_HEADING_DEG,
+                fcs.DEFAULT_CHANGE_HEARTBEAT_SECS,
+            ),
+        ),
+    ]
+    for tolerance in args.tolerances.split(","):
+        configurations.append(
+            (
+                "deadreckon %sm" % tolerance,
+                fcs.DeadReckoningFilter(
+                    float(tolerance),
+                    args.altitude_ft,
+                    args.turn_deg,
+                    args.heartbeat_secs,
+                ),
+            )
+        )
+
+    print(source)
+    columns = ("built", "uploaded", "ratio", "dr p50", "dr p95", "dr max")
+    columns += ("held p95", "held max")
+    print("%-18s %9s %9s %6s %9s %9s %9s %9s %9s" % (("",) + columns))
+    results = {}
+    for name, upload_filter in configurations:
+        result = evaluate(batches, upload_filter)
+        results[name] = result
+        print(
+            "%-18s %9d %9d %6.2f %9.1f %9.1f %9.1f %9.1f %9.1f"
+            % (
+                name,
+                result["built"],
+                result["uploaded"],
+                result["compression"],
+                result["reckoned_p50_m"],
+                result["reckoned_p95_m"],
+                result["reckoned_max_m"],
+                result["held_p95_m"],
+                result["held_max_m"],
+            )
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="UTF-8") as output_file:
+            json.dump(
+                {"version": fcs.VERSION, "source": source, "results": results},
+                output_file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
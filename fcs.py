@@ -7,14 +7,24 @@ Upload rotorcraft positions to Helicopters of DC
 # Standard library imports
 import argparse
 import atexit
+import codecs
 import csv
+import ctypes
+import ctypes.util
+import functools
 import json
 import logging
+import math
 import os
+import re
+import select
 import signal
+import socket
+import struct
 import sys
 from datetime import datetime, timezone
-from threading import Lock
+from collections import OrderedDict, deque
+from threading import Condition, Event, Lock, Thread
 from time import ctime, gmtime, perf_counter, sleep, strftime, time
 from zoneinfo import ZoneInfo
 
@@ -22,6 +32,7 @@ from zoneinfo import ZoneInfo
 import daemon
 import requests
 import validators
+from bson import ObjectId, json_util
 from dotenv import dotenv_values
 
 try:
@@ -32,12 +43,48 @@ except ImportError:
     metrics = None  # type: ignore[misc, assignment]
     _otel_available = False
 
-from prometheus_client import Counter, Gauge, Summary, start_http_server
+# Optional fast JSON decoders for aircraft.json - stdlib json is the fallback
+try:
+    import orjson
+
+    _orjson_available = True
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    _orjson_available = False
+
+try:
+    import msgspec
+
+    _msgspec_available = True
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+    _msgspec_available = False
+
+try:
+    import zstandard
+
+    _zstd_available = True
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+    _zstd_available = False
+
+# Optional columnar batch engine (BATCH_ENGINE=numpy) for large feeds
+try:
+    import numpy as np
+
+    _numpy_available = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    _numpy_available = False
+
+from prometheus_client import Counter, Gauge, Histogram, Summary, start_http_server
 from pymongo import MongoClient, monitoring
-from pymongo.errors import ConnectionFailure, OperationFailure
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
 
 from icao_heli_types import icao_heli_types
 
+ROTORCRAFT_TYPES = frozenset(icao_heli_types)
+
 # import __version__
 
 ## YYYYMMDD_HHMM_REV
@@ -147,6 +194,237 @@ class MongoConnectionPoolListener(monitoring.ConnectionPoolListener):
 _mongo_connection_tracker = MongoConnectionTracker()
 _mongo_connection_listener = MongoConnectionPoolListener()
 
+# Background Mongo writer - decouples aircraft.json polling from inserts
+# WRITER_THREADS=0 keeps the old behaviour of inserting inline in the poll loop
+
+WRITER_OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+DEFAULT_WRITER_THREADS = 1
+DEFAULT_WRITER_QUEUE_SIZE = 1000
+DEFAULT_WRITER_BATCH_SIZE = 100
+DEFAULT_WRITER_OVERFLOW_POLICY = "drop_oldest"
+DEFAULT_WRITER_SHUTDOWN_TIMEOUT_SECS = 10
+
+WRITER_THREADS = DEFAULT_WRITER_THREADS
+WRITER_QUEUE_SIZE = DEFAULT_WRITER_QUEUE_SIZE
+WRITER_BATCH_SIZE = DEFAULT_WRITER_BATCH_SIZE
+WRITER_OVERFLOW_POLICY = DEFAULT_WRITER_OVERFLOW_POLICY
+
+_mongo_writer = None  # MongoWriter, started from __main__ when WRITER_THREADS > 0
+
+# Set by handle_sigterm: the main loop finishes its cycle, then shuts down
+_shutdown_requested = False
+# True while the main thread waits in idle(), where SIGTERM may interrupt it
+_shutdown_interruptible = False
+
+# On-disk spool for documents that could not be written while Mongo / the HTTPS
+# endpoint was unreachable. Lives under the conf folder (/app/data in Docker).
+
+DEFAULT_SPOOL_ENABLED = True
+DEFAULT_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SPOOL_MAX_AGE_SECS = 7 * 24 * 3600
+DEFAULT_SPOOL_SEGMENT_BYTES = 1024 * 1024
+DEFAULT_SPOOL_FSYNC_INTERVAL_SECS = 5
+DEFAULT_SPOOL_REPLAY_BATCH_SIZE = 200
+DEFAULT_SPOOL_REPLAY_INTERVAL_SECS = 30
+
+SPOOL_ENABLED = DEFAULT_SPOOL_ENABLED
+SPOOL_MAX_BYTES = DEFAULT_SPOOL_MAX_BYTES
+SPOOL_MAX_AGE_SECS = DEFAULT_SPOOL_MAX_AGE_SECS
+SPOOL_SEGMENT_BYTES = DEFAULT_SPOOL_SEGMENT_BYTES
+SPOOL_FSYNC_INTERVAL_SECS = DEFAULT_SPOOL_FSYNC_INTERVAL_SECS
+SPOOL_REPLAY_BATCH_SIZE = DEFAULT_SPOOL_REPLAY_BATCH_SIZE
+SPOOL_REPLAY_INTERVAL_SECS = DEFAULT_SPOOL_REPLAY_INTERVAL_SECS
+
+SPOOL_JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS.with_options(tz_aware=True)
+
+# Per-document insert result for a document that was neither written nor spooled
+# because the sink is unavailable (connection failure, HTTP 5xx or 429); spool
+# replay stops at the first one and retries it later
+INSERT_RETRY = "retry"
+
+_position_spool = None  # PositionSpool, started from __main__ when SPOOL_ENABLED
+
+# aircraft.json polling - one long-lived keep-alive session to readsb/tar1090
+
+DEFAULT_AIRCRAFT_CONNECT_TIMEOUT_SECS = 5
+DEFAULT_AIRCRAFT_READ_TIMEOUT_SECS = 15
+
+AIRCRAFT_CONNECT_TIMEOUT_SECS = DEFAULT_AIRCRAFT_CONNECT_TIMEOUT_SECS
+AIRCRAFT_READ_TIMEOUT_SECS = DEFAULT_AIRCRAFT_READ_TIMEOUT_SECS
+
+_aircraft_session: requests.Session | None = None
+
+# Ingest mode for aircraft.json: "json" decodes the whole snapshot, "stream" walks it
+# incrementally and only materializes aircraft that could be rotorcraft. "sbs" does
+# not poll at all - positions are pushed over readsb's SBS output (see SbsFeed)
+INGEST_MODES = ("json", "stream", "bincraft", "sbs")
+DEFAULT_INGEST_MODE = "json"
+INGEST_MODE = DEFAULT_INGEST_MODE
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Snapshot file name on the receiver - aircraft.json, or BINCRAFT_FILE in bincraft mode
+AIRCRAFT_FILE = "aircraft.json"
+DEFAULT_BINCRAFT_FILE = "aircraft.binCraft"
+
+# readsb binCraft: a header record followed by one fixed-width record per aircraft,
+# all `stride` bytes long. This is the leading 108 bytes of each aircraft record
+# (the part fcs uses), as laid out by readsb and decoded by tar1090.
+BINCRAFT_HEADER = struct.Struct("<IIII")  # now_ms_lo, now_ms_hi, stride, ac_with_pos
+# The header's binCraftVersion (uint32 at byte 40, after globe index, bounds,
+# message count and receiver position). The record layout below matches these
+# versions as read from tar1090's decoder, not from a live capture, so another
+# version is logged once and decoded anyway; the stride check still applies
+BINCRAFT_VERSION = struct.Struct("<40xI")
+BINCRAFT_VERSIONS = (20220916, 20240218)
+_bincraft_unknown_versions = set()
+BINCRAFT_RECORD_FORMAT = (
+    "<"
+    "i"  # 0: addr (low 24 bits) | non-ICAO flag (bit 24)
+    "HH"  # 4: seen_pos, seen (0.1 s)
+    "ii"  # 8: lon, lat (1e-6 deg)
+    "4x"  # 16: baro_rate, geom_rate
+    "hh"  # 20: alt_baro, alt_geom (25 ft)
+    "8x"  # 24: nav altitudes, qnh, nav heading
+    "H"  # 32: squawk (BCD as hex digits)
+    "h"  # 34: gs (0.1 kt)
+    "4x"  # 36: mach, roll
+    "h"  # 40: track (1/90 deg)
+    "22x"  # 42: track_rate .. messages
+    "B"  # 64: category
+    "2x"  # 65: nic, nav_modes
+    "B"  # 67: emergency (low nibble), address type (high nibble)
+    "B"  # 68: airground (low nibble)
+    "4x"  # 69: versions, nac, sil
+    "BBBBB"  # 73: validity bits
+    "8s"  # 78: flight
+    "H"  # 86: dbFlags
+    "4s"  # 88: t
+    "12s"  # 92: r
+    "B"  # 104: receiverCount
+    "B"  # 105: rssi (scaled)
+    "2x"  # 106: extraFlags, spare
+)
+BINCRAFT_RECORD_BYTES = struct.calcsize(BINCRAFT_RECORD_FORMAT)
+BINCRAFT_ADDR_TYPES = (
+    "adsb_icao",
+    "adsb_icao_nt",
+    "adsr_icao",
+    "tisb_icao",
+    "adsc",
+    "mlat",
+    "other",
+    "mode_s",
+    "adsb_other",
+    "adsr_other",
+    "tisb_trackfile",
+    "tisb_other",
+    "mode_ac",
+)
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# SBS/BaseStation feed (INGEST_MODE=sbs): one TCP connection to readsb's port 30003
+DEFAULT_SBS_PORT = 30003
+DEFAULT_SBS_MIN_SPACING_SECS = 5
+DEFAULT_SBS_STATE_TTL_SECS = 300
+SBS_RECONNECT_MAX_SECS = 60
+SBS_RECV_BYTES = 64 * 1024
+
+SBS_PORT = DEFAULT_SBS_PORT
+SBS_MIN_SPACING_SECS = DEFAULT_SBS_MIN_SPACING_SECS
+SBS_STATE_TTL_SECS = DEFAULT_SBS_STATE_TTL_SECS
+
+_sbs_feed = None  # SbsFeed, created from __main__ when INGEST_MODE is "sbs"
+
+# recent_flights: rotorcraft seen recently, bounded by count and idle time; the
+# hourly dump only lists aircraft seen within RECENT_DUMP_WINDOW_SECS
+DEFAULT_RECENT_FLIGHTS_MAX = 5000
+DEFAULT_RECENT_FLIGHTS_TTL_SECS = 24 * 60 * 60
+DEFAULT_RECENT_DUMP_WINDOW_SECS = 60 * 60
+
+RECENT_FLIGHTS_MAX = DEFAULT_RECENT_FLIGHTS_MAX
+RECENT_FLIGHTS_TTL_SECS = DEFAULT_RECENT_FLIGHTS_TTL_SECS
+RECENT_DUMP_WINDOW_SECS = DEFAULT_RECENT_DUMP_WINDOW_SECS
+
+# fcs_rx series (one per icao/cs pair): "full" keeps every pair; "bounded" caps
+# them at RX_SERIES_LIMIT, counts the overflow under icao/cs "other", keeps the
+# RX_SERIES_TOP_K busiest when the cap is reached and drops idle pairs after
+# RX_SERIES_TTL_SECS
+RX_METRICS_MODES = ("full", "bounded")
+DEFAULT_RX_METRICS = "full"
+DEFAULT_RX_SERIES_LIMIT = 1000
+DEFAULT_RX_SERIES_TOP_K = 500
+DEFAULT_RX_SERIES_TTL_SECS = 6 * 60 * 60
+RX_OTHER_LABELS = ("other", "other")
+
+RX_METRICS = DEFAULT_RX_METRICS
+RX_SERIES_LIMIT = DEFAULT_RX_SERIES_LIMIT
+RX_SERIES_TOP_K = DEFAULT_RX_SERIES_TOP_K
+RX_SERIES_TTL_SECS = DEFAULT_RX_SERIES_TTL_SECS
+
+# Position filters between build_heli_document and the sink: SUPPRESS_REPEATS
+# drops a document that repeats the aircraft's last emitted position exactly;
+# UPLOAD_FILTER=change only emits a position that moved CHANGE_MIN_DISTANCE_M,
+# changed altitude by CHANGE_MIN_ALTITUDE_FT or heading by CHANGE_MIN_HEADING_DEG,
+# or is CHANGE_HEARTBEAT_SECS after the last one emitted; UPLOAD_FILTER=deadreckon
+# only emits a position more than DEADRECKON_TOLERANCE_M from where the last
+# emitted gs/track predicted it, a climb or descent of DEADRECKON_ALTITUDE_FT,
+# a turn of DEADRECKON_TURN_DEG, or one DEADRECKON_HEARTBEAT_SECS after the last
+DEFAULT_SUPPRESS_REPEATS = True
+UPLOAD_FILTERS = ("none", "change", "deadreckon")
+DEFAULT_UPLOAD_FILTER = "none"
+DEFAULT_CHANGE_MIN_DISTANCE_M = 100
+DEFAULT_CHANGE_MIN_ALTITUDE_FT = 100
+DEFAULT_CHANGE_MIN_HEADING_DEG = 15
+DEFAULT_CHANGE_HEARTBEAT_SECS = 60
+DEFAULT_DEADRECKON_TOLERANCE_M = 100
+DEFAULT_DEADRECKON_ALTITUDE_FT = 100
+DEFAULT_DEADRECKON_TURN_DEG = 20
+DEFAULT_DEADRECKON_HEARTBEAT_SECS = 300
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_SEC_PER_KNOT = 1852 / 3600
+
+SUPPRESS_REPEATS = DEFAULT_SUPPRESS_REPEATS
+UPLOAD_FILTER = DEFAULT_UPLOAD_FILTER
+CHANGE_MIN_DISTANCE_M = DEFAULT_CHANGE_MIN_DISTANCE_M
+CHANGE_MIN_ALTITUDE_FT = DEFAULT_CHANGE_MIN_ALTITUDE_FT
+CHANGE_MIN_HEADING_DEG = DEFAULT_CHANGE_MIN_HEADING_DEG
+CHANGE_HEARTBEAT_SECS = DEFAULT_CHANGE_HEARTBEAT_SECS
+DEADRECKON_TOLERANCE_M = DEFAULT_DEADRECKON_TOLERANCE_M
+DEADRECKON_ALTITUDE_FT = DEFAULT_DEADRECKON_ALTITUDE_FT
+DEADRECKON_TURN_DEG = DEFAULT_DEADRECKON_TURN_DEG
+DEADRECKON_HEARTBEAT_SECS = DEFAULT_DEADRECKON_HEARTBEAT_SECS
+
+# Positions entering the filters and handed to the sink, for the compression ratio
+_positions_built = 0
+_positions_uploaded = 0
+
+# JSON decoder for aircraft.json snapshots: auto picks orjson, then msgspec, then json
+JSON_DECODERS = ("auto", "orjson", "msgspec", "json")
+DEFAULT_JSON_DECODER = "auto"
+
+_json_decoder_name = "json"
+_json_decode = json.loads
+
+# Batch engine for binCraft snapshots: "python" unpacks every record and tests each
+# aircraft in the per-plane loop, "numpy" views the records as columns and computes
+# the rotorcraft mask before unpacking only the matching rows
+BATCH_ENGINES = ("python", "numpy")
+DEFAULT_BATCH_ENGINE = "python"
+
+_batch_engine = "python"
+
+# Timezone for a document's human-readable readableTime (stored dates are UTC)
+DEFAULT_DISPLAY_TIMEZONE = "America/New_York"
+DISPLAY_TIMEZONE = DEFAULT_DISPLAY_TIMEZONE
+
+# Change detection so an unchanged snapshot is not re-parsed and re-inserted
+_aircraft_etag: str | None = None
+_aircraft_last_modified: str | None = None
+_aircraft_file_mtimes: dict[str, int] = {}  # path -> st_mtime_ns
+_last_processed_now: float | None = None
+
 # Bills
 
 BILLS_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSEyC5hDeD-ag4hC1Zy9m-GT8kqO4f35Bj9omB0v2LmV1FrH1aHGc-i0fOXoXmZvzGTccW609Yv3iUs/pub?gid=0&single=true&output=csv"
@@ -186,6 +464,67 @@ _otel_fcs_rx = None
 _otel_fcs_mongo_inserts = None
 _otel_fcs_sources = None
 _otel_fcs_update_heli_duration = None
+_otel_fcs_writer_latency = None
+_otel_fcs_writer_drops = None
+_otel_fcs_spool_docs = None
+_otel_fcs_aircraft_fetch_bytes = None
+_otel_fcs_aircraft_fetch_duration = None
+_otel_fcs_skipped_cycles = None
+_otel_fcs_sbs_connections = None
+_otel_fcs_rotorcraft_matches = None
+_otel_fcs_cycle_stage = None
+_otel_fcs_recent_flights_evictions = None
+_otel_fcs_rx_series_expired = None
+_otel_fcs_suppressed_positions = None
+_otel_fcs_built_positions = None
+
+# Prometheus metrics created in init_prometheus. None until then, so a run
+# without metrics (--once, tests) can call the helpers that record them.
+fcs_rx = None
+fcs_mongo_inserts = None
+fcs_sources = None
+fcs_skipped_cycles = None
+fcs_rotorcraft_matches = None
+fcs_sbs_connections = None
+fcs_suppressed_positions = None
+fcs_built_positions = None
+fcs_upload_compression_ratio = None
+fcs_aircraft_fetch_bytes = None
+fcs_aircraft_fetch_duration = None
+fcs_cycle_stage = None
+fcs_cycle_aircraft_scanned = None
+fcs_cycle_rotorcraft_emitted = None
+fcs_recent_flights = None
+fcs_recent_flights_bytes = None
+fcs_recent_flights_evictions = None
+fcs_rx_series = None
+fcs_rx_series_expired = None
+
+# Buckets for fcs_cycle_stage_seconds (fetch, decode, classify, build, sink,
+# total): from classifying a small snapshot (~0.1 ms) up to a slow remote fetch
+CYCLE_STAGE_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Aircraft scanned and rotorcraft emitted by the last processed poll cycle
+_cycle_aircraft_scanned = 0
+_cycle_rotorcraft_emitted = 0
 
 fcs_update_heli_time = Summary(
     "helicopter_db_update_duration_seconds",
@@ -223,6 +562,35 @@ AIRPLANES_FOLDERS = [
     "adsb-feeder-ultrafeeder/readsb",
 ]
 
+# --readlocalfiles: the first AIRPLANES_FOLDERS entry holding AIRCRAFT_FILE is cached
+# and only searched for again after a failed read. Cycles are woken by inotify when
+# the receiver rewrites the file, no closer together than LOCAL_MIN_SPACING_SECS
+# (defaults to --interval).
+
+DEFAULT_LOCAL_WATCH = True
+# After a failed inotify watch, fixed sleeps until the next attempt: doubling
+# from the first delay up to the max
+LOCAL_WATCH_RETRY_SECS = 60
+LOCAL_WATCH_RETRY_MAX_SECS = 3600
+
+LOCAL_WATCH = DEFAULT_LOCAL_WATCH
+LOCAL_MIN_SPACING_SECS = 0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_active_airplanes_folder = None
+_aircraft_watcher = None  # AircraftFileWatcher on the active folder
+_aircraft_watch_retry_at = 0.0  # time() before which no new watch is tried
+_aircraft_watch_backoff = LOCAL_WATCH_RETRY_SECS
+_inotify_libc = None
+
 
 # Trying to make this more user friendly
 
@@ -385,6 +753,45 @@ def parse_non_negative_int_config(value, default: int, setting_name: str) -> int
         return default
 
 
+def parse_choice_config(value, default: str, choices, setting_name: str) -> str:
+    """
+    Parse a string configuration value that must be one of a fixed set of choices.
+    """
+    if value is None:
+        return default
+    normalized = str(value).strip().lower()
+    if normalized in choices:
+        return normalized
+    logger.warning(
+        "Invalid %s value '%s'; falling back to %s",
+        setting_name,
+        value,
+        default,
+    )
+    return default
+
+
+def parse_timezone_config(value, default: str, setting_name: str) -> str:
+    """
+    Parse an IANA timezone name (e.g. America/New_York), checked against zoneinfo.
+    """
+    if value is None or str(value).strip() == "":
+        return default
+    name = str(value).strip()
+    try:
+        ZoneInfo(name)
+    except (KeyError, ValueError, OSError):
+        # ZoneInfoNotFoundError is a KeyError
+        logger.warning(
+            "Invalid %s value '%s'; falling back to %s",
+            setting_name,
+            value,
+            default,
+        )
+        return default
+    return name
+
+
 def build_mongo_app_name(feeder_id: str | None) -> str:
     """
     Build per-feeder MongoDB appName for Atlas attribution.
@@ -500,7 +907,7 @@ def mongo_client_insert(mydict, dbFlags):
 
         # Select database and collection
         mydb = myclient["HelicoptersofDC-2023"]
-        collection_name = "ADSB-mil" if dbFlags and int(dbFlags) & 1 else "ADSB"
+        collection_name = mongo_collection_name(dbFlags)
         mycol = mydb[collection_name]
 
         # Insert document
@@ -519,6 +926,7 @@ def mongo_client_insert(mydict, dbFlags):
 
     except ConnectionFailure as e:
         logger.error("Failed to connect to MongoDB: %s", e)
+        spool_docs([(mydict, dbFlags)])
         return None
     except OperationFailure as e:
         logger.error("MongoDB operation failed: %s", e)
@@ -528,683 +936,3476 @@ def mongo_client_insert(mydict, dbFlags):
         return None
 
 
-def mongo_https_insert(mydict, dbFlags):
-    """
-    Insert into Mongo using HTTPS requests call
-    This will be deprecated September 2024
+def mongo_collection_name(dbFlags) -> str:
     """
-    # url = "https://us-central1.gcp.data.mongodb-api.com/app/feeder-puqvq/endpoint/feedadsb"
-
-    headers = {"api-key": MONGO_API_KEY, "Content-Type": "application/json"}
+    Return the target collection for a document based on its readsb dbFlags.
 
+    Bit 0 of dbFlags marks military aircraft, which go to "ADSB-mil".
+    """
     try:
-        response = requests.post(MONGO_URL, headers=headers, json=mydict, timeout=7.5)
-        response.raise_for_status()
-        logger.debug("Response: %s", response)
-        logger.info("Mongo Insert Status: %s", response.status_code)
+        return "ADSB-mil" if dbFlags and int(dbFlags) & 1 else "ADSB"
+    except (TypeError, ValueError):
+        return "ADSB"
 
-    except requests.exceptions.HTTPError as e:
-        logger.warning("Mongo Post Error: %s ", e.response.text)
 
-    fcs_mongo_inserts.labels(
-        status_code=response.status_code, feeder_id=FEEDER_ID
-    ).inc()
+def count_mongo_inserts(status_code, count: int = 1) -> None:
+    """
+    Increment the fcs_mongo_inserts counter (and OTel mirror) for a status code.
+    """
+    if count <= 0:
+        return
+    if fcs_mongo_inserts is not None:
+        fcs_mongo_inserts.labels(status_code=status_code, feeder_id=FEEDER_ID).inc(
+            count
+        )
     if _otel_fcs_mongo_inserts is not None:
         _otel_fcs_mongo_inserts.add(
-            1,
+            count,
             {
-                "status_code": str(response.status_code),
+                "status_code": str(status_code),
                 "feeder_id": FEEDER_ID or "unknown",
             },
         )
-    return response.status_code
 
 
-def dump_recents(signum=signal.SIGUSR1, frame="") -> None:
+def retry_without_spool(docs, results, indexes, spool_on_failure: bool) -> None:
     """
-    Dump information about recently seen aircraft to the logs.
+    Mark a failed batch INSERT_RETRY during spool replay (spool_on_failure off).
 
-    This function is primarily used as a signal handler for SIGUSR1 but can also be called
-    directly. It provides a summary of all aircraft currently being tracked, including their
-    ICAO hex codes, flight numbers/callsigns, and how many times they've been seen.
+    Replay advances past every document that is not INSERT_RETRY, so a failure
+    that may be transient must not leave None there and lose the spooled copy.
+    Outside replay the batch is lost, which the upload filter is told about.
+    """
+    if not spool_on_failure:
+        for idx in indexes:
+            results[idx] = INSERT_RETRY
+    else:
+        forget_unwritten_positions(docs[idx][0] for idx in indexes)
+
+
+def mongo_client_insert_many(docs, spool_on_failure: bool = True):
+    """
+    Insert a cycle's worth of documents into MongoDB with one bulk write per collection.
+
+    Documents are grouped by target collection (see mongo_collection_name) and each
+    group is written with a single unordered insert_many, so one bad document does not
+    stop the rest of the batch from being written.
 
     Args:
-        signum: Signal number that triggered this handler (defaults to SIGUSR1)
-        frame: Current stack frame (unused, required for signal handler interface)
+        docs (list[tuple[dict, str | None]]): (mydict, dbFlags) pairs in cycle order
+        spool_on_failure (bool): Spool documents to disk if MongoDB is unreachable
+
+    Returns:
+        list: Per-document results in input order - the inserted ObjectId on success
+              (or when it was already there from an earlier attempt), None if that
+              document was not written, INSERT_RETRY if MongoDB was unreachable
+              and the document was not spooled; without spool_on_failure, a
+              batch that failed as a whole (operation failure, unexpected
+              error, unacknowledged) is INSERT_RETRY too, so replay keeps it
     """
+    results = [None] * len(docs)
+    if not docs:
+        return results
+
+    groups = {}
+    for idx, (mydict, dbFlags) in enumerate(docs):
+        # Assign _id up front so a spooled document keeps it and replay is idempotent
+        mydict.setdefault("_id", ObjectId())
+        groups.setdefault(mongo_collection_name(dbFlags), []).append(idx)
+
     try:
-        # Log signal information if called as signal handler
-        if signum:
-            signame = signal.Signals(signum).name
-            logger.info(
-                f"Signal handler dump_recents called with signal {signame} ({signum})"
+        mongo_uri = build_mongo_uri()
+        myclient = get_mongo_client(mongo_uri, build_mongo_app_name(FEEDER_ID))
+        mydb = myclient["HelicoptersofDC-2023"]
+    except Exception as e:
+        logger.error("Failed to connect to MongoDB: %s", e)
+        count_mongo_inserts("conn_fail", len(docs))
+        if spool_on_failure:
+            spool_docs(docs)
+            return results
+        return [INSERT_RETRY] * len(docs)
+
+    for collection_name, indexes in groups.items():
+        batch = [docs[idx][0] for idx in indexes]
+        failed = {}
+        try:
+            result = mydb[collection_name].insert_many(batch, ordered=False)
+            if not result.acknowledged:
+                logger.error(
+                    "Bulk insert of %d documents into %s was not acknowledged",
+                    len(batch),
+                    collection_name,
+                )
+                count_mongo_inserts("unacked", len(batch))
+                retry_without_spool(docs, results, indexes, spool_on_failure)
+                continue
+            inserted_ids = result.inserted_ids
+
+        except BulkWriteError as e:
+            # Unordered: everything not listed in writeErrors was written
+            for write_error in e.details.get("writeErrors", []):
+                failed[write_error["index"]] = write_error
+            inserted_ids = [doc.get("_id") for doc in batch]
+
+        except ConnectionFailure as e:
+            logger.error(
+                "Failed to connect to MongoDB inserting %d documents into %s: %s",
+                len(batch),
+                collection_name,
+                e,
+            )
+            count_mongo_inserts("conn_fail", len(batch))
+            # Part of the batch may have been written; the kept _id makes the
+            # replay of those documents a duplicate key error, not a second copy
+            if spool_on_failure:
+                spool_docs([docs[idx] for idx in indexes])
+            else:
+                for idx in indexes:
+                    results[idx] = INSERT_RETRY
+            continue
+        except OperationFailure as e:
+            logger.error("MongoDB bulk insert into %s failed: %s", collection_name, e)
+            count_mongo_inserts("op_fail", len(batch))
+            retry_without_spool(docs, results, indexes, spool_on_failure)
+            continue
+        except Exception as e:
+            logger.error(
+                "Unexpected error during MongoDB bulk insert into %s: %s",
+                collection_name,
+                e,
             )
+            count_mongo_inserts("error", len(batch))
+            retry_without_spool(docs, results, indexes, spool_on_failure)
+            continue
 
-        # Handle empty recent_flights case
-        if not recent_flights:
-            logger.info("No recent flights to dump")
-            return
+        duplicates = 0
+        for pos, idx in enumerate(indexes):
+            if pos in failed and failed[pos].get("code") == 11000:
+                # Already written (a replayed document that got through before)
+                results[idx] = batch[pos]["_id"]
+                duplicates += 1
+            elif pos in failed:
+                write_error = failed[pos]
+                logger.error(
+                    "Insert failed for %s into %s - code %s: %s",
+                    batch[pos].get("properties", {}).get("icao"),
+                    collection_name,
+                    write_error.get("code"),
+                    write_error.get("errmsg"),
+                )
+                count_mongo_inserts(write_error.get("code", "error"))
+                forget_unwritten_positions([batch[pos]])
+            else:
+                results[idx] = inserted_ids[pos]
+                logger.info(
+                    "Successfully inserted document with ID: %s into %s",
+                    inserted_ids[pos],
+                    collection_name,
+                )
 
-        # Log summary header with timestamp
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        logger.info("=== Recent Flights Dump at %s ===", current_time)
-        logger.info(
-            "Total aircraft being tracked: %d since %s", len(recent_flights), start_time
-        )
+        count_mongo_inserts("ok", len(indexes) - len(failed))
+        count_mongo_inserts("duplicate", duplicates)
 
-        # Sort and dump detailed aircraft information
-        for hex_icao in sorted(recent_flights):
-            flight, seen_count = recent_flights[hex_icao]
-            aircraft_type = heli_types.get(hex_icao, {}).get("type", "Unknown")
-            logger.info(
-                f"Aircraft: {hex_icao.upper():6} | Type: {aircraft_type:4} | Flight: {(flight or 'No Callsign'):8} | Times seen: {seen_count}"
-            )
+    return results
 
-        logger.info("=== End of Dump ===")
 
-    except Exception as e:
-        logger.error("Error in dump_recents: %s", str(e))
-        # Re-raise if this wasn't called as a signal handler
-        if not signum:
-            raise
+def mongo_https_insert_many(docs, spool_on_failure: bool = True):
+    """
+    Insert a cycle's worth of documents using the HTTPS endpoint.
 
+    The endpoint only accepts one document per request, so this posts each document
+    in turn. Only a 2xx response counts as written. A rejected document (other 4xx)
+    is logged and does not stop the rest; if the endpoint is unreachable or
+    unavailable (5xx, 429) the document is spooled to disk (see PositionSpool), or
+    without spool_on_failure the remaining documents are not posted at all.
 
-def clean_source(source) -> str:
+    Returns:
+        list: Per-document HTTP status codes in input order - None if the document
+              was not written, INSERT_RETRY if the endpoint was unavailable and the
+              document was not spooled
     """
-    Normalize aircraft data source identifiers to standard format.
+    results = []
+    for mydict, dbFlags in docs:
+        if not spool_on_failure and INSERT_RETRY in results:
+            results.append(INSERT_RETRY)
+            continue
+        try:
+            status_code = mongo_https_insert(mydict, dbFlags)
+        except requests.exceptions.RequestException as e:
+            logger.error(
+                "Mongo Post failed for %s: %s",
+                mydict.get("properties", {}).get("icao"),
+                e,
+            )
+            count_mongo_inserts("conn_fail")
+            status_code = None
+        if status_code is not None and 200 <= status_code < 300:
+            results.append(status_code)
+        elif status_code is None or http_status_retryable(status_code):
+            if spool_on_failure:
+                spool_docs([(mydict, dbFlags)])
+                results.append(None)
+            else:
+                results.append(INSERT_RETRY)
+        else:
+            forget_unwritten_positions([mydict])
+            results.append(None)
+    return results
 
-    Args:
-        source (str | None): Raw source identifier from aircraft data
 
-    Returns:
-        str: Normalized source identifier
+def http_status_retryable(status_code: int) -> bool:
+    """
+    True for HTTP statuses that mean "try again later" rather than "rejected".
+    """
+    return status_code == 429 or status_code >= 500
 
-    Source mappings:
-        - None, "unknown" -> "unkn"
-        - "adsb*" -> "adsb"
-        - "adsr*" -> "adsr"
-        - "mlat" -> "mlat"
-        - "adsb_icao_nt", "mode_s" -> "modeS"
-        - "tisb*" -> "tisb"
-        - "adsc" -> "adsc"
-        - "other" -> "other"
 
-    Example:
-        >>> clean_source("adsb_icao")
-        "adsb"
-        >>> clean_source(None)
-        "unkn"
+def mongo_https_insert(mydict, dbFlags):
+    """
+    Insert into Mongo using HTTPS requests call
+    This will be deprecated September 2024
     """
+    # url = "https://us-central1.gcp.data.mongodb-api.com/app/feeder-puqvq/endpoint/feedadsb"
+
+    headers = {"api-key": MONGO_API_KEY, "Content-Type": "application/json"}
+
     try:
-        # Handle None or non-string input
-        if source is None:
-            return "unkn"
+        response = requests.post(MONGO_URL, headers=headers, json=mydict, timeout=7.5)
+        response.raise_for_status()
+        logger.debug("Response: %s", response)
+        logger.info("Mongo Insert Status: %s", response.status_code)
 
-        # Ensure source is string and lowercase for comparison
-        source = str(source).lower()
+    except requests.exceptions.HTTPError as e:
+        logger.warning("Mongo Post Error: %s ", e.response.text)
 
-        # Define source mappings
-        SOURCE_MAPPINGS = {
-            "unknown": "unkn",
-            "mlat": "mlat",
-            "adsb_icao_nt": "modeS",
-            "mode_s": "modeS",
-            "adsc": "adsc",
-            "other": "other",
-        }
+    count_mongo_inserts(response.status_code)
+    return response.status_code
 
-        # Check prefix matches first
-        if source.startswith("adsb"):
-            return "adsb"
-        if source.startswith("adsr"):
-            return "adsr"
-        if source.startswith("tisb"):
-            return "tisb"
 
-        # Return mapped value or "unkn" if no match found
-        return SOURCE_MAPPINGS.get(source, "unkn")
+class MongoWriter:
+    """
+    Bounded queue of documents drained into mongo_insert_many by background threads.
 
-    except Exception as e:
-        logger.error("Error cleaning source identifier: %s - Error: %s", source, str(e))
-        return "unkn"
+    The poll loop enqueues the documents it builds and goes back to sleep; writer
+    threads pick them up in batches of up to WRITER_BATCH_SIZE. When the queue is
+    full the overflow policy decides what happens:
 
+    - drop_oldest: discard the oldest queued document to make room
+    - drop_newest: discard the document being enqueued
+    - block: wait in the poll loop until a writer frees up space
+    """
 
-def _record_otel_update_duration(func):
-    """Decorator to record fcs_update_helidb duration to OTel histogram."""
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_WRITER_QUEUE_SIZE,
+        policy: str = DEFAULT_WRITER_OVERFLOW_POLICY,
+        threads: int = DEFAULT_WRITER_THREADS,
+        batch_size: int = DEFAULT_WRITER_BATCH_SIZE,
+    ) -> None:
+        self._queue = deque()
+        self._cond = Condition(Lock())
+        self._maxsize = max(1, maxsize)
+        self._policy = policy
+        self._num_threads = max(1, threads)
+        self._batch_size = max(1, batch_size)
+        self._threads = []
+        self._stopping = False
+
+    def start(self) -> None:
+        for n in range(self._num_threads):
+            t = Thread(target=self._run, name=f"mongo-writer-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(
+            "Mongo writer started threads=%d queue_size=%d batch_size=%d policy=%s",
+            self._num_threads,
+            self._maxsize,
+            self._batch_size,
+            self._policy,
+        )
 
-    def wrapper(*args, **kwargs):
-        start = perf_counter()
-        try:
-            return func(*args, **kwargs)
-        finally:
-            if _otel_fcs_update_heli_duration is not None:
-                duration = perf_counter() - start
-                _otel_fcs_update_heli_duration.record(
-                    duration, {"feeder_id": FEEDER_ID or "unknown"}
-                )
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def put_many(self, docs) -> int:
+        """
+        Enqueue (mydict, dbFlags) pairs. Returns the number of documents accepted.
+        """
+        accepted = 0
+        dropped = []
+        with self._cond:
+            for mydict, dbFlags in docs:
+                if self._stopping:
+                    dropped.append(mydict)
+                    continue
+                while len(self._queue) >= self._maxsize:
+                    if self._policy == "block" and _shutdown_requested:
+                        # Stop waiting and queue past the bound: stop() drains it
+                        break
+                    elif self._policy == "block":
+                        # Wake the writers for what is already queued before waiting
+                        self._cond.notify_all()
+                        self._cond.wait(1.0)
+                        if self._stopping:
+                            break
+                    elif self._policy == "drop_oldest":
+                        dropped.append(self._queue.popleft()[0])
+                    else:
+                        break
+                full = len(self._queue) >= self._maxsize
+                if self._stopping or (full and self._policy != "block"):
+                    dropped.append(mydict)
+                    continue
+                self._queue.append((mydict, dbFlags, perf_counter()))
+                accepted += 1
+            depth = len(self._queue)
+            self._cond.notify_all()
+
+        fcs_writer_queue_depth.labels(feeder_id=FEEDER_ID).set(depth)
+        if dropped:
+            logger.warning(
+                "Mongo writer queue full (%d) - dropped %d document(s) policy=%s",
+                self._maxsize,
+                len(dropped),
+                self._policy,
+            )
+            count_writer_drops(self._policy, len(dropped))
+            forget_unwritten_positions(dropped)
+        return accepted
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._queue and not self._stopping:
+                self._cond.wait()
+            batch = []
+            while self._queue and len(batch) < self._batch_size:
+                batch.append(self._queue.popleft())
+            depth = len(self._queue)
+            self._cond.notify_all()
+        fcs_writer_queue_depth.labels(feeder_id=FEEDER_ID).set(depth)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                # Only returns empty once stopping and fully drained
+                return
+            try:
+                mongo_insert_many([(mydict, dbFlags) for mydict, dbFlags, _ in batch])
+            except Exception as e:
+                logger.error("Mongo writer failed on batch of %d: %s", len(batch), e)
+                forget_unwritten_positions(mydict for mydict, _, _ in batch)
+            finally:
+                acked = perf_counter()
+                for _, _, enqueued in batch:
+                    observe_writer_latency(acked - enqueued)
+
+    def stop(self, timeout: float = DEFAULT_WRITER_SHUTDOWN_TIMEOUT_SECS) -> None:
+        """
+        Stop accepting documents and give the writers up to timeout seconds to drain.
+        """
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        deadline = perf_counter() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - perf_counter()))
+        remaining = self.depth()
+        if remaining:
+            logger.warning(
+                "Mongo writer stopped with %d document(s) still queued", remaining
+            )
+        else:
+            logger.info("Mongo writer stopped - queue drained")
 
-    return wrapper
 
+def count_writer_drops(policy: str, count: int = 1) -> None:
+    """
+    Increment the writer drop counter (and OTel mirror) for an overflow policy.
+    """
+    fcs_writer_drops.labels(policy=policy, feeder_id=FEEDER_ID).inc(count)
+    if _otel_fcs_writer_drops is not None:
+        _otel_fcs_writer_drops.add(
+            count, {"policy": policy, "feeder_id": FEEDER_ID or "unknown"}
+        )
 
-@_record_otel_update_duration
-@fcs_update_heli_time.labels(feeder_id=FEEDER_ID).time()
-def fcs_update_helidb(interval):
+
+def observe_writer_latency(seconds: float) -> None:
     """
-    Process and upload rotorcraft position data to the Helicopters of DC database.
+    Record enqueue-to-ack latency for one document.
+    """
+    fcs_writer_latency.labels(feeder_id=FEEDER_ID).observe(seconds)
+    if _otel_fcs_writer_latency is not None:
+        _otel_fcs_writer_latency.record(seconds, {"feeder_id": FEEDER_ID or "unknown"})
 
-    This function is the main processing loop that:
-    1. Retrieves aircraft data from either a local file or URL endpoint
-    2. Filters for rotorcraft based on category or known ICAO codes
-    3. Processes position and flight data
-    4. Uploads valid entries to MongoDB
-    5. Updates tracking metrics
 
-    Args:
-        interval (int): Maximum age in seconds for position data to be considered valid
+def submit_mongo_docs(docs):
+    """
+    Hand a cycle's documents to the background writer, or insert inline if none is running.
 
     Returns:
-        None: Function runs continuously unless an error occurs
-        Exception: Returns error object if a critical error occurs during processing
+        int: Number of documents accepted (queued or written)
+    """
+    if _mongo_writer is not None:
+        return _mongo_writer.put_many(docs)
+    ret_vals = mongo_insert_many(docs)
+    return sum(1 for ret_val in ret_vals if ret_val is not None)
 
-    Metrics:
-        - Updates Prometheus metrics for monitoring
-        - Maintains recent_flights global dictionary for tracking
 
-    Note:
-        Function is decorated with @fcs_update_heli_time.time() for performance monitoring
+def start_mongo_writer() -> None:
+    """
+    Start the background writer threads when WRITER_THREADS > 0.
     """
+    global _mongo_writer
+    if WRITER_THREADS <= 0 or _mongo_writer is not None:
+        return
+    _mongo_writer = MongoWriter(
+        maxsize=WRITER_QUEUE_SIZE,
+        policy=WRITER_OVERFLOW_POLICY,
+        threads=WRITER_THREADS,
+        batch_size=WRITER_BATCH_SIZE,
+    )
+    _mongo_writer.start()
 
-    # local_time = datetime.now().astimezone()
 
-    logger.info(
-        "Updating Helidb at %s ",
-        datetime.now().astimezone().strftime("%Y-%m-%d %H:%M:%S %Z %z"),
+def stop_mongo_writer() -> None:
+    """
+    Drain and stop the background writer, if one is running.
+    """
+    global _mongo_writer
+    if _mongo_writer is None:
+        return
+    _mongo_writer.stop()
+    _mongo_writer = None
+
+
+class PositionSpool:
+    """
+    Append-only, segment-based on-disk spool for documents that could not be written.
+
+    Layout under the spool directory:
+
+    - seg-<seq>.jsonl.open: the segment currently being appended to
+    - seg-<seq>.jsonl: sealed segments, replayed oldest first
+    - cursor.json: replay position (segment name and byte offset) in the oldest segment
+
+    Each line holds one document and its dbFlags as Extended JSON, so datetimes
+    survive the round trip. A segment is sealed (fsync + atomic rename) when it
+    reaches SPOOL_SEGMENT_BYTES or before it is replayed. Appends are only fsync'd
+    every SPOOL_FSYNC_INTERVAL_SECS to keep SD card writes down on Raspberry Pis.
+    On startup, open segments left by a crash are trimmed to their last complete
+    line and sealed.
+
+    The oldest segments are discarded when the spool grows past SPOOL_MAX_BYTES
+    or a segment is older than SPOOL_MAX_AGE_SECS.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DEFAULT_SPOOL_MAX_BYTES,
+        max_age_secs: int = DEFAULT_SPOOL_MAX_AGE_SECS,
+        segment_bytes: int = DEFAULT_SPOOL_SEGMENT_BYTES,
+        fsync_interval_secs: int = DEFAULT_SPOOL_FSYNC_INTERVAL_SECS,
+        replay_batch_size: int = DEFAULT_SPOOL_REPLAY_BATCH_SIZE,
+        replay_interval_secs: int = DEFAULT_SPOOL_REPLAY_INTERVAL_SECS,
+    ) -> None:
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._max_age_secs = max_age_secs
+        self._segment_bytes = segment_bytes
+        self._fsync_interval_secs = fsync_interval_secs
+        self._replay_batch_size = max(1, replay_batch_size)
+        self._replay_interval_secs = replay_interval_secs
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self._active = None  # file object for the open segment
+        self._active_name = None
+        self._next_seq = 0
+        self._dirty = False
+        self._last_fsync = 0.0
+        self._cursor_name = None
+        self._cursor_offset = 0
+        self._backlog_bytes = 0
+        self._backlog_docs = 0
+
+    # Layout helpers
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._dir, name)
+
+    def _sealed_segments(self) -> list:
+        return sorted(
+            name
+            for name in os.listdir(self._dir)
+            if name.startswith("seg-") and name.endswith(".jsonl")
+        )
+
+    def _fsync_dir(self) -> None:
+        try:
+            fd = os.open(self._dir, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def _write_cursor(self) -> None:
+        cursor_path = self._path("cursor.json")
+        if self._cursor_name is None:
+            try:
+                os.remove(cursor_path)
+            except FileNotFoundError:
+                pass
+            return
+        tmp_path = cursor_path + ".tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as cursor_file:
+            json.dump(
+                {"segment": self._cursor_name, "offset": self._cursor_offset},
+                cursor_file,
+            )
+            cursor_file.flush()
+            os.fsync(cursor_file.fileno())
+        os.replace(tmp_path, cursor_path)
+
+    def _read_cursor(self) -> None:
+        try:
+            with open(self._path("cursor.json"), encoding="UTF-8") as cursor_file:
+                cursor = json.load(cursor_file)
+            self._cursor_name = cursor["segment"]
+            self._cursor_offset = int(cursor["offset"])
+        except FileNotFoundError:
+            self._cursor_name = None
+            self._cursor_offset = 0
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable spool cursor: %s", e)
+            self._cursor_name = None
+            self._cursor_offset = 0
+
+    # Lifecycle
+
+    def open(self) -> None:
+        """
+        Create the spool directory and recover segments left open by a crash.
+        """
+        os.makedirs(self._dir, exist_ok=True)
+        with self._lock:
+            for name in sorted(os.listdir(self._dir)):
+                if name.startswith("seg-") and name.endswith(".jsonl.open"):
+                    self._recover_open_segment(name)
+
+            sealed = self._sealed_segments()
+            if sealed:
+                self._next_seq = int(sealed[-1][4:-6]) + 1
+
+            self._read_cursor()
+            if self._cursor_name not in sealed:
+                self._cursor_name = None
+                self._cursor_offset = 0
+
+            self._backlog_bytes = 0
+            self._backlog_docs = 0
+            for name in sealed:
+                offset = self._cursor_offset if name == self._cursor_name else 0
+                with open(self._path(name), "rb") as seg:
+                    seg.seek(offset)
+                    data = seg.read()
+                self._backlog_bytes += len(data)
+                self._backlog_docs += data.count(b"\n")
+
+            self._enforce_caps()
+        self._update_gauges()
+        if self._backlog_docs:
+            logger.info(
+                "Spool %s holds %d document(s) (%d bytes) awaiting replay",
+                self._dir,
+                self._backlog_docs,
+                self._backlog_bytes,
+            )
+
+    def _recover_open_segment(self, name: str) -> None:
+        path = self._path(name)
+        with open(path, "rb+") as seg:
+            data = seg.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                logger.warning(
+                    "Trimming %d byte(s) of partial record from spool segment %s",
+                    len(data) - complete,
+                    name,
+                )
+                seg.truncate(complete)
+            seg.flush()
+            os.fsync(seg.fileno())
+        if complete:
+            os.replace(path, path[: -len(".open")])
+        else:
+            os.remove(path)
+        self._fsync_dir()
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._run, name="spool-replayer", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Spool started dir=%s max_bytes=%d max_age=%ds segment_bytes=%d fsync_interval=%ds",
+            self._dir,
+            self._max_bytes,
+            self._max_age_secs,
+            self._segment_bytes,
+            self._fsync_interval_secs,
+        )
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(DEFAULT_WRITER_SHUTDOWN_TIMEOUT_SECS)
+        with self._lock:
+            self._seal_active()
+        logger.info(
+            "Spool closed with %d document(s) awaiting replay", self._backlog_docs
+        )
+
+    # Appending
+
+    def append(self, docs) -> int:
+        """
+        Append (mydict, dbFlags) pairs to the active segment. Returns the number spooled.
+        """
+        written = 0
+        with self._lock:
+            for mydict, dbFlags in docs:
+                # _id is kept so replaying a document that was in fact written
+                # is a duplicate key error rather than a second copy
+                record = {"doc": mydict, "dbFlags": dbFlags}
+                try:
+                    line = (
+                        json_util.dumps(record, json_options=SPOOL_JSON_OPTIONS) + "\n"
+                    ).encode("UTF-8")
+                except (TypeError, ValueError) as e:
+                    logger.error("Could not serialize document for spool: %s", e)
+                    continue
+                if self._active is None:
+                    self._active_name = f"seg-{self._next_seq:012d}.jsonl.open"
+                    self._next_seq += 1
+                    self._active = open(self._path(self._active_name), "ab")
+                    self._fsync_dir()
+                self._active.write(line)
+                self._dirty = True
+                self._backlog_bytes += len(line)
+                self._backlog_docs += 1
+                written += 1
+                if self._active.tell() >= self._segment_bytes:
+                    self._seal_active()
+            if self._active is not None:
+                self._active.flush()
+            self._fsync_if_due()
+            self._enforce_caps()
+        self._update_gauges()
+        if written:
+            count_spool_docs("spooled", written)
+        return written
+
+    def _fsync_if_due(self, force: bool = False) -> None:
+        if self._active is None or not self._dirty:
+            return
+        now = perf_counter()
+        if force or now - self._last_fsync >= self._fsync_interval_secs:
+            self._active.flush()
+            os.fsync(self._active.fileno())
+            self._dirty = False
+            self._last_fsync = now
+
+    def _seal_active(self) -> None:
+        if self._active is None:
+            return
+        self._fsync_if_due(force=True)
+        self._active.close()
+        path = self._path(self._active_name)
+        os.replace(path, path[: -len(".open")])
+        self._fsync_dir()
+        self._active = None
+        self._active_name = None
+
+    def _enforce_caps(self) -> None:
+        sealed = self._sealed_segments()
+        now = time()
+        for name in sealed:
+            path = self._path(name)
+            try:
+                size = os.path.getsize(path)
+                too_old = now - os.path.getmtime(path) > self._max_age_secs
+            except FileNotFoundError:
+                continue
+            if not too_old and self._backlog_bytes <= self._max_bytes:
+                break
+            with open(path, "rb") as seg:
+                if name == self._cursor_name:
+                    seg.seek(self._cursor_offset)
+                data = seg.read()
+            os.remove(path)
+            dropped = data.count(b"\n")
+            self._backlog_bytes = max(0, self._backlog_bytes - len(data))
+            self._backlog_docs = max(0, self._backlog_docs - dropped)
+            if name == self._cursor_name:
+                self._cursor_name = None
+                self._cursor_offset = 0
+                self._write_cursor()
+            logger.warning(
+                "Spool %s discarded segment %s (%d document(s), size=%d, too_old=%s)",
+                self._dir,
+                name,
+                dropped,
+                size,
+                too_old,
+            )
+            count_spool_docs("discarded", dropped)
+
+    # Replay
+
+    def backlog(self) -> tuple[int, int]:
+        with self._lock:
+            return (self._backlog_docs, self._backlog_bytes)
+
+    def _next_batch(self):
+        """
+        Return (segment, start_offset, end, pairs, marks) for the next replay batch.
+
+        end is (end offset, lines read) for the whole batch, marks[i] the same just
+        after pairs[i]; lines include corrupt records, which are skipped.
+        """
+        with self._lock:
+            sealed = self._sealed_segments()
+            if not sealed and self._active is not None:
+                self._seal_active()
+                sealed = self._sealed_segments()
+            if not sealed:
+                return None
+            name = sealed[0]
+            offset = self._cursor_offset if name == self._cursor_name else 0
+
+        pairs = []
+        marks = []
+        lines = 0
+        bad = 0
+        with open(self._path(name), "rb") as seg:
+            seg.seek(offset)
+            while len(pairs) < self._replay_batch_size:
+                line = seg.readline()
+                if not line:
+                    break
+                lines += 1
+                try:
+                    record = json_util.loads(line, json_options=SPOOL_JSON_OPTIONS)
+                    pairs.append((record["doc"], record.get("dbFlags")))
+                    marks.append((seg.tell(), lines))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning("Skipping corrupt spool record in %s: %s", name, e)
+                    bad += 1
+            end = seg.tell()
+        if bad:
+            count_spool_docs("discarded", bad)
+        return (name, offset, (end, lines), pairs, marks)
+
+    def _advance(self, name: str, start: int, end: int, count: int) -> None:
+        with self._lock:
+            if not os.path.exists(self._path(name)):
+                # Discarded by _enforce_caps while the batch was being replayed;
+                # the backlog and cursor were already adjusted there
+                return
+            self._backlog_bytes = max(0, self._backlog_bytes - (end - start))
+            self._backlog_docs = max(0, self._backlog_docs - count)
+            if end >= os.path.getsize(self._path(name)):
+                os.remove(self._path(name))
+                self._fsync_dir()
+                self._cursor_name = None
+                self._cursor_offset = 0
+            else:
+                self._cursor_name = name
+                self._cursor_offset = end
+            self._write_cursor()
+        self._update_gauges()
+
+    def replay(self, insert_many) -> int:
+        """
+        Replay spooled documents in order, one batch at a time, until the spool is
+        empty or the sink is unavailable. A document that insert_many reports as
+        INSERT_RETRY stops the replay; the cursor only moves past the documents
+        before it, so it and everything after are retried next time.
+
+        Returns:
+            int: Number of documents written
+        """
+        replayed = 0
+        while not self._stop.is_set():
+            try:
+                batch = self._next_batch()
+            except FileNotFoundError:
+                # Segment discarded by the caps between listing and reading it
+                continue
+            if batch is None:
+                break
+            name, start, end, pairs, marks = batch
+            if not pairs:
+                self._advance(name, start, *end)
+                continue
+
+            results = insert_many(pairs)
+            retry_at = next(
+                (pos for pos, ret_val in enumerate(results) if ret_val == INSERT_RETRY),
+                None,
+            )
+            if retry_at is not None:
+                results = results[:retry_at]
+            written = sum(1 for ret_val in results if ret_val is not None)
+            if len(results) > written:
+                logger.warning(
+                    "Spool replay dropped %d document(s) the sink rejected",
+                    len(results) - written,
+                )
+                count_spool_docs("discarded", len(results) - written)
+            if retry_at is None:
+                self._advance(name, start, *end)
+            elif retry_at:
+                self._advance(name, start, *marks[retry_at - 1])
+            count_spool_docs("replayed", written)
+            replayed += written
+            if retry_at is not None:
+                logger.info(
+                    "Spool replay paused - sink still unavailable (%d document(s) waiting)",
+                    self._backlog_docs,
+                )
+                break
+
+        if replayed:
+            logger.info("Spool replayed %d document(s)", replayed)
+        return replayed
+
+    def _run(self) -> None:
+        next_replay = perf_counter() + self._replay_interval_secs
+        # Wake once a second so pending appends get their batched fsync
+        while not self._stop.wait(1.0):
+            with self._lock:
+                self._fsync_if_due()
+                has_backlog = self._backlog_docs > 0
+            if has_backlog and perf_counter() >= next_replay:
+                next_replay = perf_counter() + self._replay_interval_secs
+                try:
+                    self.replay(
+                        lambda pairs: mongo_insert_many(pairs, spool_on_failure=False)
+                    )
+                except Exception as e:
+                    logger.error("Spool replay failed: %s", e)
+
+    def _update_gauges(self) -> None:
+        fcs_spool_backlog_docs.labels(feeder_id=FEEDER_ID).set(self._backlog_docs)
+        fcs_spool_backlog_bytes.labels(feeder_id=FEEDER_ID).set(self._backlog_bytes)
+
+
+def count_spool_docs(action: str, count: int = 1) -> None:
+    """
+    Increment the spool document counter (and OTel mirror) for an action.
+    """
+    if count <= 0:
+        return
+    fcs_spool_docs.labels(action=action, feeder_id=FEEDER_ID).inc(count)
+    if _otel_fcs_spool_docs is not None:
+        _otel_fcs_spool_docs.add(
+            count, {"action": action, "feeder_id": FEEDER_ID or "unknown"}
+        )
+
+
+def spool_docs(docs) -> bool:
+    """
+    Spool (mydict, dbFlags) pairs to disk for later replay.
+
+    Returns:
+        bool: True if the documents were spooled, False if no spool is configured
+    """
+    if _position_spool is None:
+        logger.warning("No spool configured - %d document(s) lost", len(docs))
+        forget_unwritten_positions(mydict for mydict, _ in docs)
+        return False
+    try:
+        _position_spool.append(docs)
+        return True
+    except OSError as e:
+        logger.error("Failed to spool %d document(s): %s", len(docs), e)
+        forget_unwritten_positions(mydict for mydict, _ in docs)
+        return False
+
+
+def start_position_spool(directory: str) -> None:
+    """
+    Open the spool under directory and start its replay thread when SPOOL_ENABLED.
+    """
+    global _position_spool
+    if not SPOOL_ENABLED or _position_spool is not None:
+        return
+    spool = PositionSpool(
+        directory,
+        max_bytes=SPOOL_MAX_BYTES,
+        max_age_secs=SPOOL_MAX_AGE_SECS,
+        segment_bytes=SPOOL_SEGMENT_BYTES,
+        fsync_interval_secs=SPOOL_FSYNC_INTERVAL_SECS,
+        replay_batch_size=SPOOL_REPLAY_BATCH_SIZE,
+        replay_interval_secs=SPOOL_REPLAY_INTERVAL_SECS,
+    )
+    try:
+        spool.open()
+    except OSError as e:
+        logger.error("Could not open spool at %s - spooling disabled: %s", directory, e)
+        return
+    spool.start()
+    _position_spool = spool
+
+
+def stop_position_spool() -> None:
+    """
+    Seal the active segment and stop the replay thread, if a spool is running.
+    """
+    global _position_spool
+    if _position_spool is None:
+        return
+    _position_spool.close()
+    _position_spool = None
+
+
+class ShutdownRequested(BaseException):
+    """
+    Raised by handle_sigterm to cut an idle() wait short. A BaseException, like
+    SystemExit, so that except Exception blocks let it through.
+    """
+
+
+def handle_sigterm(signum, frame) -> None:
+    """
+    SIGTERM handler: record the request and leave the shutdown to the main loop.
+
+    The handler runs on the main thread between any two bytecodes, possibly while
+    that thread holds the writer or spool lock, so it must not take those locks.
+    Only an idle() wait, where the main thread holds no locks, is interrupted.
+    """
+    global _shutdown_requested
+    logger.info("Received SIGTERM (%s) -- Exiting...", signum)
+    _shutdown_requested = True
+    if _shutdown_interruptible:
+        raise ShutdownRequested
+
+
+def idle(wait, *args) -> None:
+    """
+    Call wait(*args), a sleep or file wait, so that SIGTERM ends it at once.
+    """
+    global _shutdown_interruptible
+    try:
+        try:
+            _shutdown_interruptible = True
+            if not _shutdown_requested:
+                wait(*args)
+        finally:
+            _shutdown_interruptible = False
+    except ShutdownRequested:
+        pass
+
+
+def shutdown() -> None:
+    """
+    Drain the writer (which may spool), seal the spool, then close the client.
+    """
+    stop_mongo_writer()
+    stop_position_spool()
+    close_mongo_client()
+
+
+class RecentFlight:
+    """
+    One aircraft in recent_flights: last callsign label, times seen and when.
+    """
+
+    __slots__ = ("callsign", "seen", "first_seen", "last_seen")
+
+    def __init__(self, callsign: str, now: float):
+        self.callsign = callsign
+        self.seen = 1
+        self.first_seen = now
+        self.last_seen = now
+
+
+class RecentFlights:
+    """
+    Recently seen rotorcraft keyed by ICAO hex, bounded by size and idle time.
+
+    Records are kept in last-seen order, so an update is O(1) (move to end), the
+    least recently seen aircraft is evicted first when max_size is reached, and
+    expire() only looks at the records that have been idle longer than ttl.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._records = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, icao_hex) -> bool:
+        return icao_hex in self._records
+
+    def get(self, icao_hex):
+        return self._records.get(icao_hex)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def touch(self, icao_hex: str, callsign: str, now: float) -> tuple:
+        """
+        Record a sighting of icao_hex with callsign at now.
+
+        Returns:
+            tuple: (RecentFlight, previous callsign or None for a new aircraft)
+        """
+        record = self._records.get(icao_hex)
+        if record is None:
+            record = self._records[icao_hex] = RecentFlight(callsign, now)
+            if len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+                count_recent_flights_evictions("lru")
+            return record, None
+        self._records.move_to_end(icao_hex)
+        previous = record.callsign
+        record.callsign = callsign
+        record.seen += 1
+        record.last_seen = now
+        return record, previous
+
+    def expire(self, now: float) -> int:
+        """
+        Drop aircraft not seen for ttl seconds and refresh the size gauges.
+        """
+        cutoff = now - self.ttl
+        expired = 0
+        records = self._records
+        while records:
+            icao_hex = next(iter(records))
+            if records[icao_hex].last_seen >= cutoff:
+                break
+            del records[icao_hex]
+            expired += 1
+        if expired:
+            count_recent_flights_evictions("ttl", expired)
+            logger.debug("Expired %d aircraft from recents", expired)
+        if fcs_recent_flights is not None:
+            fcs_recent_flights.labels(feeder_id=FEEDER_ID).set(len(records))
+            fcs_recent_flights_bytes.labels(feeder_id=FEEDER_ID).set(
+                self.approx_bytes()
+            )
+        return expired
+
+    def active(self, window: float, now: float) -> list:
+        """
+        Return (icao_hex, RecentFlight) for aircraft seen in the last window seconds.
+        """
+        cutoff = now - window
+        active = []
+        for icao_hex in reversed(self._records):
+            record = self._records[icao_hex]
+            if record.last_seen < cutoff:
+                break
+            active.append((icao_hex, record))
+        return active
+
+    def approx_bytes(self) -> int:
+        """
+        Approximate memory held by the index and records (hex keys included).
+        """
+        per_record = _RECENT_FLIGHT_BYTES + _RECENT_FLIGHT_KEY_BYTES
+        return sys.getsizeof(self._records) + len(self._records) * per_record
+
+
+_RECENT_FLIGHT_BYTES = sys.getsizeof(RecentFlight("", 0.0)) + sys.getsizeof(0.0) * 2
+_RECENT_FLIGHT_KEY_BYTES = sys.getsizeof("a1b2c3")
+
+recent_flights = RecentFlights(RECENT_FLIGHTS_MAX, RECENT_FLIGHTS_TTL_SECS)
+
+
+def count_recent_flights_evictions(reason: str, count: int = 1) -> None:
+    """
+    Increment the recent_flights eviction counter (and OTel mirror) for a reason.
+    """
+    if fcs_recent_flights_evictions is not None:
+        fcs_recent_flights_evictions.labels(reason=reason, feeder_id=FEEDER_ID).inc(
+            count
+        )
+    if _otel_fcs_recent_flights_evictions is not None:
+        _otel_fcs_recent_flights_evictions.add(
+            count, {"reason": reason, "feeder_id": FEEDER_ID or "unknown"}
+        )
+
+
+class RxSeriesTracker:
+    """
+    The (icao, cs) label pairs exported on fcs_rx, with a count and last-seen time each.
+
+    Unbounded by default. With a limit, pairs seen once the limit is reached are
+    counted under RX_OTHER_LABELS; prune() drops pairs idle for ttl seconds and,
+    while the limit is reached, all but the top_k pairs by count.
+    """
+
+    def __init__(self, limit=None, top_k=None, ttl=None):
+        self.limit = limit
+        self.top_k = top_k
+        self.ttl = ttl
+        self._series = {}
+        self._other = False
+
+    def labels_for(self, icao_hex: str, callsign: str, now: float) -> tuple:
+        """
+        Return the (icao, cs) labels to count a sighting under.
+        """
+        key = (icao_hex, callsign)
+        series = self._series.get(key)
+        if series is None:
+            if self.limit is not None and len(self._series) >= self.limit:
+                self._other = True
+                return RX_OTHER_LABELS
+            series = self._series[key] = [0, now]
+        series[0] += 1
+        series[1] = now
+        return key
+
+    def prune(self, now: float) -> list:
+        """
+        Forget idle pairs and, at the limit, all but the top_k; return the dropped pairs.
+        """
+        dropped = []
+        if self.ttl is not None:
+            cutoff = now - self.ttl
+            dropped = [key for key, (_, seen) in self._series.items() if seen < cutoff]
+            for key in dropped:
+                del self._series[key]
+        if self.limit is not None and len(self._series) >= self.limit:
+            ranked = sorted(self._series, key=lambda key: self._series[key][0])
+            for key in ranked[: len(ranked) - self.top_k]:
+                del self._series[key]
+                dropped.append(key)
+        return dropped
+
+    def cardinality(self) -> int:
+        """Number of fcs_rx series exported, the "other" bucket included."""
+        return len(self._series) + self._other
+
+
+_rx_series = RxSeriesTracker()
+
+# Per-aircraft counts gathered during a cycle, keyed by label values, and written
+# to Prometheus and OTel by flush_cycle_metrics() once per cycle
+_cycle_rx_counts = {}
+_cycle_source_counts = {}
+_cycle_match_counts = {}
+
+
+def count_rx(icao_hex: str, callsign: str, now: float) -> None:
+    """
+    Count one reported position for fcs_rx, within the series limit.
+    """
+    labels = _rx_series.labels_for(icao_hex, callsign, now)
+    _cycle_rx_counts[labels] = _cycle_rx_counts.get(labels, 0) + 1
+
+
+def count_source(source: str) -> None:
+    """
+    Count one reported position for fcs_msg_srcs by source.
+    """
+    _cycle_source_counts[source] = _cycle_source_counts.get(source, 0) + 1
+
+
+def flush_cycle_metrics() -> None:
+    """
+    Write the counts gathered by count_rx, count_source and count_rotorcraft_match
+    to Prometheus (and OTel mirrors): one increment per label set, not per aircraft.
+    """
+    feeder_id = FEEDER_ID or "unknown"
+    # OTel cannot drop an attribute set, so a bounded fcs_rx is mirrored per
+    # feeder only; the per-aircraft series stay on Prometheus, where they expire
+    per_aircraft_otel = _rx_series.limit is None
+    for (icao_label, cs_label), count in _cycle_rx_counts.items():
+        if fcs_rx is not None:
+            fcs_rx.labels(icao=icao_label, cs=cs_label, feeder_id=FEEDER_ID).inc(count)
+        if _otel_fcs_rx is not None and per_aircraft_otel:
+            _otel_fcs_rx.add(
+                count, {"icao": icao_label, "cs": cs_label, "feeder_id": feeder_id}
+            )
+    if _otel_fcs_rx is not None and not per_aircraft_otel and _cycle_rx_counts:
+        _otel_fcs_rx.add(sum(_cycle_rx_counts.values()), {"feeder_id": feeder_id})
+    for source, count in _cycle_source_counts.items():
+        if fcs_sources is not None:
+            fcs_sources.labels(source=source, feeder_id=FEEDER_ID).inc(count)
+        if _otel_fcs_sources is not None:
+            _otel_fcs_sources.add(count, {"source": source, "feeder_id": feeder_id})
+    for reason, count in _cycle_match_counts.items():
+        if fcs_rotorcraft_matches is not None:
+            fcs_rotorcraft_matches.labels(reason=reason, feeder_id=FEEDER_ID).inc(count)
+        if _otel_fcs_rotorcraft_matches is not None:
+            _otel_fcs_rotorcraft_matches.add(
+                count, {"reason": reason, "feeder_id": feeder_id}
+            )
+    _cycle_rx_counts.clear()
+    _cycle_source_counts.clear()
+    _cycle_match_counts.clear()
+
+
+def expire_rx_series(now: float) -> None:
+    """
+    Remove pruned (icao, cs) series from fcs_rx and refresh the cardinality gauge.
+    """
+    dropped = _rx_series.prune(now)
+    if fcs_rx is not None:
+        for icao_label, cs_label in dropped:
+            fcs_rx.remove(icao_label, cs_label, FEEDER_ID)
+    if dropped:
+        logger.debug("Removed %d fcs_rx series", len(dropped))
+        if fcs_rx_series_expired is not None:
+            fcs_rx_series_expired.labels(feeder_id=FEEDER_ID).inc(len(dropped))
+        if _otel_fcs_rx_series_expired is not None:
+            _otel_fcs_rx_series_expired.add(
+                len(dropped), {"feeder_id": FEEDER_ID or "unknown"}
+            )
+    if fcs_rx_series is not None:
+        fcs_rx_series.labels(feeder_id=FEEDER_ID).set(_rx_series.cardinality())
+
+
+def dump_recents(signum=signal.SIGUSR1, frame="") -> None:
+    """
+    Dump information about recently seen aircraft to the logs.
+
+    This function is primarily used as a signal handler for SIGUSR1 but can also be called
+    directly. It provides a summary of the aircraft seen in the last RECENT_DUMP_WINDOW_SECS,
+    including their ICAO hex codes, flight numbers/callsigns, and how many times they've been seen.
+
+    Args:
+        signum: Signal number that triggered this handler (defaults to SIGUSR1)
+        frame: Current stack frame (unused, required for signal handler interface)
+    """
+    try:
+        # Log signal information if called as signal handler
+        if signum:
+            signame = signal.Signals(signum).name
+            logger.info(
+                f"Signal handler dump_recents called with signal {signame} ({signum})"
+            )
+
+        now = time()
+        recent_flights.expire(now)
+        active = recent_flights.active(RECENT_DUMP_WINDOW_SECS, now)
+
+        # Handle empty recent_flights case
+        if not active:
+            logger.info("No recent flights to dump")
+            return
+
+        # Log summary header with timestamp
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        logger.info("=== Recent Flights Dump at %s ===", current_time)
+        logger.info(
+            "Aircraft seen in the last %d seconds: %d of %d tracked since %s",
+            RECENT_DUMP_WINDOW_SECS,
+            len(active),
+            len(recent_flights),
+            start_time,
+        )
+
+        # Sort and dump detailed aircraft information
+        for hex_icao, record in sorted(active, key=lambda item: item[0]):
+            aircraft_type = heli_types.get(hex_icao, {}).get("type", "Unknown")
+            logger.info(
+                "Aircraft: %-6s | Type: %-4s | Flight: %-8s | Times seen: %d",
+                hex_icao.upper(),
+                aircraft_type,
+                record.callsign or "No Callsign",
+                record.seen,
+            )
+
+        logger.info("=== End of Dump ===")
+
+    except Exception as e:
+        logger.error("Error in dump_recents: %s", str(e))
+        # Re-raise if this wasn't called as a signal handler
+        if not signum:
+            raise
+
+
+def clean_source(source) -> str:
+    """
+    Normalize aircraft data source identifiers to standard format.
+
+    Args:
+        source (str | None): Raw source identifier from aircraft data
+
+    Returns:
+        str: Normalized source identifier
+
+    Source mappings:
+        - None, "unknown" -> "unkn"
+        - "adsb*" -> "adsb"
+        - "adsr*" -> "adsr"
+        - "mlat" -> "mlat"
+        - "adsb_icao_nt", "mode_s" -> "modeS"
+        - "tisb*" -> "tisb"
+        - "adsc" -> "adsc"
+        - "other" -> "other"
+
+    Example:
+        >>> clean_source("adsb_icao")
+        "adsb"
+        >>> clean_source(None)
+        "unkn"
+    """
+    try:
+        # Handle None or non-string input
+        if source is None:
+            return "unkn"
+
+        # Ensure source is string and lowercase for comparison
+        source = str(source).lower()
+
+        # Define source mappings
+        SOURCE_MAPPINGS = {
+            "unknown": "unkn",
+            "mlat": "mlat",
+            "adsb_icao_nt": "modeS",
+            "mode_s": "modeS",
+            "adsc": "adsc",
+            "other": "other",
+        }
+
+        # Check prefix matches first
+        if source.startswith("adsb"):
+            return "adsb"
+        if source.startswith("adsr"):
+            return "adsr"
+        if source.startswith("tisb"):
+            return "tisb"
+
+        # Return mapped value or "unkn" if no match found
+        return SOURCE_MAPPINGS.get(source, "unkn")
+
+    except Exception as e:
+        logger.error("Error cleaning source identifier: %s - Error: %s", source, str(e))
+        return "unkn"
+
+
+def get_aircraft_session() -> requests.Session:
+    """
+    Return the process-wide session used to poll aircraft.json, creating it once.
+
+    The session keeps one pooled keep-alive connection to the receiver and asks for
+    gzip so tar1090/readsb can send the JSON compressed.
+    """
+    global _aircraft_session
+
+    if _aircraft_session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(
+            {
+                "Accept-Encoding": "gzip",
+                "Connection": "keep-alive",
+                "User-Agent": f"{DEFAULT_MONGO_APP_NAME}/{VERSION}",
+            }
+        )
+        _aircraft_session = session
+        logger.debug("Created aircraft.json session")
+
+    return _aircraft_session
+
+
+def close_aircraft_session() -> None:
+    global _aircraft_session
+    if _aircraft_session is None:
+        return
+    try:
+        _aircraft_session.close()
+    except Exception:
+        logger.debug("Error closing aircraft.json session", exc_info=True)
+    finally:
+        _aircraft_session = None
+
+
+def fetch_aircraft_url(url: str, parser=None) -> requests.Response:
+    """
+    GET aircraft.json over the pooled session and record wire bytes and latency.
+
+    Sends If-None-Match / If-Modified-Since from the last 200 response whose body
+    was decoded (see remember_aircraft_validators), so an unchanged snapshot
+    comes back as an empty 304.
+
+    If parser (a StreamingAircraftParser) is given, the body is streamed into it
+    in chunks instead of being buffered on the response.
+
+    Raises:
+        requests.exceptions.RequestException: On connection, timeout or HTTP errors.
+            The session is dropped so the next cycle starts on a fresh connection.
+    """
+    conditional_headers = {}
+    if _aircraft_etag:
+        conditional_headers["If-None-Match"] = _aircraft_etag
+    if _aircraft_last_modified:
+        conditional_headers["If-Modified-Since"] = _aircraft_last_modified
+
+    start = perf_counter()
+    try:
+        response = get_aircraft_session().get(
+            url,
+            headers=conditional_headers,
+            timeout=(AIRCRAFT_CONNECT_TIMEOUT_SECS, AIRCRAFT_READ_TIMEOUT_SECS),
+            stream=parser is not None,
+        )
+        # Leaving the with block hands the connection back to the pool, whatever
+        # the status (a streamed 304 is otherwise never read or released)
+        with response:
+            response.raise_for_status()
+
+            decoded_bytes = 0
+            if parser is None or response.status_code != 200:
+                decoded_bytes = len(response.content)
+            else:
+                for chunk in response.iter_content(STREAM_CHUNK_BYTES):
+                    decoded_bytes += len(chunk)
+                    parser.feed(chunk)
+                parser.close()
+    except requests.exceptions.RequestException:
+        close_aircraft_session()
+        raise
+
+    duration = perf_counter() - start
+    # raw.tell() counts bytes pulled off the socket, i.e. before gzip decoding
+    wire_bytes = response.raw.tell() if response.raw is not None else 0
+    logger.debug(
+        "Fetched %s in %.3fs wire_bytes=%d decoded_bytes=%d encoding=%s",
+        url,
+        duration,
+        wire_bytes,
+        decoded_bytes,
+        response.headers.get("Content-Encoding", "identity"),
+    )
+
+    if fcs_aircraft_fetch_duration is not None:
+        fcs_aircraft_fetch_duration.labels(feeder_id=FEEDER_ID).observe(duration)
+        fcs_aircraft_fetch_bytes.labels(encoding="wire", feeder_id=FEEDER_ID).inc(
+            wire_bytes
+        )
+        fcs_aircraft_fetch_bytes.labels(encoding="decoded", feeder_id=FEEDER_ID).inc(
+            decoded_bytes
+        )
+    if _otel_fcs_aircraft_fetch_duration is not None:
+        _otel_fcs_aircraft_fetch_duration.record(
+            duration, {"feeder_id": FEEDER_ID or "unknown"}
+        )
+    if _otel_fcs_aircraft_fetch_bytes is not None:
+        _otel_fcs_aircraft_fetch_bytes.add(
+            wire_bytes, {"encoding": "wire", "feeder_id": FEEDER_ID or "unknown"}
+        )
+        _otel_fcs_aircraft_fetch_bytes.add(
+            decoded_bytes,
+            {"encoding": "decoded", "feeder_id": FEEDER_ID or "unknown"},
+        )
+    return response
+
+
+def select_json_decoder(name: str = DEFAULT_JSON_DECODER) -> str:
+    """
+    Select the decoder used for aircraft.json snapshots.
+
+    Every decoder takes the raw bytes as read from the socket or file, so no
+    intermediate str is built. "auto" prefers orjson, then msgspec, then the
+    stdlib. A requested decoder that is not installed falls back to "auto".
+
+    Returns:
+        str: The name of the decoder in use
+    """
+    global _json_decoder_name, _json_decode
+
+    available = {"json": json.loads}
+    if _msgspec_available:
+        available["msgspec"] = msgspec.json.Decoder().decode
+    if _orjson_available:
+        available["orjson"] = orjson.loads
+
+    if name != "auto" and name not in available:
+        logger.warning("JSON decoder %s is not installed - using auto", name)
+        name = "auto"
+    if name == "auto":
+        name = next(n for n in ("orjson", "msgspec", "json") if n in available)
+
+    _json_decoder_name = name
+    _json_decode = available[name]
+    logger.debug("Using %s to decode aircraft.json", name)
+    return name
+
+
+def decode_aircraft_json(raw: bytes) -> dict:
+    """
+    Decode an aircraft.json snapshot from bytes with the selected decoder.
+
+    Raises:
+        ValueError: If raw is not valid JSON, whichever decoder is in use
+    """
+    try:
+        return _json_decode(raw)
+    except ValueError:
+        raise
+    except Exception as e:
+        # msgspec.DecodeError does not derive from ValueError
+        raise ValueError(f"{_json_decoder_name}: {e}") from e
+
+
+class RotorcraftClassifier:
+    """
+    Decide whether an aircraft is a rotorcraft, and why.
+
+    Combines the rotorcraft type designators from icao_heli_types, the hex codes
+    listed in Bills and the A7 (rotorcraft) wake category. All three are set or
+    string lookups, so classify() is O(1) per aircraft. Built at startup and
+    rebuilt whenever Bills is reloaded (see rebuild_rotorcraft_classifier).
+    """
+
+    REASONS = ("type", "bills", "a7")
+
+    def __init__(self, type_codes, bills_hexes):
+        self.types = frozenset(type_codes)
+        self.bills = frozenset(bills_hexes)
+        self._arrays = None
+
+    def classify(self, icao_hex, type_code, category) -> str | None:
+        """
+        Return the match reason ("type", "bills" or "a7") or None if not a rotorcraft.
+
+        icao_hex is expected in lowercase, as Bills keys are.
+        """
+        if type_code in self.types:
+            return "type"
+        if icao_hex in self.bills:
+            return "bills"
+        if category == "A7":
+            return "a7"
+        return None
+
+    def arrays(self) -> dict:
+        """
+        The type and Bills sets as sorted NumPy arrays, for the numpy batch engine.
+
+        "type_bytes" and "bills_addrs" match binCraft's raw type field and
+        24-bit address. Built on first use.
+        """
+        if self._arrays is None:
+            types = sorted(self.types)
+            bills = sorted(self.bills)
+            bills_addrs = []
+            for icao_hex in bills:
+                try:
+                    bills_addrs.append(int(icao_hex, 16))
+                except ValueError:
+                    continue
+            self._arrays = {
+                "type_bytes": np.array(
+                    [t.encode("ascii", "replace") for t in types], dtype=bytes
+                ),
+                "bills_addrs": np.array(bills_addrs, dtype=np.int64),
+            }
+        return self._arrays
+
+
+_rotorcraft_classifier = RotorcraftClassifier(ROTORCRAFT_TYPES, ())
+
+
+def rebuild_rotorcraft_classifier(h_types) -> RotorcraftClassifier:
+    """
+    Rebuild the module classifier from the current Bills dictionary.
+    """
+    global _rotorcraft_classifier
+    _rotorcraft_classifier = RotorcraftClassifier(ROTORCRAFT_TYPES, h_types or ())
+    logger.info(
+        "Rotorcraft classifier built: %d types, %d Bills hexes",
+        len(_rotorcraft_classifier.types),
+        len(_rotorcraft_classifier.bills),
+    )
+    return _rotorcraft_classifier
+
+
+def select_batch_engine(name: str = DEFAULT_BATCH_ENGINE) -> str:
+    """
+    Select the engine used to pick rotorcraft out of a decoded snapshot.
+
+    "numpy" needs NumPy installed and falls back to "python" without it.
+
+    Returns:
+        str: The name of the engine in use
+    """
+    global _batch_engine
+
+    if name == "numpy" and not _numpy_available:
+        logger.warning("BATCH_ENGINE numpy requested but NumPy is not installed")
+        name = "python"
+    _batch_engine = name
+    return name
+
+
+def is_rotorcraft_candidate(icao_hex, type_code, category) -> bool:
+    """
+    Cheap pre-filter: could this aircraft be a rotorcraft?
+
+    True for a known rotorcraft type designator, a hex listed in Bills or wake
+    category A7 - the same test build_heli_document applies.
+    """
+    if icao_hex is not None:
+        icao_hex = icao_hex.lower()
+    return _rotorcraft_classifier.classify(icao_hex, type_code, category) is not None
+
+
+_STREAM_AIRCRAFT_KEY_RE = re.compile(r'"aircraft"\s*:\s*\[')
+_STREAM_NOW_RE = re.compile(r'"now"\s*:\s*(-?[0-9][0-9.eE+-]*)')
+_STREAM_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*(")?|[{}]')
+_STREAM_FIELD_RE = re.compile(r'"(hex|t|category)"\s*:\s*"([^"\\]*)"')
+
+
+class StreamingAircraftParser:
+    """
+    Incremental aircraft.json parser that only materializes likely rotorcraft.
+
+    Bytes are fed in chunks as they arrive. Each element of the "aircraft" array
+    is located without decoding it; its hex, t and category are pulled out with a
+    regex and only objects passing is_rotorcraft_candidate are decoded into dicts.
+    Everything else is dropped, so memory per cycle scales with the number of
+    rotorcraft rather than the size of the feed.
+
+    After close(), now holds the snapshot timestamp, planes the candidate
+    aircraft and scanned the number of aircraft seen.
+    """
+
+    def __init__(self, is_candidate=is_rotorcraft_candidate) -> None:
+        self._is_candidate = is_candidate
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._state = "header"
+        self.now = None
+        self.planes = []
+        self.scanned = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self._buf += self._decoder.decode(chunk)
+        self._parse()
+
+    def close(self) -> None:
+        self._buf += self._decoder.decode(b"", final=True)
+        self._parse()
+        if self._state == "header":
+            raise ValueError("aircraft.json has no aircraft array")
+        if self._state == "array":
+            raise ValueError("aircraft.json ended inside the aircraft array")
+        if self.now is None:
+            match = _STREAM_NOW_RE.search(self._buf)
+            if match is None:
+                raise ValueError("aircraft.json has no now timestamp")
+            self.now = float(match.group(1))
+        self._buf = ""
+
+    def _parse(self) -> None:
+        if self._state == "header":
+            match = _STREAM_AIRCRAFT_KEY_RE.search(self._buf)
+            if match is None:
+                return
+            now_match = _STREAM_NOW_RE.search(self._buf, 0, match.start())
+            if now_match is not None:
+                self.now = float(now_match.group(1))
+            self._buf = self._buf[match.end() :]
+            self._state = "array"
+
+        if self._state == "array":
+            buf = self._buf
+            pos = 0
+            size = len(buf)
+            while True:
+                while pos < size and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos >= size:
+                    break
+                if buf[pos] == "]":
+                    pos += 1
+                    self._state = "trailer"
+                    break
+                if buf[pos] != "{":
+                    raise ValueError(
+                        f"unexpected {buf[pos]!r} in aircraft array at offset {pos}"
+                    )
+                end = self._object_end(buf, pos)
+                if end < 0:
+                    break
+                self._element(buf[pos:end])
+                pos = end
+            self._buf = buf[pos:]
+
+    @staticmethod
+    def _object_end(buf: str, pos: int) -> int:
+        """
+        Return the offset just past the object starting at pos, or -1 if incomplete.
+        """
+        # Fast path: flat object with no escapes, and the first "}" is outside a string
+        end = buf.find("}", pos)
+        if end < 0:
+            return -1
+        candidate = buf[pos : end + 1]
+        if (
+            "{" not in candidate[1:]
+            and "\\" not in candidate
+            and candidate.count('"') % 2 == 0
+        ):
+            return end + 1
+
+        depth = 0
+        for match in _STREAM_TOKEN_RE.finditer(buf, pos):
+            token = match.group()
+            if token == "{":
+                depth += 1
+            elif token == "}":
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+            elif match.group(1) is None:
+                # String runs past the end of what we have so far
+                return -1
+        return -1
+
+    def _element(self, text: str) -> None:
+        self.scanned += 1
+        fields = dict(_STREAM_FIELD_RE.findall(text))
+        if self._is_candidate(
+            fields.get("hex"), fields.get("t"), fields.get("category")
+        ):
+            self.planes.append(_json_decode(text))
+
+
+def read_aircraft_file_streaming(path: str, parser: StreamingAircraftParser) -> None:
+    """
+    Feed a local aircraft.json into parser in STREAM_CHUNK_BYTES chunks.
+    """
+    with open(path, "rb") as json_file:
+        while True:
+            chunk = json_file.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+
+
+def _bincraft_frame(raw: bytes) -> tuple:
+    """
+    Decompress and validate a binCraft snapshot.
+
+    Returns:
+        tuple: (now, stride, body) - body is a memoryview of the whole records
+
+    Raises:
+        ValueError: If the data is truncated, zstd-compressed without zstandard
+            installed, or the stride is too short for the known record layout
+    """
+    if raw[:4] == ZSTD_MAGIC:
+        if not _zstd_available:
+            raise ValueError(
+                "binCraft is zstd-compressed but zstandard is not installed"
+            )
+        raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+
+    if len(raw) < BINCRAFT_VERSION.size:
+        raise ValueError(f"binCraft too short ({len(raw)} bytes)")
+    now_lo, now_hi, stride, _ = BINCRAFT_HEADER.unpack_from(raw)
+    (version,) = BINCRAFT_VERSION.unpack_from(raw)
+    if version not in BINCRAFT_VERSIONS and version not in _bincraft_unknown_versions:
+        _bincraft_unknown_versions.add(version)
+        logger.warning(
+            "binCraft version %d not among those checked (%s) - decoding it with "
+            "the same record layout; report wrong positions with the readsb version",
+            version,
+            ", ".join(map(str, BINCRAFT_VERSIONS)),
+        )
+    if stride < BINCRAFT_RECORD_BYTES:
+        raise ValueError(
+            f"binCraft stride {stride} shorter than {BINCRAFT_RECORD_BYTES}"
+        )
+    now = now_lo / 1000 + now_hi * 4294967.296
+
+    body = memoryview(raw)[stride:]
+    usable = len(body) - len(body) % stride
+    return now, stride, body[:usable]
+
+
+def _bincraft_record(stride: int) -> struct.Struct:
+    return struct.Struct(BINCRAFT_RECORD_FORMAT + f"{stride - BINCRAFT_RECORD_BYTES}x")
+
+
+def _bincraft_plane(fields) -> dict:
+    """
+    Turn one unpacked binCraft record into an aircraft.json-style dict.
+    """
+    (
+        addr,
+        seen_pos,
+        seen,
+        lon,
+        lat,
+        alt_baro,
+        alt_geom,
+        squawk,
+        gs,
+        track,
+        category,
+        emergency_type,
+        airground,
+        valid0,
+        valid1,
+        valid2,
+        valid3,
+        valid4,
+        flight,
+        db_flags,
+        type_code,
+        registration,
+        receiver_count,
+        rssi,
+    ) = fields
+    icao_hex = format(addr & 0xFFFFFF, "06x")
+    plane = {
+        "hex": "~" + icao_hex if addr & 0x1000000 else icao_hex,
+        "seen": seen / 10,
+        "rssi": round(10 * math.log10(rssi * rssi / 65025 + 1.125e-5), 1),
+    }
+    addr_type = emergency_type >> 4
+    if addr_type < len(BINCRAFT_ADDR_TYPES):
+        plane["type"] = BINCRAFT_ADDR_TYPES[addr_type]
+    if category:
+        plane["category"] = format(category, "02X")
+    if valid0 & 8:
+        plane["flight"] = flight.split(b"\0", 1)[0].decode("ascii", "replace")
+    if (airground & 15) == 1:
+        plane["alt_baro"] = "ground"
+    elif valid0 & 16:
+        plane["alt_baro"] = alt_baro * 25
+    if valid0 & 32:
+        plane["alt_geom"] = alt_geom * 25
+    if valid0 & 64:
+        plane["lat"] = lat / 1e6
+        plane["lon"] = lon / 1e6
+        plane["seen_pos"] = seen_pos / 10
+    if valid0 & 128:
+        plane["gs"] = gs / 10
+    if valid1 & 8:
+        plane["track"] = track / 90
+    if valid3 & 4:
+        plane["squawk"] = format(squawk, "04x")
+    if db_flags:
+        plane["dbFlags"] = db_flags
+    type_code = type_code.split(b"\0", 1)[0]
+    if type_code:
+        plane["t"] = type_code.decode("ascii", "replace")
+    registration = registration.split(b"\0", 1)[0]
+    if registration:
+        plane["r"] = registration.decode("ascii", "replace")
+    return plane
+
+
+def decode_bincraft(raw: bytes) -> dict:
+    """
+    Decode a readsb binCraft snapshot (optionally zstd-compressed) in bulk.
+
+    Records are unpacked with struct.iter_unpack and turned into the same
+    per-plane dicts aircraft.json provides (hex, t, r, flight, category, dbFlags,
+    seen_pos, lat, lon, alt_baro, alt_geom, gs, track, squawk, rssi, type).
+    Fields whose validity bit is clear are left out, as readsb does in JSON.
+
+    Returns:
+        dict: {"now": float, "aircraft": list[dict]}
+
+    Raises:
+        ValueError: If the data is truncated, zstd-compressed without zstandard
+            installed, written with an unsupported binCraftVersion, or the stride
+            is too short for the known record layout
+    """
+    now, stride, body = _bincraft_frame(raw)
+    record = _bincraft_record(stride)
+    planes = [_bincraft_plane(fields) for fields in record.iter_unpack(body)]
+    return {"now": now, "aircraft": planes}
+
+
+def decode_bincraft_numpy(raw: bytes) -> dict:
+    """
+    Decode only the rotorcraft records of a binCraft snapshot (numpy engine).
+
+    The records are viewed in place as a NumPy structured array and the
+    rotorcraft mask - type designator, Bills hex or category A7, as in
+    RotorcraftClassifier - is computed column-wise. Only matching rows are
+    unpacked, by the same code decode_bincraft uses, so the documents built
+    from them are identical.
+
+    Returns:
+        dict: {"now": float, "aircraft": list[dict], "scanned": int}
+
+    Raises:
+        ValueError: As decode_bincraft
+    """
+    now, stride, body = _bincraft_frame(raw)
+    records = np.frombuffer(
+        body,
+        dtype=np.dtype(
+            {
+                "names": ["addr", "category", "t"],
+                "formats": ["<i4", "u1", "S4"],
+                "offsets": [0, 64, 88],
+                "itemsize": stride,
+            }
+        ),
+    )
+    arrays = _rotorcraft_classifier.arrays()
+    mask = np.isin(records["t"], arrays["type_bytes"])
+    mask |= np.isin(records["addr"] & 0x1FFFFFF, arrays["bills_addrs"])
+    mask |= records["category"] == 0xA7
+
+    record = _bincraft_record(stride)
+    planes = [
+        _bincraft_plane(record.unpack_from(body, row * stride))
+        for row in np.flatnonzero(mask).tolist()
+    ]
+    return {"now": now, "aircraft": planes, "scanned": len(records)}
+
+
+def decode_aircraft_snapshot(raw: bytes) -> dict:
+    """
+    Decode a snapshot with the backend for INGEST_MODE (binCraft or JSON).
+
+    With the numpy batch engine a binCraft snapshot only yields the aircraft
+    the rotorcraft classifier matches.
+    """
+    if INGEST_MODE == "bincraft":
+        if _batch_engine == "numpy":
+            return decode_bincraft_numpy(raw)
+        return decode_bincraft(raw)
+    return decode_aircraft_json(raw)
+
+
+def count_skipped_cycle(reason: str) -> None:
+    """
+    Increment the skipped-cycle counter (and OTel mirror) for a reason.
+    """
+    if fcs_skipped_cycles is not None:
+        fcs_skipped_cycles.labels(reason=reason, feeder_id=FEEDER_ID).inc()
+    if _otel_fcs_skipped_cycles is not None:
+        _otel_fcs_skipped_cycles.add(
+            1, {"reason": reason, "feeder_id": FEEDER_ID or "unknown"}
+        )
+
+
+def count_rotorcraft_match(reason: str) -> None:
+    """
+    Count one rotorcraft classification for fcs_rotorcraft_matches by reason.
+    """
+    _cycle_match_counts[reason] = _cycle_match_counts.get(reason, 0) + 1
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """
+    Record the duration of one poll cycle stage (and OTel mirror).
+    """
+    if fcs_cycle_stage is not None:
+        fcs_cycle_stage.labels(stage=stage, feeder_id=FEEDER_ID).observe(seconds)
+    if _otel_fcs_cycle_stage is not None:
+        _otel_fcs_cycle_stage.record(
+            seconds, {"stage": stage, "feeder_id": FEEDER_ID or "unknown"}
+        )
+
+
+def record_cycle_counts(scanned: int, emitted: int) -> None:
+    """
+    Publish the aircraft scanned and rotorcraft emitted by the last poll cycle.
+    """
+    global _cycle_aircraft_scanned, _cycle_rotorcraft_emitted
+    _cycle_aircraft_scanned = scanned
+    _cycle_rotorcraft_emitted = emitted
+    if fcs_cycle_aircraft_scanned is not None:
+        fcs_cycle_aircraft_scanned.labels(feeder_id=FEEDER_ID).set(scanned)
+        fcs_cycle_rotorcraft_emitted.labels(feeder_id=FEEDER_ID).set(emitted)
+
+
+def count_suppressed_positions(reason: str, count: int = 1) -> None:
+    """
+    Increment the suppressed position counter (and OTel mirror) for a reason.
+    """
+    if fcs_suppressed_positions is not None:
+        fcs_suppressed_positions.labels(reason=reason, feeder_id=FEEDER_ID).inc(count)
+    if _otel_fcs_suppressed_positions is not None:
+        _otel_fcs_suppressed_positions.add(
+            count, {"reason": reason, "feeder_id": FEEDER_ID or "unknown"}
+        )
+
+
+def count_sbs_connection(result: str) -> None:
+    """
+    Increment the SBS connection counter (and OTel mirror) for a result.
+    """
+    if fcs_sbs_connections is not None:
+        fcs_sbs_connections.labels(result=result, feeder_id=FEEDER_ID).inc()
+    if _otel_fcs_sbs_connections is not None:
+        _otel_fcs_sbs_connections.add(
+            1, {"result": result, "feeder_id": FEEDER_ID or "unknown"}
+        )
+
+
+def aircraft_file_mtime(path: str) -> int | None:
+    """
+    Return path's mtime in nanoseconds, or None if it cannot be stat'd.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def aircraft_file_unchanged(path: str, mtime_ns: int | None) -> bool:
+    """
+    Return True if path has the same mtime as when it was last decoded.
+    """
+    return mtime_ns is not None and _aircraft_file_mtimes.get(path) == mtime_ns
+
+
+def remember_aircraft_validators(response: requests.Response) -> None:
+    """
+    Record the ETag / Last-Modified of a 200 response once its body has been
+    decoded, so a truncated or unparseable snapshot is fetched in full again
+    instead of being answered with 304 from then on.
+    """
+    global _aircraft_etag, _aircraft_last_modified
+    _aircraft_etag = response.headers.get("ETag")
+    _aircraft_last_modified = response.headers.get("Last-Modified")
+
+
+def remember_aircraft_file_mtime(path: str, mtime_ns: int | None) -> None:
+    """
+    Record the mtime of a snapshot once it has been decoded, so a half-written
+    file that failed to decode is read again on the next cycle.
+    """
+    if mtime_ns is not None:
+        _aircraft_file_mtimes[path] = mtime_ns
+
+
+def find_local_aircraft_file() -> str | None:
+    """
+    Return the path of AIRCRAFT_FILE in the active receiver folder under /run.
+
+    AIRPLANES_FOLDERS is probed only until a folder is found; that folder is then
+    cached until forget_local_aircraft_folder() is called after a failed read.
+    """
+    global _active_airplanes_folder
+
+    if _active_airplanes_folder is None:
+        for airplanes_folder in AIRPLANES_FOLDERS:
+            if os.path.exists("/run/" + airplanes_folder + "/" + AIRCRAFT_FILE):
+                _active_airplanes_folder = airplanes_folder
+                logger.info("Reading aircraft data from /run/%s", airplanes_folder)
+                break
+            logger.info(
+                "File not Found: %s", "/run/" + airplanes_folder + "/" + AIRCRAFT_FILE
+            )
+        else:
+            return None
+
+    return "/run/" + _active_airplanes_folder + "/" + AIRCRAFT_FILE
+
+
+def forget_local_aircraft_folder() -> None:
+    """
+    Drop the cached receiver folder so the next cycle searches AIRPLANES_FOLDERS.
+    """
+    global _active_airplanes_folder
+    _active_airplanes_folder = None
+
+
+def load_inotify():
+    """
+    Return libc with inotify_init1 / inotify_add_watch, or None where unavailable.
+    """
+    global _inotify_libc
+
+    if _inotify_libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+        except (OSError, AttributeError, TypeError):
+            return None
+        _inotify_libc = libc
+    return _inotify_libc
+
+
+class AircraftFileWatcher:
+    """
+    inotify watch on a receiver folder that reports writes to one file.
+
+    readsb and dump1090 either rewrite aircraft.json in place (IN_CLOSE_WRITE) or
+    write a temporary file and rename it over (IN_MOVED_TO); either counts as a
+    new snapshot. The folder being removed or moved marks the watcher gone.
+    """
+
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, len - then len bytes of name
+
+    def __init__(self, directory: str, filename: str):
+        libc = load_inotify()
+        if libc is None:
+            raise OSError("inotify is not available")
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        wd = libc.inotify_add_watch(
+            fd,
+            os.fsencode(directory),
+            IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF,
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, os.strerror(err), directory)
+        self.directory = directory
+        self.filename = os.fsencode(filename)
+        self.gone = False
+        self._fd = fd
+
+    def wait(self, timeout) -> bool:
+        """
+        Block up to timeout seconds; True if the file was written (or may have been).
+        """
+        deadline = time() + timeout
+        while True:
+            remaining = deadline - time()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready and self._read_events():
+                return True
+
+    def _read_events(self) -> bool:
+        written = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return written
+            offset = 0
+            while offset < len(buf):
+                _wd, mask, _cookie, length = self.EVENT.unpack_from(buf, offset)
+                offset += self.EVENT.size
+                name = buf[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    self.gone = True
+                    written = True
+                elif mask & IN_Q_OVERFLOW or name == self.filename:
+                    written = True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def wait_for_local_snapshot(timeout) -> None:
+    """
+    Sleep until the receiver writes AIRCRAFT_FILE in the active folder, or timeout.
+
+    Uses an inotify watcher on the cached folder when LOCAL_WATCH is set; falls
+    back to a plain sleep when no folder is known yet or inotify is unavailable.
+    A watch that fails to start is tried again with backoff; a platform without
+    inotify falls back to plain sleeps for the rest of the run.
+    """
+    global _aircraft_watcher, _aircraft_watch_retry_at, _aircraft_watch_backoff
+    global LOCAL_WATCH
+
+    directory = "/run/" + _active_airplanes_folder if _active_airplanes_folder else None
+    if _aircraft_watcher is not None and (
+        _aircraft_watcher.gone or _aircraft_watcher.directory != directory
+    ):
+        close_aircraft_watcher()
+
+    if (
+        _aircraft_watcher is None
+        and LOCAL_WATCH
+        and directory is not None
+        and time() >= _aircraft_watch_retry_at
+    ):
+        if load_inotify() is None:
+            logger.warning(
+                "inotify is not available - using fixed sleeps for the rest of the run"
+            )
+            LOCAL_WATCH = False
+        else:
+            try:
+                _aircraft_watcher = AircraftFileWatcher(directory, AIRCRAFT_FILE)
+                logger.info("Watching %s for %s writes", directory, AIRCRAFT_FILE)
+                _aircraft_watch_backoff = LOCAL_WATCH_RETRY_SECS
+            except OSError as e:
+                logger.warning(
+                    "Cannot watch %s (%s) - using fixed sleeps, retrying in %ds",
+                    directory,
+                    e,
+                    _aircraft_watch_backoff,
+                )
+                _aircraft_watch_retry_at = time() + _aircraft_watch_backoff
+                _aircraft_watch_backoff = min(
+                    _aircraft_watch_backoff * 2, LOCAL_WATCH_RETRY_MAX_SECS
+                )
+
+    if _aircraft_watcher is None:
+        logger.debug("sleeping %s...", timeout)
+        sleep(timeout)
+    elif not _aircraft_watcher.wait(timeout):
+        logger.debug("No %s write within %ss", AIRCRAFT_FILE, timeout)
+
+
+def close_aircraft_watcher() -> None:
+    global _aircraft_watcher
+    if _aircraft_watcher is not None:
+        _aircraft_watcher.close()
+        _aircraft_watcher = None
+
+
+def _record_otel_update_duration(func):
+    """
+    Decorator to record fcs_update_helidb duration to OTel histogram and as
+    the "total" cycle stage.
+    """
+
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            observe_stage("total", duration)
+            if _otel_fcs_update_heli_duration is not None:
+                _otel_fcs_update_heli_duration.record(
+                    duration, {"feeder_id": FEEDER_ID or "unknown"}
+                )
+
+    return wrapper
+
+
+# Values copied from an aircraft.json entry into the position document, one row
+# per field: (source key, converter, clamp, default, output key). A missing key,
+# or a value the converter rejects (e.g. alt_baro "ground"), gives the default;
+# clamp is (low, high) with None for an open end. lat, lon and seen_pos are
+# consumed by build_heli_document, every other output key becomes a property.
+AIRCRAFT_FIELDS = (
+    ("seen_pos", float, None, 0, "seen_pos"),
+    ("lat", float, None, None, "lat"),
+    ("lon", float, None, None, "lon"),
+    ("track", float, None, None, "heading"),
+    ("squawk", str, None, None, "squawk"),
+    # Assumtion is made that negative altitude is unlikely
+    ("alt_baro", float, (0.0, None), None, "altitude_baro"),
+    ("alt_geom", float, (0.0, None), None, "altitude_geo"),
+    ("gs", float, None, None, "groundspeed"),
+    ("rssi", float, None, None, "rssi"),
+    # See https://github.com/wiedehopf/readsb/blob/dev/README-json.md
+    ("type", clean_source, None, None, "source"),
+)
+
+
+def compile_field_extractor(specs):
+    """
+    Compile a field-spec table into a function mapping an aircraft dict to values.
+
+    The table is normalized once; the returned extractor then does one dict
+    lookup and one conversion per row, and only raises internally when a value
+    is present but not convertible.
+
+    Args:
+        specs: Rows of (source key, converter, clamp, default, output key)
+
+    Returns:
+        Callable[[dict], dict]: Extractor returning {output key: value}
+    """
+    rows = tuple(
+        (
+            source_key,
+            converter,
+            clamp[0] if clamp else None,
+            clamp[1] if clamp else None,
+            default,
+            output_key,
+        )
+        for source_key, converter, clamp, default, output_key in specs
     )
+    missing = object()
+
+    def extract(plane: dict) -> dict:
+        values = {}
+        for source_key, converter, low, high, default, output_key in rows:
+            value = plane.get(source_key, missing)
+            if value is missing:
+                values[output_key] = default
+                continue
+            try:
+                value = converter(value)
+            except (TypeError, ValueError):
+                values[output_key] = default
+                continue
+            if low is not None:
+                value = max(low, value)
+            if high is not None:
+                value = min(high, value)
+            values[output_key] = value
+        return values
+
+    return extract
+
+
+extract_aircraft_fields = compile_field_extractor(AIRCRAFT_FIELDS)
+
+
+class SnapshotContext:
+    """
+    Everything derived from a snapshot's "now", computed once for all its aircraft.
+
+    Attributes:
+        dt_stamp (float): "now" in seconds since the epoch
+        utc_time (datetime): "now" as an aware UTC datetime (createdDate)
+        readable_time (str): "now" in DISPLAY_TIMEZONE, as stored in readableTime
+        received (float): local time the snapshot was processed, for idle
+            tracking (recent_flights, fcs_rx series) independent of the receiver clock
+    """
+
+    def __init__(self, dt_stamp: float, tz_name: str | None = None):
+        self.dt_stamp = dt_stamp
+        self.received = time()
+        self.utc_time = datetime.fromtimestamp(dt_stamp, tz=timezone.utc)
+        display_time = self.utc_time.astimezone(ZoneInfo(tz_name or DISPLAY_TIMEZONE))
+        self.readable_time = display_time.strftime("%Y-%m-%d %H:%M:%S (%I:%M:%S %p)")
+
+
+@functools.lru_cache(maxsize=1024)
+def position_times(dt_stamp: float, seen_pos: float) -> tuple:
+    """
+    Return (date, jsDate) for a position seen seen_pos seconds before dt_stamp.
+
+    Cached: aircraft in one snapshot often share a seen_pos (0 for SBS), and an
+    aircraft that has not moved repeats the same pair across snapshots.
+    """
+    date = dt_stamp - seen_pos
+    return date, datetime.fromtimestamp(date, tz=timezone.utc)
+
+
+class LogFields:
+    """
+    Key/value fields for a log record, rendered as logfmt only when formatted.
+
+    Pass the instance as a %s argument and its .fields as extra=, so text logs
+    read "key=value ..." and structured handlers (OTel, JSON formatters) get
+    each key as a record attribute without re-parsing the message.
+    """
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        parts = []
+        for key, value in self.fields.items():
+            value = str(value)
+            if not value or " " in value or '"' in value or "=" in value:
+                value = json.dumps(value)
+            parts.append(f"{key}={value}")
+        return " ".join(parts)
+
+
+def heli_report(
+    context, icao_hex, heli_type, heli_tail, callsign_label, fields, lat=None, lon=None
+) -> LogFields:
+    """
+    Structured fields for the per-aircraft "Heli Reported" log line.
+
+    Only called once the logger is known to be enabled for INFO. Fields with no
+    value are left out.
+    """
+    report = {
+        "icao": icao_hex,
+        "now": context.dt_stamp,
+        "heli_type": heli_type,
+        "tail": heli_tail,
+        "call": callsign_label,
+    }
+    for key, value in fields.items():
+        if value is not None:
+            report[key] = value
+    if lat is not None and lon is not None:
+        report["lat"] = lat
+        report["lon"] = lon
+    return LogFields(report)
 
-    # Set the signal handler to dump recents
 
-    signal.signal(signal.SIGUSR1, dump_recents)
+def classify_plane(plane) -> tuple | None:
+    """
+    Classify one aircraft record with the rotorcraft classifier.
+
+    Returns:
+        tuple: (icao_hex, category, match_reason) for a rotorcraft, else None
+    """
+    # if search_bills(icao_hex, "hex") is not None:
+    #     logger.debug("%s found in Bills", icao_hex)
+    # else:
+    #     logger.debug("%s not found in Bills", icao_hex)
 
     try:
-        #        with open("/run/" + AIRPLANES_FOLDER + "/aircraft.json") as json_file:
-        #        data = json.load(json_file)
-        #       planes = data["aircraft"]
+        icao_hex = str(plane["hex"]).lower()
 
-        #       Use this if checking returns from the request
-        #       req = requests.get('http://localhost:8080/data/aircraft.json')
-        #       planes = req.json()["aircraft"]
+    except BaseException:
+        logger.debug("Aircraft entry without a hex - skipping")
+        return None
 
-        #       use this if assuming the request succeeds and spits out json
+    if "category" in plane:
+        category = plane["category"]
+    else:
+        category = "Unk"
 
-        data = None
+    # Should identify anything reporting itself as Wake Category A7 / Rotorcraft or listed in Bills
 
-        # The following if / else should probably be outside of this function as
-        # it should only be done at startup time.
+    match_reason = _rotorcraft_classifier.classify(icao_hex, plane.get("t"), category)
+    if match_reason is None:
+        logger.debug("%s Not a rotorcraft ", icao_hex)
+        return None
 
-        if AIRCRAFT_URL:
-            try:
-                data = requests.get(AIRCRAFT_URL, timeout=15)
-                data.raise_for_status()
-                if data.status_code == 200:
-                    logger.debug("Found data at URL: %s", AIRCRAFT_URL)
-                    # "now" is a 10.1 digit seconds since the epoch timestamp
-                    dt_stamp = data.json()["now"]
-                    logger.debug("Found TimeStamp %s", dt_stamp)
-                    planes = data.json()["aircraft"]
-                elif data.status_code >= 400:
-                    logger.warning(
-                        "Received error %d from request for aircraft.json - sleeping 30",
-                        data.status_code,
-                    )
-                    sleep(30)
-                    return None
+    logger.debug("%s classified as rotorcraft by %s", icao_hex, match_reason)
+    count_rotorcraft_match(match_reason)
+    return icao_hex, category, match_reason
 
-            except requests.exceptions.RequestException as e:
-                logger.error(
-                    "Got ConnectionError trying to request URL %s - sleeping 30", e
-                )
-                # raise SystemExit(e)
-                sleep(30)
-                return e
 
-        else:
-            for airplanes_folder in AIRPLANES_FOLDERS:
-                if os.path.exists("/run/" + airplanes_folder + "/aircraft.json"):
-                    with open(
-                        "/run/" + airplanes_folder + "/aircraft.json"
-                    ) as json_file:
-                        logger.debug(
-                            "Loading data from file: %s ",
-                            "/run/" + airplanes_folder + "/aircraft.json",
-                        )
-                        data = json.load(json_file)
-                        planes = data["aircraft"]
-                        # "now" is a 10.1 digit seconds since the epoch timestamp
-                        dt_stamp = data["now"]
-                        logger.debug("Found TimeStamp %s", dt_stamp)
-                        break
-                else:
-                    logger.info(
-                        "File not Found: %s",
-                        "/run/" + airplanes_folder + "/aircraft.json",
-                    )
+def build_heli_document(plane, context, interval, classified=None):
+    """
+    Classify one aircraft record and build its position document.
 
-        if not data:
+    Args:
+        plane (dict): One aircraft entry in aircraft.json form
+        context (SnapshotContext): Snapshot time and the values derived from it
+        interval (int): Maximum age in seconds for position data to be considered valid
+        classified (tuple): classify_plane() result, when the caller already
+            classified the aircraft
 
-            logger.error("No aircraft data read")
+    Returns:
+        tuple: (mydict, dbFlags) ready for submit_mongo_docs(), or None when
+        the aircraft is not a rotorcraft or has no current position
+    """
+
+    # aircrafts.json documented here (and elsewhere):
+    # https://github.com/flightaware/dump1090/blob/master/README-json.md
+    # https://github.com/wiedehopf/readsb/blob/dev/README-json.md
+    #
+    # There is a ts in the json output - should we use that?
+    #        dt = ts = datetime.datetime.now().timestamp()
+    # dt_stamp = datetime.datetime.now().timestamp()
+
+    callsign = None
+    callsign_label = "no_call"
+    call_payload = None
+    heli_type = ""
+    heli_tail = ""
+
+    if classified is None:
+        classified = classify_plane(plane)
+        if classified is None:
             return None
-            # sys.exit()
+    icao_hex, category, _match_reason = classified
 
-        # dt_stamp = data.json()["now"]
-        # logger.debug("Found TimeStamp %s", dt_stamp)
-        # planes = data.json()["aircraft"]
+    # if (search_bills(icao_hex, "hex") != None) or category == "A7":
 
-    except (ValueError, UnboundLocalError, AttributeError) as err:
-        logger.error("JSON Decode Error: %s", err)
-        return err
-        # sys.exit()
+    try:
+        # icao_hex = str(plane["hex"]).lower()
+        # heli_type = find_helis(icao_hex)
+        heli_type = search_bills(icao_hex, "type")
+        if heli_type is not None:
+            logger.debug("Using heli_type from bills: %s", heli_type)
+        elif "t" in plane and plane["t"] != "":
+            heli_type = str(plane["t"])
+            add_to_htypes(icao_hex, "type", heli_type)
+            add_to_htypes(icao_hex, "src", "spot")
+            logger.debug("Using heli_type from aircraft.json: %s", heli_type)
+        # heli_tail = search_bills(icao_hex, "tail")
+        else:
+            heli_type = "no type"
+            logger.debug("No heli_type identified: %s", heli_type)
 
-    logger.debug("Aircraft to check: %d", len(planes))
+    except BaseException:
+        heli_type = "no type"
 
-    for plane in planes:
-        output = ""
-        # aircrafts.json documented here (and elsewhere):
-        # https://github.com/flightaware/dump1090/blob/master/README-json.md
-        # https://github.com/wiedehopf/readsb/blob/dev/README-json.md
-        #
-        # There is a ts in the json output - should we use that?
-        #        dt = ts = datetime.datetime.now().timestamp()
-        # dt_stamp = datetime.datetime.now().timestamp()
+    try:
+        # icao_hex = str(plane["hex"]).lower()
+        # heli_type = find_helis(icao_hex)
+        # heli_type = search_bills(icao_hex, "type")
+
+        heli_tail = str(plane.get("r", "")).strip()
+
+        # If no registration found in aircraft data, check bills database
+        if not heli_tail:
+            heli_tail = search_bills(icao_hex, "tail")
+            if heli_tail:
+                logger.debug(
+                    "Using registration from bills database for %s: %s",
+                    icao_hex,
+                    heli_tail,
+                )
+        else:
+            logger.debug(
+                "Using registration from aircraft data for %s: %s",
+                icao_hex,
+                heli_tail,
+            )
 
-        output += str(dt_stamp)
+        # If still no registration found, use default value
+        if not heli_tail:
+            heli_tail = "no reg"
+            logger.debug("No registration found for %s, using default", icao_hex)
+
+    except Exception as e:
+        logger.error("Error processing registration for %s: %s", icao_hex, str(e))
+        heli_tail = "no reg"
+
+    raw_flight = str(plane.get("flight", "")).strip()
+    if raw_flight:
+        callsign = raw_flight
+        callsign_label = raw_flight
+        call_payload = raw_flight
+        logger.debug("Flight: %s", callsign)
+    else:
+        # callsign = "no_call"
+        # callsign = ""
+        # callsign = None
         callsign = None
         callsign_label = "no_call"
         call_payload = None
-        heli_type = ""
-        heli_tail = ""
 
-        # if search_bills(icao_hex, "hex") is not None:
-        #     logger.debug("%s found in Bills", icao_hex)
-        # else:
-        #     logger.debug("%s not found in Bills", icao_hex)
+    if "dbFlags" in plane:
+        dbFlags = plane["dbFlags"]
+    else:
+        dbFlags = None
 
-        try:
-            icao_hex = str(plane["hex"]).lower()
+    if "ownOp" in plane:
+        ownOp = plane["ownOp"]
+    else:
+        ownOp = None
 
-        except BaseException:
-            output += " Error coverting to lowercase"
+    recent, previous_callsign = recent_flights.touch(
+        icao_hex, callsign_label, context.received
+    )
+    if previous_callsign is None:
+        logger.debug(
+            "Added %s to recents (%d) as %s",
+            icao_hex,
+            len(recent_flights),
+            callsign_label,
+        )
+    elif previous_callsign != callsign_label:
+        logger.debug(
+            "Updating %s in recents as: %s - was:  %s",
+            icao_hex,
+            callsign_label,
+            previous_callsign,
+        )
+    else:
+        logger.debug(
+            "Incrmenting %s callsign %s to %d", icao_hex, recent.callsign, recent.seen
+        )
 
-        if "category" in plane:
-            category = plane["category"]
-        else:
-            category = "Unk"
+    # Prometheus counter
+    count_rx(icao_hex, callsign_label, context.received)
 
-        # Should identify anything reporting itself as Wake Category A7 / Rotorcraft or listed in Bills
+    logger.info(
+        "Aircraft: %s is rotorcraft - Category: %s flight: %s tail: %s type: %s dbFlags: %s seen: %d times",
+        icao_hex,
+        category,
+        recent.callsign,
+        heli_tail or "Unknown",
+        heli_type or "Unknown",
+        dbFlags,
+        recent.seen,
+    )
 
-        if "t" in plane and plane["t"] in icao_heli_types:
-            logger.debug(f"ICAO Type {plane['t']} found in icao_heli_types")
-            # else:
-            #   logger.debug(f"ICAO Type {plane['t']} not found in icao_heli_types")
+    # if not heli_type or heli_type is None:
+    # if not heli_type:
+    #     # This short circuits parsing of aircraft with unknown icao_hex codes
 
-            # if (search_bills(icao_hex, "hex") != None) or category == "A7":
+    #     logger.debug("%s Not a known rotorcraft ", icao_hex)
+    #     continue
 
-            try:
-                # icao_hex = str(plane["hex"]).lower()
-                # heli_type = find_helis(icao_hex)
-                heli_type = search_bills(icao_hex, "type")
-                if heli_type is not None:
-                    logger.debug(f"Using heli_type from bills: {heli_type}")
-                elif "t" in plane and plane["t"] != "":
-                    heli_type = str(plane["t"])
-                    add_to_htypes(icao_hex, "type", heli_type)
-                    add_to_htypes(icao_hex, "src", "spot")
-                    logger.debug(f"Using heli_type from aircraft.json: {heli_type}")
-                # heli_tail = search_bills(icao_hex, "tail")
-                else:
-                    heli_type = "no type"
-                    logger.debug(f"No heli_type identified: {heli_type}")
-                output += " " + heli_type
+    logger.debug("Parsing Helicopter: %s", icao_hex)
 
-            except BaseException:
-                output += " no type "
+    fields = extract_aircraft_fields(plane)
 
-            try:
-                # icao_hex = str(plane["hex"]).lower()
-                # heli_type = find_helis(icao_hex)
-                # heli_type = search_bills(icao_hex, "type")
-
-                heli_tail = str(plane.get("r", "")).strip()
-
-                # If no registration found in aircraft data, check bills database
-                if not heli_tail:
-                    heli_tail = search_bills(icao_hex, "tail")
-                    if heli_tail:
-                        logger.debug(
-                            "Using registration from bills database for %s: %s",
-                            icao_hex,
-                            heli_tail,
-                        )
-                else:
-                    logger.debug(
-                        "Using registration from aircraft data for %s: %s",
-                        icao_hex,
-                        heli_tail,
-                    )
+    # seen_pos is an offset in seconds from "now" time to when last position was seen
+    seen_pos = fields.pop("seen_pos")
+    logger.debug("seen_pos: %.2f", seen_pos)
 
-                # If still no registration found, use default value
-                if not heli_tail:
-                    heli_tail = "no reg"
-                    logger.debug(
-                        "No registration found for %s, using default", icao_hex
-                    )
+    if seen_pos > interval:
+        logger.info(
+            "Seen_pos (%.2f) > interval (%s): skipping %s", seen_pos, interval, icao_hex
+        )
+        return None
 
-                output += f" {heli_tail}"
+    lat = fields.pop("lat")
+    lon = fields.pop("lon")
 
-            except Exception as e:
-                logger.error(
-                    "Error processing registration for %s: %s", icao_hex, str(e)
-                )
-                heli_tail = "no reg"
-                output += " no reg"
-
-            raw_flight = str(plane.get("flight", "")).strip()
-            if raw_flight:
-                callsign = raw_flight
-                callsign_label = raw_flight
-                call_payload = raw_flight
-                logger.debug("Flight: %s", callsign)
-            else:
-                # callsign = "no_call"
-                # callsign = ""
-                # callsign = None
-                callsign = None
-                callsign_label = "no_call"
-                call_payload = None
-
-            if "dbFlags" in plane:
-                dbFlags = plane["dbFlags"]
-            else:
-                dbFlags = None
+    if lat is None or lon is None:
+        # this should cleanup null issue #9 for mongo
+        # updated 20240228 per discussion with SR
+        if logger.isEnabledFor(logging.INFO):
+            report = heli_report(
+                context, icao_hex, heli_type, heli_tail, callsign_label, fields
+            )
+            logger.info("No Lat/Lon - Not reported: %s", report, extra=report.fields)
+        return None
+    geometry = [lon, lat]
 
-            if "ownOp" in plane:
-                ownOp = plane["ownOp"]
-            else:
-                ownOp = None
+    source = fields["source"]
+    if source is not None:
+        count_source(source)
 
-            if icao_hex not in recent_flights:
-                recent_flights[icao_hex] = [callsign_label, 1]
-                logger.debug(
-                    "Added %s to recents (%d) as %s",
-                    icao_hex,
-                    len(recent_flights),
-                    callsign_label,
-                )
-                fcs_rx.labels(
-                    icao=icao_hex, cs=callsign_label, feeder_id=FEEDER_ID
-                ).inc(1)
-                if _otel_fcs_rx is not None:
-                    _otel_fcs_rx.add(
-                        1,
-                        {
-                            "icao": icao_hex,
-                            "cs": callsign_label,
-                            "feeder_id": FEEDER_ID or "unknown",
-                        },
-                    )
-            elif (
-                icao_hex in recent_flights
-                and recent_flights[icao_hex][0] != callsign_label
-            ):
-                logger.debug(
-                    "Updating %s in recents as: %s - was:  %s",
-                    icao_hex,
-                    callsign_label,
-                    recent_flights[icao_hex][0],
-                )
-                recent_flights[icao_hex] = [
-                    callsign_label,
-                    recent_flights[icao_hex][1] + 1,
-                ]
-                fcs_rx.labels(
-                    icao=icao_hex, cs=callsign_label, feeder_id=FEEDER_ID
-                ).inc(1)
-                if _otel_fcs_rx is not None:
-                    _otel_fcs_rx.add(
-                        1,
-                        {
-                            "icao": icao_hex,
-                            "cs": callsign_label,
-                            "feeder_id": FEEDER_ID or "unknown",
-                        },
-                    )
+    if logger.isEnabledFor(logging.INFO):
+        report = heli_report(
+            context, icao_hex, heli_type, heli_tail, callsign_label, fields, lat, lon
+        )
+        logger.info("Heli Reported %s", report, extra=report.fields)
+
+    # if heli_type != "":
+    if icao_hex != "":
+        date, js_date = position_times(context.dt_stamp, seen_pos)
+
+        mydict = {
+            "type": "Feature",
+            "properties": {
+                # Date - "now" from aircraft.json in seconds from the unix epoch format
+                # Corrected with seen_pos
+                "date": date,
+                # jsDate - a datetime obect in utc timezone corrected by seen_pos
+                "jsDate": js_date,
+                # proposed but not implemented
+                # pythonDate - float seconds from the epoch corrected by seen_pos
+                # "pythonDate": dt_stamp - seen_pos,
+                #
+                # createdDate - datetime object of "now" from aircraft.json
+                "createdDate": context.utc_time,
+                "icao": icao_hex,
+                "type": heli_type,
+                "tail": heli_tail,
+                "call": call_payload,
+                # heading, squawk, altitude_baro, altitude_geo, groundspeed,
+                # rssi, source - see AIRCRAFT_FIELDS
+                **fields,
+                "feeder": FEEDER_ID,
+                "dbFlags": dbFlags,
+                "ownOp": ownOp,
+                # readableTime - string representation of "now" in DISPLAY_TIMEZONE
+                "readableTime": context.readable_time,
+            },
+            "geometry": {"type": "Point", "coordinates": geometry},
+        }
+        return mydict, dbFlags
 
-            else:
-                # increment the count
-                recent_flights[icao_hex][1] += 1
-                # Prometheus counter
-                fcs_rx.labels(
-                    icao=icao_hex, cs=callsign_label, feeder_id=FEEDER_ID
-                ).inc(1)
-                if _otel_fcs_rx is not None:
-                    _otel_fcs_rx.add(
-                        1,
-                        {
-                            "icao": icao_hex,
-                            "cs": callsign_label,
-                            "feeder_id": FEEDER_ID or "unknown",
-                        },
-                    )
+    return None
 
-                logger.debug(
-                    "Incrmenting %s callsign %s to %d",
-                    icao_hex,
-                    recent_flights[icao_hex][0],
-                    recent_flights[icao_hex][1],
-                )
 
-            if icao_hex in recent_flights:
+class RepeatFilter:
+    """
+    The last position emitted per aircraft, used to drop exact repeats.
 
-                logger.info(
-                    "Aircraft: %s is rotorcraft - Category: %s flight: %s tail: %s type: %s dbFlags: %s seen: %d times",
-                    icao_hex,
-                    category,
-                    recent_flights[icao_hex][0],
-                    heli_tail or "Unknown",
-                    heli_type or "Unknown",
-                    dbFlags,
-                    recent_flights[icao_hex][1],
-                )
+    A receiver keeps listing an aircraft whose position stopped updating, with a
+    growing seen_pos, so date (now - seen_pos), lat/lon and altitude come out the
+    same every cycle until seen_pos passes interval. now and seen_pos only carry
+    milliseconds, but their float difference can land either side of one, so
+    dates are compared as integer milliseconds.
+    """
 
-            else:
-                logger.info(
-                    "Aircraft: %s is rotorcraft - Category: %s flight: %s tail: %s type: %s dbFlag: %s",
-                    icao_hex,
-                    category,
-                    "(null)",
-                    heli_tail or "Unknown",
-                    heli_type or "Unknown",
-                    dbFlags,
-                )
-        else:
-            logger.debug("%s Not a rotorcraft ", icao_hex)
-            continue
+    def __init__(self):
+        self._last = {}
+
+    @staticmethod
+    def _date_ms(date: float) -> int:
+        return round(date * 1000)
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def filter(self, docs) -> list:
+        """
+        Return the (mydict, dbFlags) pairs that are not a repeat of the last one emitted.
+        """
+        last = self._last
+        kept = []
+        for doc in docs:
+            properties = doc[0]["properties"]
+            lon, lat = doc[0]["geometry"]["coordinates"]
+            position = (
+                self._date_ms(properties["date"]),
+                lon,
+                lat,
+                properties["altitude_baro"],
+            )
+            icao_hex = properties["icao"]
+            if last.get(icao_hex) == position:
+                continue
+            last[icao_hex] = position
+            kept.append(doc)
+        return kept
+
+    def prune(self, oldest_date: float) -> None:
+        """
+        Forget positions dated before oldest_date: they are too old to be listed again.
+        """
+        oldest_ms = self._date_ms(oldest_date)
+        stale = [
+            icao_hex
+            for icao_hex, position in self._last.items()
+            if position[0] < oldest_ms
+        ]
+        for icao_hex in stale:
+            del self._last[icao_hex]
+
+
+class LastPosition:
+    """
+    The last position emitted for one aircraft, as kept by the upload filters.
+    """
+
+    __slots__ = ("date", "lat", "lon", "altitude", "heading", "groundspeed")
+
+    def __init__(self, date, lat, lon, altitude, heading, groundspeed):
+        self.date = date
+        self.lat = lat
+        self.lon = lon
+        self.altitude = altitude
+        self.heading = heading
+        self.groundspeed = groundspeed
+
+    @classmethod
+    def from_doc(cls, doc):
+        """Return the LastPosition of a (mydict, dbFlags) pair."""
+        properties = doc[0]["properties"]
+        lon, lat = doc[0]["geometry"]["coordinates"]
+        return cls(
+            properties["date"],
+            lat,
+            lon,
+            properties["altitude_baro"],
+            properties["heading"],
+            properties["groundspeed"],
+        )
+
+
+def position_distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distance in metres between two nearby points (equirectangular approximation).
+    """
+    mean_lat = math.radians((lat1 + lat2) / 2)
+    dx = math.radians(lon2 - lon1) * math.cos(mean_lat)
+    dy = math.radians(lat2 - lat1)
+    return EARTH_RADIUS_M * math.hypot(dx, dy)
+
+
+def dead_reckon(last: LastPosition, date) -> tuple:
+    """
+    Return the (lat, lon) predicted for date from last's groundspeed and heading.
+
+    An aircraft without a groundspeed or heading is predicted to stay put.
+    """
+    if not last.groundspeed or last.heading is None:
+        return last.lat, last.lon
+    distance = last.groundspeed * METERS_PER_SEC_PER_KNOT * (date - last.date)
+    heading = math.radians(last.heading)
+    lat = last.lat + math.degrees(distance * math.cos(heading) / EARTH_RADIUS_M)
+    lon = last.lon + math.degrees(
+        distance
+        * math.sin(heading)
+        / (EARTH_RADIUS_M * max(0.01, math.cos(math.radians(last.lat))))
+    )
+    return lat, lon
+
+
+def heading_change(heading1: float, heading2: float) -> float:
+    """
+    Smallest angle in degrees between two headings.
+    """
+    change = abs(heading1 - heading2) % 360
+    return 360 - change if change > 180 else change
+
+
+def altitude_or_heading_changed(
+    last: LastPosition, position: LastPosition, min_altitude_ft, min_heading_deg
+) -> bool:
+    """
+    True when position climbed, descended or turned at least the given amounts
+    from last, or took off or landed (altitude_baro appeared or went away).
+    """
+    if (position.altitude is None) != (last.altitude is None):
+        return True
+    if (
+        position.altitude is not None
+        and abs(position.altitude - last.altitude) >= min_altitude_ft
+    ):
+        return True
+    return (
+        position.heading is not None
+        and last.heading is not None
+        and heading_change(position.heading, last.heading) >= min_heading_deg
+    )
+
+
+class ChangeFilter:
+    """
+    Emits a position only when it differs significantly from the last one emitted.
+
+    Significant: moved at least min_distance_m, altitude changed by at least
+    min_altitude_ft (or the aircraft went from ground to airborne or back),
+    heading changed by at least min_heading_deg, or heartbeat_secs passed.
+    """
+
+    reason = "change"
+
+    def __init__(
+        self,
+        min_distance_m: float,
+        min_altitude_ft: float,
+        min_heading_deg: float,
+        heartbeat_secs: float,
+    ):
+        self.min_distance_m = min_distance_m
+        self.min_altitude_ft = min_altitude_ft
+        self.min_heading_deg = min_heading_deg
+        self.heartbeat_secs = heartbeat_secs
+        self._last = {}
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def _significant(self, last: LastPosition, position: LastPosition) -> bool:
+        if position.date - last.date >= self.heartbeat_secs:
+            return True
+        distance = position_distance_m(last.lat, last.lon, position.lat, position.lon)
+        if distance >= self.min_distance_m:
+            return True
+        return altitude_or_heading_changed(
+            last, position, self.min_altitude_ft, self.min_heading_deg
+        )
+
+    def filter(self, docs) -> list:
+        """
+        Return the (mydict, dbFlags) pairs that are a significant change.
+        """
+        last_positions = self._last
+        kept = []
+        for doc in docs:
+            position = LastPosition.from_doc(doc)
+            icao_hex = doc[0]["properties"]["icao"]
+            last = last_positions.get(icao_hex)
+            if last is not None and not self._significant(last, position):
+                continue
+            last_positions[icao_hex] = position
+            kept.append(doc)
+        return kept
+
+    def forget(self, icao_hex: str) -> None:
+        """
+        Forget an aircraft's last position, so its next one is emitted.
+        """
+        self._last.pop(icao_hex, None)
+
+    def prune(self, now: float) -> None:
+        """
+        Forget aircraft whose next position is due by heartbeat anyway.
+        """
+        oldest_date = now - self.heartbeat_secs
+        stale = [
+            icao_hex for icao_hex, last in self._last.items() if last.date < oldest_date
+        ]
+        for icao_hex in stale:
+            del self._last[icao_hex]
+
+
+class DeadReckoningFilter(ChangeFilter):
+    """
+    Emits a position only when the last emitted one no longer predicts it.
+
+    The prediction moves the last emitted position along its heading at its
+    groundspeed (dead reckoning), so a track rebuilt the same way from the
+    uploaded positions stays within tolerance_m of every position dropped.
+    Climbs and descents of min_altitude_ft, turns of min_heading_deg, takeoff,
+    landing and heartbeat_secs without an upload also emit.
+    """
+
+    reason = "deadreckon"
+
+    def __init__(
+        self,
+        tolerance_m: float,
+        min_altitude_ft: float,
+        min_heading_deg: float,
+        heartbeat_secs: float,
+    ):
+        super().__init__(0, min_altitude_ft, min_heading_deg, heartbeat_secs)
+        self.tolerance_m = tolerance_m
+
+    def _significant(self, last: LastPosition, position: LastPosition) -> bool:
+        if position.date - last.date >= self.heartbeat_secs:
+            return True
+        lat, lon = dead_reckon(last, position.date)
+        if position_distance_m(lat, lon, position.lat, position.lon) > self.tolerance_m:
+            return True
+        return altitude_or_heading_changed(
+            last, position, self.min_altitude_ft, self.min_heading_deg
+        )
+
+
+_repeat_filter = RepeatFilter()
+_upload_filter = None  # ChangeFilter or DeadReckoningFilter, per UPLOAD_FILTER
+# icao hexes of emitted positions that were never written; appended from any
+# thread (writer, spool), drained by filter_positions on the poll loop
+_unwritten_positions = deque()
+
+
+def create_upload_filter(name: str):
+    """
+    Return a fresh filter for an UPLOAD_FILTER name, or None for "none".
+    """
+    if name == "change":
+        return ChangeFilter(
+            CHANGE_MIN_DISTANCE_M,
+            CHANGE_MIN_ALTITUDE_FT,
+            CHANGE_MIN_HEADING_DEG,
+            CHANGE_HEARTBEAT_SECS,
+        )
+    if name == "deadreckon":
+        return DeadReckoningFilter(
+            DEADRECKON_TOLERANCE_M,
+            DEADRECKON_ALTITUDE_FT,
+            DEADRECKON_TURN_DEG,
+            DEADRECKON_HEARTBEAT_SECS,
+        )
+    return None
+
+
+def forget_unwritten_positions(mydicts) -> None:
+    """
+    Report documents that will not be written (dropped, rejected, not spooled).
+
+    The upload filter emitted them and predicts from them, so each aircraft's
+    next position is uploaded instead of being judged against one the database
+    never received.
+    """
+    if _upload_filter is not None:
+        _unwritten_positions.extend(mydict["properties"]["icao"] for mydict in mydicts)
+
+
+def filter_positions(docs) -> list:
+    """
+    Run a batch of built documents through the enabled position filters.
+
+    Returns:
+        list: The (mydict, dbFlags) pairs to hand to submit_mongo_docs()
+    """
+    global _positions_built, _positions_uploaded
+    if not docs:
+        return docs
+    built = len(docs)
+    if SUPPRESS_REPEATS:
+        kept = _repeat_filter.filter(docs)
+        if len(kept) < len(docs):
+            logger.debug("Suppressed %d repeated positions", len(docs) - len(kept))
+            count_suppressed_positions("repeat", len(docs) - len(kept))
+        docs = kept
+    while _upload_filter is not None and _unwritten_positions:
+        _upload_filter.forget(_unwritten_positions.popleft())
+    if _upload_filter is not None and docs:
+        kept = _upload_filter.filter(docs)
+        if len(kept) < len(docs):
+            logger.debug(
+                "Suppressed %d positions by %s filter",
+                len(docs) - len(kept),
+                _upload_filter.reason,
+            )
+            count_suppressed_positions(_upload_filter.reason, len(docs) - len(kept))
+        docs = kept
+    _positions_built += built
+    _positions_uploaded += len(docs)
+    if fcs_built_positions is not None:
+        fcs_built_positions.labels(feeder_id=FEEDER_ID).inc(built)
+        fcs_upload_compression_ratio.labels(feeder_id=FEEDER_ID).set(
+            upload_compression_ratio()
+        )
+    if _otel_fcs_built_positions is not None:
+        _otel_fcs_built_positions.add(built, {"feeder_id": FEEDER_ID or "unknown"})
+    return docs
+
+
+def upload_compression_ratio() -> float:
+    """
+    Positions built per position uploaded since start (1.0 before any upload).
+    """
+    return _positions_built / _positions_uploaded if _positions_uploaded else 1.0
+
+
+def reset_position_filters() -> None:
+    """
+    Forget every aircraft's filter state (e.g. before replaying a recording again).
+    """
+    global _repeat_filter, _upload_filter
+    _repeat_filter = RepeatFilter()
+    _upload_filter = create_upload_filter(UPLOAD_FILTER)
+
+
+def prune_position_filters(now: float, interval) -> None:
+    """
+    Drop filter state that can no longer match (positions older than interval,
+    aircraft whose next position is due by heartbeat).
+    """
+    _repeat_filter.prune(now - interval)
+    if _upload_filter is not None:
+        _upload_filter.prune(now)
+
+
+@_record_otel_update_duration
+@fcs_update_heli_time.labels(feeder_id=FEEDER_ID).time()
+def fcs_update_helidb(interval):
+    """
+    Process and upload rotorcraft position data to the Helicopters of DC database.
+
+    This function is the main processing loop that:
+    1. Retrieves aircraft data from either a local file or URL endpoint
+    2. Filters for rotorcraft based on category or known ICAO codes
+    3. Processes position and flight data
+    4. Uploads valid entries to MongoDB in one batch per cycle
+    5. Updates tracking metrics
+
+    Args:
+        interval (int): Maximum age in seconds for position data to be considered valid
+
+    Returns:
+        None: Function runs continuously unless an error occurs
+        Exception: Returns error object if a critical error occurs during processing
+
+    Metrics:
+        - Updates Prometheus metrics for monitoring
+        - Maintains the bounded recent_flights tracker
+
+    Note:
+        Function is decorated with @fcs_update_heli_time.time() for performance monitoring.
+        Cycles are skipped (and counted in fcs_skipped_cycles) when the receiver
+        returns 304, the local file's mtime is unchanged, or "now" matches the
+        last processed snapshot.
+    """
+
+    global _last_processed_now
+
+    # local_time = datetime.now().astimezone()
+
+    logger.info(
+        "Updating Helidb at %s ",
+        datetime.now().astimezone().strftime("%Y-%m-%d %H:%M:%S %Z %z"),
+    )
 
-        # if not heli_type or heli_type is None:
-        # if not heli_type:
-        #     # This short circuits parsing of aircraft with unknown icao_hex codes
+    # Set the signal handler to dump recents
 
-        #     logger.debug("%s Not a known rotorcraft ", icao_hex)
-        #     continue
+    signal.signal(signal.SIGUSR1, dump_recents)
 
-        logger.debug("Parsing Helicopter: %s", icao_hex)
+    try:
+        #        with open("/run/" + AIRPLANES_FOLDER + "/aircraft.json") as json_file:
+        #        data = json.load(json_file)
+        #       planes = data["aircraft"]
 
-        try:
-            # seen_pos is an offset in seconds from "now" time to when last position was seen
-            if "seen_pos" in plane:
-                seen_pos = float(plane["seen_pos"])
-            else:
-                seen_pos = 0
-            logger.debug(f"seen_pos: {seen_pos:.2f}")
+        #       Use this if checking returns from the request
+        #       req = requests.get('http://localhost:8080/data/aircraft.json')
+        #       planes = req.json()["aircraft"]
 
-        except BaseException:
-            logger.warning("seen_pos error")
+        #       use this if assuming the request succeeds and spits out json
 
-        if seen_pos > interval:
-            logger.info(
-                f"Seen_pos ({seen_pos:.2f}) > interval ({interval}): skipping {icao_hex} "
-            )
-            continue
+        data = None
+        parser = StreamingAircraftParser() if INGEST_MODE == "stream" else None
 
-        try:
-            # note that this is somewhat redundant to callsign processing before being in this if stanza
-            # if "flight" in plane and not callsign or callsign is None:
-            if not callsign:
-                # should never get here - should be handled above
-                logger.debug("Callsign is empty or None")
-                callsign_label = "no_call"
-
-            output += " <" + callsign_label + ">"
-        except BaseException:
-            logger.debug("No 'flight' field or bad callsign data")
-            callsign_label = "no_call"
-            output += " <no_call>"
+        # The following if / else should probably be outside of this function as
+        # it should only be done at startup time.
 
-        try:
-            # Assumtion is made that negative altitude is unlikely
-            # Using max() here removes negative numbers
+        if AIRCRAFT_URL:
+            try:
+                stage_start = perf_counter()
+                data = fetch_aircraft_url(AIRCRAFT_URL, parser=parser)
+                observe_stage("fetch", perf_counter() - stage_start)
+                if data.status_code == 304:
+                    logger.debug("aircraft.json not modified - skipping cycle")
+                    count_skipped_cycle("not_modified")
+                    return None
+                elif data.status_code == 200 and parser is not None:
+                    logger.debug("Streamed data from URL: %s", AIRCRAFT_URL)
+                    dt_stamp = parser.now
+                    logger.debug("Found TimeStamp %s", dt_stamp)
+                    planes = parser.planes
+                    scanned = parser.scanned
+                    remember_aircraft_validators(data)
+                elif data.status_code == 200:
+                    logger.debug("Found data at URL: %s", AIRCRAFT_URL)
+                    stage_start = perf_counter()
+                    snapshot = decode_aircraft_snapshot(data.content)
+                    observe_stage("decode", perf_counter() - stage_start)
+                    # "now" is a 10.1 digit seconds since the epoch timestamp
+                    dt_stamp = snapshot["now"]
+                    logger.debug("Found TimeStamp %s", dt_stamp)
+                    planes = snapshot["aircraft"]
+                    scanned = snapshot.get("scanned", len(planes))
+                    remember_aircraft_validators(data)
+                elif data.status_code >= 400:
+                    logger.warning(
+                        "Received error %d from request for aircraft.json - sleeping 30",
+                        data.status_code,
+                    )
+                    idle(sleep, 30)
+                    return None
 
-            alt_baro = max(0.0, float(plane["alt_baro"]))
+            except requests.exceptions.RequestException as e:
+                logger.error(
+                    "Got ConnectionError trying to request URL %s - sleeping 30", e
+                )
+                # raise SystemExit(e)
+                idle(sleep, 30)
+                return e
 
-            # FR altitude
+        else:
+            aircraft_path = find_local_aircraft_file()
+            if aircraft_path is not None:
+                # stat before reading: a write after this is picked up next cycle
+                mtime_ns = aircraft_file_mtime(aircraft_path)
+                if aircraft_file_unchanged(aircraft_path, mtime_ns):
+                    logger.debug("aircraft.json mtime unchanged - skipping cycle")
+                    count_skipped_cycle("unchanged_mtime")
+                    return None
+                try:
+                    stage_start = perf_counter()
+                    if parser is not None:
+                        read_aircraft_file_streaming(aircraft_path, parser)
+                        observe_stage("fetch", perf_counter() - stage_start)
+                        data = parser
+                        planes = parser.planes
+                        scanned = parser.scanned
+                        dt_stamp = parser.now
+                        logger.debug("Found TimeStamp %s", dt_stamp)
+                    else:
+                        with open(aircraft_path, "rb") as json_file:
+                            logger.debug("Loading data from file: %s ", aircraft_path)
+                            raw = json_file.read()
+                        observe_stage("fetch", perf_counter() - stage_start)
+                        stage_start = perf_counter()
+                        data = decode_aircraft_snapshot(raw)
+                        observe_stage("decode", perf_counter() - stage_start)
+                        planes = data["aircraft"]
+                        scanned = data.get("scanned", len(planes))
+                        # "now" is a 10.1 digit seconds since the epoch timestamp
+                        dt_stamp = data["now"]
+                        logger.debug("Found TimeStamp %s", dt_stamp)
+                    remember_aircraft_file_mtime(aircraft_path, mtime_ns)
+                except OSError as e:
+                    logger.warning(
+                        "Could not read %s (%s) - searching receiver folders again",
+                        aircraft_path,
+                        e,
+                    )
+                    forget_local_aircraft_folder()
 
-            output += " altbaro " + str(alt_baro)
+        if not data:
 
-        except BaseException:
-            alt_baro = None
+            logger.error("No aircraft data read")
+            return None
+            # sys.exit()
 
-        try:
-            alt_geom = max(0.0, float(plane["alt_geom"]))
-            # FR altitude
-            output += " altgeom " + str(alt_geom)
+        # dt_stamp = data.json()["now"]
+        # logger.debug("Found TimeStamp %s", dt_stamp)
+        # planes = data.json()["aircraft"]
 
-        except BaseException:
-            alt_geom = None
+    except (ValueError, UnboundLocalError, AttributeError) as err:
+        logger.error("JSON Decode Error: %s", err)
+        return err
+        # sys.exit()
 
-        try:
-            # head = float(plane["r_dir"])
-            head = float(plane["track"])
-            # readsb/FR "track"
-            output += " head " + str(head)
+    if dt_stamp == _last_processed_now:
+        logger.debug("Snapshot now=%s already processed - skipping cycle", dt_stamp)
+        count_skipped_cycle("same_now")
+        return None
+    _last_processed_now = dt_stamp
+    recent_flights.expire(time())
+    expire_rx_series(time())
 
-        except BaseException:
-            head = None
-            output += " no heading"
+    logger.debug("Aircraft to check: %d of %d scanned", len(planes), scanned)
 
-        try:
-            lat = float(plane["lat"])
-            lon = float(plane["lon"])
-
-            output += " Lat: " + str(lat) + ", Lon: " + str(lon)
-
-            geometry = [lon, lat]
-
-        except BaseException:
-            lat = None
-            lon = None
-            # this should cleanup null issue #9 for mongo
-            # updated 20240228 per discussion with SR
-            # geometry = None
-            geometry = [None, None]
-            output += " Lat: " + str(lat) + ", Lon: " + str(lon)
-            logger.info("No Lat/Lon - Not reported: %s: %s", plane["hex"], output)
-            continue
+    stage_start = perf_counter()
+    rotorcraft = []
+    for plane in planes:
+        classified = classify_plane(plane)
+        if classified is not None:
+            rotorcraft.append((plane, classified))
+    observe_stage("classify", perf_counter() - stage_start)
+
+    # (mydict, dbFlags) pairs collected over the cycle and written in one batch
+    pending_docs = []
+
+    stage_start = perf_counter()
+    context = SnapshotContext(dt_stamp)
+    for plane, classified in rotorcraft:
+        doc = build_heli_document(plane, context, interval, classified)
+        if doc is not None:
+            pending_docs.append(doc)
+    flush_cycle_metrics()
+    observe_stage("build", perf_counter() - stage_start)
+
+    stage_start = perf_counter()
+    prune_position_filters(dt_stamp, interval)
+    pending_docs = filter_positions(pending_docs)
+    observe_stage("filter", perf_counter() - stage_start)
+
+    record_cycle_counts(scanned, len(pending_docs))
+
+    if pending_docs:
+        stage_start = perf_counter()
+        accepted = submit_mongo_docs(pending_docs)
+        observe_stage("sink", perf_counter() - stage_start)
+        logger.debug(
+            "Submitted %d of %d documents for insert", accepted, len(pending_docs)
+        )
 
-        try:
-            groundspeed = float(plane["gs"])
-            output += " gs " + str(groundspeed)
 
-        except BaseException:
-            groundspeed = None
+class SbsFeed:
+    """
+    Push ingest from readsb's SBS/BaseStation output (port 30003).
+
+    Keeps one TCP connection open and folds MSG lines into per-aircraft state
+    shaped like aircraft.json entries. Only aircraft listed in Bills are tracked
+    (SBS carries no type or category); their type comes from search_bills() and
+    every position update is run through build_heli_document(), at most once per
+    min_spacing seconds per aircraft. The connection is re-opened with
+    exponential backoff whenever it fails or drops.
+
+    SBS line layout (comma separated, 22 fields, by index):
+        0 MSG, 1 transmission type, 2 session id, 3 aircraft id, 4 hex,
+        5 flight id, 6 date generated, 7 time generated, 8 date logged,
+        9 time logged, 10 callsign, 11 altitude, 12 groundspeed, 13 track,
+        14 lat, 15 lon, 16 vertical rate, 17 squawk, 18 alert, 19 emergency,
+        20 spi, 21 is on ground
+    """
 
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        min_spacing: int = DEFAULT_SBS_MIN_SPACING_SECS,
+        state_ttl: int = DEFAULT_SBS_STATE_TTL_SECS,
+    ):
+        self.host = host
+        self.port = port
+        self.min_spacing = min_spacing
+        self.state_ttl = state_ttl
+        self._sock = None
+        self._buffer = b""
+        self._backoff = 1
+        self._next_connect = 0.0
+        self._next_prune = 0.0
+        # icao hex -> aircraft.json-style dict, and last message / emit times
+        self._planes = {}
+        self._last_seen = {}
+        self._last_emit = {}
+
+    def _connect(self) -> bool:
+        """
+        Open the connection unless still backing off. Returns True if connected.
+        """
+        if time() < self._next_connect:
+            return False
         try:
-            rssi = float(plane["rssi"])
-            output += " rssi " + str(rssi)
+            self._sock = socket.create_connection(
+                (self.host, self.port), timeout=AIRCRAFT_CONNECT_TIMEOUT_SECS
+            )
+        except OSError as e:
+            self._sock = None
+            logger.warning(
+                "SBS connect to %s:%d failed: %s - retrying in %ds",
+                self.host,
+                self.port,
+                e,
+                self._backoff,
+            )
+            count_sbs_connection("fail")
+            self._schedule_reconnect()
+            return False
+        logger.info("Connected to SBS feed at %s:%d", self.host, self.port)
+        count_sbs_connection("ok")
+        self._backoff = 1
+        self._buffer = b""
+        return True
 
-        except BaseException:
-            rssi = None
+    def _schedule_reconnect(self) -> None:
+        self._next_connect = time() + self._backoff
+        self._backoff = min(self._backoff * 2, SBS_RECONNECT_MAX_SECS)
 
-        try:
-            squawk = str(plane["squawk"])
-            output += " sq " + squawk
+    def _disconnect(self, reason) -> None:
+        logger.warning(
+            "SBS feed %s:%d lost (%s) - reconnecting in %ds",
+            self.host,
+            self.port,
+            reason,
+            self._backoff,
+        )
+        count_sbs_connection("lost")
+        self.close()
+        self._schedule_reconnect()
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def handle_line(self, line: str, context, interval):
+        """
+        Fold one SBS line into aircraft state.
+
+        Returns:
+            tuple: (mydict, dbFlags) when the line carried a position for a
+            tracked rotorcraft that is due to be emitted, otherwise None
+        """
+        now = context.dt_stamp
+        fields = line.split(",")
+        if len(fields) < 22 or fields[0] != "MSG":
+            return None
 
-        except BaseException:
-            # squawk = ""
-            squawk = None
-            output += " no squawk"
+        icao_hex = fields[4].strip().lower()
+        plane = self._planes.get(icao_hex)
+        if plane is None:
+            if not icao_hex or not is_rotorcraft_candidate(icao_hex, None, None):
+                return None
+            plane = {"hex": icao_hex}
+            heli_type = search_bills(icao_hex, "type")
+            if heli_type:
+                plane["t"] = heli_type
+            self._planes[icao_hex] = plane
+        self._last_seen[icao_hex] = now
+
+        if fields[10].strip():
+            plane["flight"] = fields[10]
+        if fields[11]:
+            plane["alt_baro"] = fields[11]
+        if fields[21].strip() == "-1":
+            plane["alt_baro"] = "ground"
+        if fields[12]:
+            plane["gs"] = fields[12]
+        if fields[13]:
+            plane["track"] = fields[13]
+        if fields[17]:
+            plane["squawk"] = fields[17]
+        if not (fields[14] and fields[15]):
+            return None
+        plane["lat"] = fields[14]
+        plane["lon"] = fields[15]
 
-        try:
-            # See https://github.com/wiedehopf/readsb/blob/dev/README-json.md
-            source = clean_source(str(plane["type"]))
-            output += " src " + source
-            fcs_sources.labels(source=source, feeder_id=FEEDER_ID).inc(1)
-            if _otel_fcs_sources is not None:
-                _otel_fcs_sources.add(
-                    1,
-                    {"source": source, "feeder_id": FEEDER_ID or "unknown"},
+        if now - self._last_emit.get(icao_hex, 0.0) < self.min_spacing:
+            return None
+        doc = build_heli_document(plane, context, interval)
+        if doc is not None:
+            self._last_emit[icao_hex] = now
+        return doc
+
+    def _prune(self, now: float, interval) -> None:
+        """
+        Forget aircraft that have not been heard from for state_ttl seconds.
+        """
+        expired = [
+            icao_hex
+            for icao_hex, seen in self._last_seen.items()
+            if now - seen > self.state_ttl
+        ]
+        for icao_hex in expired:
+            del self._planes[icao_hex]
+            del self._last_seen[icao_hex]
+            self._last_emit.pop(icao_hex, None)
+        if expired:
+            logger.debug("SBS state expired %d aircraft", len(expired))
+        recent_flights.expire(now)
+        expire_rx_series(now)
+        prune_position_filters(now, interval)
+        self._next_prune = now + 60
+
+    def run_for(self, duration, interval) -> None:
+        """
+        Read the feed for duration seconds, submitting documents as they are built.
+
+        Positions are stamped with the local receive time: SBS timestamps carry
+        no timezone. Documents from one read are submitted together, so a burst
+        of lines goes to the writer as one batch.
+        """
+        signal.signal(signal.SIGUSR1, dump_recents)
+        deadline = time() + duration
+
+        while not _shutdown_requested:
+            remaining = deadline - time()
+            if remaining <= 0:
+                return
+            if self._sock is None and not self._connect():
+                idle(sleep, max(0.0, min(remaining, self._next_connect - time())))
+                continue
+
+            self._sock.settimeout(min(remaining, 1.0))
+            try:
+                chunk = self._sock.recv(SBS_RECV_BYTES)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                self._disconnect(e)
+                continue
+            if not chunk:
+                self._disconnect("closed by peer")
+                continue
+
+            now = time()
+            lines = (self._buffer + chunk).split(b"\n")
+            self._buffer = lines.pop()
+            if len(self._buffer) > SBS_RECV_BYTES:
+                logger.warning("Discarding overlong SBS line from %s", self.host)
+                self._buffer = b""
+
+            context = SnapshotContext(now)
+            pending_docs = []
+            for line in lines:
+                doc = self.handle_line(
+                    line.decode("ascii", "replace").rstrip("\r"), context, interval
                 )
+                if doc is not None:
+                    pending_docs.append(doc)
+            flush_cycle_metrics()
+            pending_docs = filter_positions(pending_docs)
+            if pending_docs:
+                submit_mongo_docs(pending_docs)
 
-        except BaseException:
-
-            source = None
-            output += " no source"
-
-        logger.info("Heli Reported %s: %s", plane["hex"], output)
-
-        # if heli_type != "":
-        if icao_hex != "":
-            utc_time = datetime.fromtimestamp(dt_stamp, tz=timezone.utc)
-            est_time = utc_time.astimezone(ZoneInfo("America/New_York"))
-
-            mydict = {
-                "type": "Feature",
-                "properties": {
-                    # Date - "now" from aircraft.json in seconds from the unix epoch format
-                    # "date": dt_stamp,
-                    # Corrected with seen_pos
-                    "date": dt_stamp - seen_pos,
-                    # jsDate - a datetime obect in utc timezone corrected by seen_pos
-                    "jsDate": datetime.fromtimestamp(
-                        dt_stamp - seen_pos, tz=timezone.utc
-                    ),
-                    # proposed but not implemented
-                    # pythonDate - float seconds from the epoch corrected by seen_pos
-                    # "pythonDate": dt_stamp - seen_pos,
-                    #
-                    # createdDate - datetime object of "now" from aircraft.json
-                    "createdDate": utc_time,
-                    "icao": icao_hex,
-                    "type": heli_type,
-                    "tail": heli_tail,
-                    "call": call_payload,
-                    "heading": head,
-                    "squawk": squawk,
-                    "altitude_baro": alt_baro,
-                    "altitude_geo": alt_geom,
-                    "groundspeed": groundspeed,
-                    "rssi": rssi,
-                    "feeder": FEEDER_ID,
-                    "source": source,
-                    "dbFlags": dbFlags,
-                    "ownOp": ownOp,
-                    # readableTime - string representation of Datetime in EST timezone
-                    "readableTime": f"{est_time.strftime('%Y-%m-%d %H:%M:%S')} ({est_time.strftime('%I:%M:%S %p')})",
-                },
-                "geometry": {"type": "Point", "coordinates": geometry},
-            }
-            ret_val = mongo_insert(mydict, dbFlags)
-            # return ret_val
-            logger.debug("Mongo_insert return: %s ", ret_val)
-            # if ret_val: ... do something
+            if now >= self._next_prune:
+                self._prune(now, interval)
 
 
 def find_helis(icao_hex) -> str | None:
@@ -1591,6 +4792,60 @@ def check_bills_age() -> float:
         return 0.0
 
 
+def _otel_observe_writer_queue_depth(options):
+    """OTel observable gauge callback for the Mongo writer queue depth."""
+    depth = _mongo_writer.depth() if _mongo_writer is not None else 0
+    yield metrics.Observation(depth, {"feeder_id": FEEDER_ID or "unknown"})
+
+
+def _otel_observe_spool_backlog(options):
+    """OTel observable gauge callback for the spool backlog."""
+    docs = _position_spool.backlog()[0] if _position_spool is not None else 0
+    yield metrics.Observation(docs, {"feeder_id": FEEDER_ID or "unknown"})
+
+
+def _otel_observe_cycle_aircraft_scanned(options):
+    """OTel observable gauge callback for aircraft scanned in the last cycle."""
+    yield metrics.Observation(
+        _cycle_aircraft_scanned, {"feeder_id": FEEDER_ID or "unknown"}
+    )
+
+
+def _otel_observe_cycle_rotorcraft_emitted(options):
+    """OTel observable gauge callback for rotorcraft emitted in the last cycle."""
+    yield metrics.Observation(
+        _cycle_rotorcraft_emitted, {"feeder_id": FEEDER_ID or "unknown"}
+    )
+
+
+def _otel_observe_upload_compression_ratio(options):
+    """OTel observable gauge callback for the upload compression ratio."""
+    yield metrics.Observation(
+        upload_compression_ratio(), {"feeder_id": FEEDER_ID or "unknown"}
+    )
+
+
+def _otel_observe_rx_series(options):
+    """OTel observable gauge callback for the fcs_rx series count."""
+    yield metrics.Observation(
+        _rx_series.cardinality(), {"feeder_id": FEEDER_ID or "unknown"}
+    )
+
+
+def _otel_observe_recent_flights(options):
+    """OTel observable gauge callback for the recent_flights size."""
+    yield metrics.Observation(
+        len(recent_flights), {"feeder_id": FEEDER_ID or "unknown"}
+    )
+
+
+def _otel_observe_recent_flights_bytes(options):
+    """OTel observable gauge callback for the recent_flights memory estimate."""
+    yield metrics.Observation(
+        recent_flights.approx_bytes(), {"feeder_id": FEEDER_ID or "unknown"}
+    )
+
+
 def init_prometheus() -> Counter:
     """
     Initialize Prometheus metrics for monitoring helicopter data collection.
@@ -1614,7 +4869,22 @@ def init_prometheus() -> Counter:
     try:
         # Declare globals to be modified
         global fcs_rx, fcs_mongo_inserts, fcs_sources, fcs_update_heli_time
+        global fcs_writer_queue_depth, fcs_writer_latency, fcs_writer_drops
+        global fcs_spool_backlog_docs, fcs_spool_backlog_bytes, fcs_spool_docs
+        global fcs_aircraft_fetch_bytes, fcs_aircraft_fetch_duration, fcs_skipped_cycles
         global _otel_fcs_rx, _otel_fcs_mongo_inserts, _otel_fcs_sources, _otel_fcs_update_heli_duration
+        global _otel_fcs_writer_latency, _otel_fcs_writer_drops, _otel_fcs_spool_docs
+        global _otel_fcs_aircraft_fetch_bytes, _otel_fcs_aircraft_fetch_duration
+        global _otel_fcs_skipped_cycles, fcs_sbs_connections, _otel_fcs_sbs_connections
+        global fcs_rotorcraft_matches, _otel_fcs_rotorcraft_matches
+        global fcs_cycle_stage, _otel_fcs_cycle_stage
+        global fcs_cycle_aircraft_scanned, fcs_cycle_rotorcraft_emitted
+        global fcs_recent_flights, fcs_recent_flights_bytes
+        global fcs_recent_flights_evictions, _otel_fcs_recent_flights_evictions
+        global fcs_rx_series, fcs_rx_series_expired, _otel_fcs_rx_series_expired
+        global fcs_suppressed_positions, _otel_fcs_suppressed_positions
+        global fcs_built_positions, _otel_fcs_built_positions
+        global fcs_upload_compression_ratio
 
         # Initialize Prometheus counters with descriptive labels
         fcs_rx = Counter(
@@ -1623,6 +4893,18 @@ def init_prometheus() -> Counter:
             labelnames=["icao", "cs", "feeder_id"],
         )
 
+        fcs_rx_series = Gauge(
+            name="fcs_rx_series",
+            documentation="Series exported on fcs_rx_msgs (icao/cs pairs, other bucket included)",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_rx_series_expired = Counter(
+            name="fcs_rx_series_expired",
+            documentation="fcs_rx_msgs series removed as idle or outside the top-K",
+            labelnames=["feeder_id"],
+        )
+
         fcs_mongo_inserts = Counter(
             name="fcs_mongo_inserts",
             documentation="MongoDB insert operations by status code",
@@ -1635,6 +4917,127 @@ def init_prometheus() -> Counter:
             labelnames=["source", "feeder_id"],
         )
 
+        fcs_writer_queue_depth = Gauge(
+            name="fcs_writer_queue_depth",
+            documentation="Documents waiting in the background Mongo writer queue",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_writer_latency = Summary(
+            name="fcs_writer_enqueue_to_ack_seconds",
+            documentation="Time from enqueue in the poll loop to Mongo insert completion",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_writer_drops = Counter(
+            name="fcs_writer_drops",
+            documentation="Documents dropped because the Mongo writer queue was full",
+            labelnames=["policy", "feeder_id"],
+        )
+
+        fcs_aircraft_fetch_bytes = Counter(
+            name="fcs_aircraft_fetch_bytes",
+            documentation="aircraft.json bytes fetched from the receiver (wire = compressed, decoded = JSON)",
+            labelnames=["encoding", "feeder_id"],
+        )
+
+        fcs_aircraft_fetch_duration = Summary(
+            name="fcs_aircraft_fetch_duration_seconds",
+            documentation="Time spent fetching aircraft.json from the receiver",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_skipped_cycles = Counter(
+            name="fcs_skipped_cycles",
+            documentation="Poll cycles skipped because aircraft.json had not changed",
+            labelnames=["reason", "feeder_id"],
+        )
+
+        fcs_rotorcraft_matches = Counter(
+            name="fcs_rotorcraft_matches",
+            documentation="Aircraft classified as rotorcraft by reason (type, bills, a7)",
+            labelnames=["reason", "feeder_id"],
+        )
+
+        fcs_cycle_stage = Histogram(
+            name="fcs_cycle_stage_seconds",
+            documentation="Time spent in each poll cycle stage (fetch, decode, classify, build, sink, total)",
+            labelnames=["stage", "feeder_id"],
+            buckets=CYCLE_STAGE_BUCKETS,
+        )
+
+        fcs_cycle_aircraft_scanned = Gauge(
+            name="fcs_cycle_aircraft_scanned",
+            documentation="Aircraft scanned in the last processed poll cycle",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_cycle_rotorcraft_emitted = Gauge(
+            name="fcs_cycle_rotorcraft_emitted",
+            documentation="Rotorcraft documents emitted by the last processed poll cycle",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_suppressed_positions = Counter(
+            name="fcs_suppressed_positions",
+            documentation="Built positions not uploaded, by filter (repeat, change, deadreckon)",
+            labelnames=["reason", "feeder_id"],
+        )
+
+        fcs_built_positions = Counter(
+            name="fcs_built_positions",
+            documentation="Positions built and run through the upload filters",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_upload_compression_ratio = Gauge(
+            name="fcs_upload_compression_ratio",
+            documentation="Positions built per position uploaded since start",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_recent_flights = Gauge(
+            name="fcs_recent_flights",
+            documentation="Rotorcraft held in recent_flights",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_recent_flights_bytes = Gauge(
+            name="fcs_recent_flights_bytes",
+            documentation="Approximate memory held by recent_flights",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_recent_flights_evictions = Counter(
+            name="fcs_recent_flights_evictions",
+            documentation="Aircraft evicted from recent_flights by reason (ttl, lru)",
+            labelnames=["reason", "feeder_id"],
+        )
+
+        fcs_sbs_connections = Counter(
+            name="fcs_sbs_connections",
+            documentation="SBS feed connection events (ok, fail, lost)",
+            labelnames=["result", "feeder_id"],
+        )
+
+        fcs_spool_backlog_docs = Gauge(
+            name="fcs_spool_backlog_docs",
+            documentation="Documents waiting in the on-disk spool for replay",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_spool_backlog_bytes = Gauge(
+            name="fcs_spool_backlog_bytes",
+            documentation="Bytes waiting in the on-disk spool for replay",
+            labelnames=["feeder_id"],
+        )
+
+        fcs_spool_docs = Counter(
+            name="fcs_spool_docs",
+            documentation="Spool documents by action (spooled, replayed, discarded)",
+            labelnames=["action", "feeder_id"],
+        )
+
         # Initialize OpenTelemetry metrics when OTEL_METRICS_EXPORTER includes otlp
         _otel_metrics_enabled = (
             _otel_available
@@ -1647,6 +5050,17 @@ def init_prometheus() -> Counter:
                 description="Messages received from aircraft",
                 unit="1",
             )
+            _otel_meter.create_observable_gauge(
+                name="fcs_rx_series",
+                callbacks=[_otel_observe_rx_series],
+                description="Series exported on fcs_rx_msgs (icao/cs pairs, other bucket included)",
+                unit="1",
+            )
+            _otel_fcs_rx_series_expired = _otel_meter.create_counter(
+                name="fcs_rx_series_expired",
+                description="fcs_rx_msgs series removed as idle or outside the top-K",
+                unit="1",
+            )
             _otel_fcs_mongo_inserts = _otel_meter.create_counter(
                 name="fcs_mongo_inserts",
                 description="MongoDB insert operations by status code",
@@ -1662,6 +5076,108 @@ def init_prometheus() -> Counter:
                 description="Time spent processing and updating the helicopter database in seconds",
                 unit="s",
             )
+            _otel_fcs_writer_latency = _otel_meter.create_histogram(
+                name="fcs_writer_enqueue_to_ack_seconds",
+                description="Time from enqueue in the poll loop to Mongo insert completion",
+                unit="s",
+            )
+            _otel_fcs_writer_drops = _otel_meter.create_counter(
+                name="fcs_writer_drops",
+                description="Documents dropped because the Mongo writer queue was full",
+                unit="1",
+            )
+            _otel_fcs_aircraft_fetch_bytes = _otel_meter.create_counter(
+                name="fcs_aircraft_fetch_bytes",
+                description="aircraft.json bytes fetched from the receiver (wire = compressed, decoded = JSON)",
+                unit="By",
+            )
+            _otel_fcs_aircraft_fetch_duration = _otel_meter.create_histogram(
+                name="fcs_aircraft_fetch_duration_seconds",
+                description="Time spent fetching aircraft.json from the receiver",
+                unit="s",
+            )
+            _otel_fcs_skipped_cycles = _otel_meter.create_counter(
+                name="fcs_skipped_cycles",
+                description="Poll cycles skipped because aircraft.json had not changed",
+                unit="1",
+            )
+            _otel_fcs_rotorcraft_matches = _otel_meter.create_counter(
+                name="fcs_rotorcraft_matches",
+                description="Aircraft classified as rotorcraft by reason (type, bills, a7)",
+                unit="1",
+            )
+            _otel_fcs_cycle_stage = _otel_meter.create_histogram(
+                name="fcs_cycle_stage_seconds",
+                description="Time spent in each poll cycle stage (fetch, decode, classify, build, sink, total)",
+                unit="s",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_cycle_aircraft_scanned",
+                callbacks=[_otel_observe_cycle_aircraft_scanned],
+                description="Aircraft scanned in the last processed poll cycle",
+                unit="1",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_cycle_rotorcraft_emitted",
+                callbacks=[_otel_observe_cycle_rotorcraft_emitted],
+                description="Rotorcraft documents emitted by the last processed poll cycle",
+                unit="1",
+            )
+            _otel_fcs_suppressed_positions = _otel_meter.create_counter(
+                name="fcs_suppressed_positions",
+                description="Built positions not uploaded, by filter (repeat, change, deadreckon)",
+                unit="1",
+            )
+            _otel_fcs_built_positions = _otel_meter.create_counter(
+                name="fcs_built_positions",
+                description="Positions built and run through the upload filters",
+                unit="1",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_upload_compression_ratio",
+                callbacks=[_otel_observe_upload_compression_ratio],
+                description="Positions built per position uploaded since start",
+                unit="1",
+            )
+            _otel_fcs_recent_flights_evictions = _otel_meter.create_counter(
+                name="fcs_recent_flights_evictions",
+                description="Aircraft evicted from recent_flights by reason (ttl, lru)",
+                unit="1",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_recent_flights",
+                callbacks=[_otel_observe_recent_flights],
+                description="Rotorcraft held in recent_flights",
+                unit="1",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_recent_flights_bytes",
+                callbacks=[_otel_observe_recent_flights_bytes],
+                description="Approximate memory held by recent_flights",
+                unit="By",
+            )
+            _otel_fcs_sbs_connections = _otel_meter.create_counter(
+                name="fcs_sbs_connections",
+                description="SBS feed connection events (ok, fail, lost)",
+                unit="1",
+            )
+            _otel_fcs_spool_docs = _otel_meter.create_counter(
+                name="fcs_spool_docs",
+                description="Spool documents by action (spooled, replayed, discarded)",
+                unit="1",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_spool_backlog_docs",
+                callbacks=[_otel_observe_spool_backlog],
+                description="Documents waiting in the on-disk spool for replay",
+                unit="1",
+            )
+            _otel_meter.create_observable_gauge(
+                name="fcs_writer_queue_depth",
+                callbacks=[_otel_observe_writer_queue_depth],
+                description="Documents waiting in the background Mongo writer queue",
+                unit="1",
+            )
             logger.info("Prometheus and OTel metrics initialized successfully")
         else:
             logger.info("Prometheus metrics initialized successfully (OTel disabled)")
@@ -1693,18 +5209,26 @@ def run_loop(interval, h_types):
         h_types (dict): Dictionary containing helicopter type information keyed by ICAO hex
 
     Note:
+        - In sbs ingest mode each cycle reads the SBS feed for interval seconds
+          instead of polling aircraft.json and sleeping
         - Checks bills_operators.csv age and updates from URL if older than BILLS_TIMEOUT
+        - With --readlocalfiles, waits for the receiver to rewrite aircraft.json
+          (inotify) instead of sleeping a fixed interval
         - Dumps helicopter status information once per hour by default
         - Runs indefinitely until interrupted
         - Uses global variables: BILLS_URL, BILLS_TIMEOUT
+        - A reloaded Bills replaces heli_types and rebuilds the rotorcraft classifier
 
     Example:
         >>> run_loop(60, heli_types_dict)  # Run with 60-second intervals
     """
-    dump_clock = 0
+    global heli_types
+
+    next_dump = time() + 60 * 60
     # process_prometheus(random.random())
-    while True:
+    while not _shutdown_requested:
         logger.debug("Starting Update")
+        cycle_start = time()
 
         bills_age = check_bills_age()
 
@@ -1715,26 +5239,41 @@ def run_loop(interval, h_types):
             )
             h_types, bills_age = load_helis_from_url(BILLS_URL)
             logger.info("Updated bills_operators.csv at: %s", ctime(bills_age))
+            if h_types:
+                heli_types = h_types
+                rebuild_rotorcraft_classifier(heli_types)
         else:
             logger.debug(
                 "bills_operators.csv less than timeout value old - last updated at: %s",
                 ctime(bills_age),
             )
 
-        fcs_update_helidb(interval)
+        if _sbs_feed is not None:
+            _sbs_feed.run_for(interval, interval)
+        else:
+            fcs_update_helidb(interval)
         emit_mongo_connection_stats_if_due()
 
         # dump 1x per hour
-        if dump_clock >= (60 * 60 / interval):
+        if time() >= next_dump:
             dump_recents(signal.SIGUSR1, "")
-            dump_clock = 0
+            next_dump = time() + 60 * 60
         else:
-            logger.debug("dump_clock = %d ", dump_clock)
-            dump_clock += 1
+            logger.debug("next dump at %s", ctime(next_dump))
 
-        logger.debug("sleeping %s...", interval)
+        if _sbs_feed is not None:
+            continue
+        elif AIRCRAFT_URL is None:
+            # Local files: wake on the receiver's next write, but no sooner than
+            # LOCAL_MIN_SPACING_SECS after this cycle started
+            spacing = cycle_start + LOCAL_MIN_SPACING_SECS - time()
+            if spacing > 0:
+                idle(sleep, spacing)
+            idle(wait_for_local_snapshot, interval)
+        else:
+            logger.debug("sleeping %s...", interval)
 
-        sleep(interval)
+            idle(sleep, interval)
 
 
 if __name__ == "__main__":
@@ -1939,6 +5478,115 @@ if __name__ == "__main__":
         DEFAULT_MONGO_SOCKET_TIMEOUT_MS,
         "MONGO_SOCKET_TIMEOUT_MS",
     )
+    WRITER_THREADS = parse_non_negative_int_config(
+        config.get("WRITER_THREADS"),
+        DEFAULT_WRITER_THREADS,
+        "WRITER_THREADS",
+    )
+    WRITER_QUEUE_SIZE = parse_positive_int_config(
+        config.get("WRITER_QUEUE_SIZE"),
+        DEFAULT_WRITER_QUEUE_SIZE,
+        "WRITER_QUEUE_SIZE",
+    )
+    WRITER_BATCH_SIZE = parse_positive_int_config(
+        config.get("WRITER_BATCH_SIZE"),
+        DEFAULT_WRITER_BATCH_SIZE,
+        "WRITER_BATCH_SIZE",
+    )
+    WRITER_OVERFLOW_POLICY = parse_choice_config(
+        config.get("WRITER_OVERFLOW_POLICY"),
+        DEFAULT_WRITER_OVERFLOW_POLICY,
+        WRITER_OVERFLOW_POLICIES,
+        "WRITER_OVERFLOW_POLICY",
+    )
+    SPOOL_ENABLED = parse_bool_config(
+        config.get("SPOOL_ENABLED"),
+        DEFAULT_SPOOL_ENABLED,
+    )
+    SPOOL_DIR = config.get("SPOOL_DIR") or os.path.join(conf_folder, "spool")
+    SPOOL_MAX_BYTES = parse_positive_int_config(
+        config.get("SPOOL_MAX_BYTES"),
+        DEFAULT_SPOOL_MAX_BYTES,
+        "SPOOL_MAX_BYTES",
+    )
+    SPOOL_MAX_AGE_SECS = parse_positive_int_config(
+        config.get("SPOOL_MAX_AGE_SECS"),
+        DEFAULT_SPOOL_MAX_AGE_SECS,
+        "SPOOL_MAX_AGE_SECS",
+    )
+    SPOOL_SEGMENT_BYTES = parse_positive_int_config(
+        config.get("SPOOL_SEGMENT_BYTES"),
+        DEFAULT_SPOOL_SEGMENT_BYTES,
+        "SPOOL_SEGMENT_BYTES",
+    )
+    SPOOL_FSYNC_INTERVAL_SECS = parse_non_negative_int_config(
+        config.get("SPOOL_FSYNC_INTERVAL_SECS"),
+        DEFAULT_SPOOL_FSYNC_INTERVAL_SECS,
+        "SPOOL_FSYNC_INTERVAL_SECS",
+    )
+    SPOOL_REPLAY_BATCH_SIZE = parse_positive_int_config(
+        config.get("SPOOL_REPLAY_BATCH_SIZE"),
+        DEFAULT_SPOOL_REPLAY_BATCH_SIZE,
+        "SPOOL_REPLAY_BATCH_SIZE",
+    )
+    SPOOL_REPLAY_INTERVAL_SECS = parse_positive_int_config(
+        config.get("SPOOL_REPLAY_INTERVAL_SECS"),
+        DEFAULT_SPOOL_REPLAY_INTERVAL_SECS,
+        "SPOOL_REPLAY_INTERVAL_SECS",
+    )
+    AIRCRAFT_CONNECT_TIMEOUT_SECS = parse_positive_int_config(
+        config.get("AIRCRAFT_CONNECT_TIMEOUT_SECS"),
+        DEFAULT_AIRCRAFT_CONNECT_TIMEOUT_SECS,
+        "AIRCRAFT_CONNECT_TIMEOUT_SECS",
+    )
+    AIRCRAFT_READ_TIMEOUT_SECS = parse_positive_int_config(
+        config.get("AIRCRAFT_READ_TIMEOUT_SECS"),
+        DEFAULT_AIRCRAFT_READ_TIMEOUT_SECS,
+        "AIRCRAFT_READ_TIMEOUT_SECS",
+    )
+    INGEST_MODE = parse_choice_config(
+        config.get("INGEST_MODE"),
+        DEFAULT_INGEST_MODE,
+        INGEST_MODES,
+        "INGEST_MODE",
+    )
+    LOCAL_WATCH = parse_bool_config(config.get("LOCAL_WATCH"), DEFAULT_LOCAL_WATCH)
+    LOCAL_MIN_SPACING_SECS = parse_non_negative_int_config(
+        config.get("LOCAL_MIN_SPACING_SECS"),
+        args.interval,
+        "LOCAL_MIN_SPACING_SECS",
+    )
+    SBS_PORT = parse_positive_int_config(
+        config.get("SBS_PORT"), DEFAULT_SBS_PORT, "SBS_PORT"
+    )
+    SBS_MIN_SPACING_SECS = parse_non_negative_int_config(
+        config.get("SBS_MIN_SPACING_SECS"),
+        DEFAULT_SBS_MIN_SPACING_SECS,
+        "SBS_MIN_SPACING_SECS",
+    )
+    SBS_STATE_TTL_SECS = parse_positive_int_config(
+        config.get("SBS_STATE_TTL_SECS"),
+        DEFAULT_SBS_STATE_TTL_SECS,
+        "SBS_STATE_TTL_SECS",
+    )
+    BINCRAFT_FILE = config.get("BINCRAFT_FILE") or DEFAULT_BINCRAFT_FILE
+    if INGEST_MODE == "bincraft":
+        AIRCRAFT_FILE = BINCRAFT_FILE
+    DISPLAY_TIMEZONE = parse_timezone_config(
+        config.get("DISPLAY_TIMEZONE"), DEFAULT_DISPLAY_TIMEZONE, "DISPLAY_TIMEZONE"
+    )
+    BATCH_ENGINE = parse_choice_config(
+        config.get("BATCH_ENGINE"),
+        DEFAULT_BATCH_ENGINE,
+        BATCH_ENGINES,
+        "BATCH_ENGINE",
+    )
+    JSON_DECODER = parse_choice_config(
+        config.get("JSON_DECODER"),
+        DEFAULT_JSON_DECODER,
+        JSON_DECODERS,
+        "JSON_DECODER",
+    )
     if MONGO_MIN_POOL_SIZE > MONGO_MAX_POOL_SIZE:
         logger.warning(
             "Invalid pool size combination: MONGO_MIN_POOL_SIZE (%d) is greater than MONGO_MAX_POOL_SIZE (%d); falling back to defaults (%d/%d)",
@@ -1959,12 +5607,13 @@ if __name__ == "__main__":
         logger.setLevel(logging.DEBUG)
         logger.debug("Debug Mode Enabled")
 
-    def handle_sigterm(signum, frame):
-        logger.info("Received SIGTERM (%s) -- Exiting...", signum)
-        close_mongo_client()
-        raise SystemExit(0)
-
     atexit.register(close_mongo_client)
+    atexit.register(close_aircraft_session)
+    atexit.register(close_aircraft_watcher)
+    # atexit runs in reverse order: drain the writer (which may spool), then seal
+    # the spool, then close the client
+    atexit.register(stop_position_spool)
+    atexit.register(stop_mongo_writer)
 
     # Should be pulling these from env
 
@@ -1977,6 +5626,7 @@ if __name__ == "__main__":
         MONGO_CONN_TRACKING_ACTIVE = False
         MONGO_API_KEY = config["API-KEY"]
         mongo_insert = mongo_https_insert
+        mongo_insert_many = mongo_https_insert_many
         if "MONGO_URL" in config:
             MONGO_URL = config["MONGO_URL"]
 
@@ -2019,6 +5669,7 @@ if __name__ == "__main__":
         logger.debug("Mongo User and Password found - using MongoClient")
         MONGO_CONN_TRACKING_ACTIVE = True
         mongo_insert = mongo_client_insert
+        mongo_insert_many = mongo_client_insert_many
 
     if args.feederid:
         FEEDER_ID = args.feederid
@@ -2079,10 +5730,14 @@ if __name__ == "__main__":
 
     # Logging should be running by now
     logger.info(f"Starting {parser.prog} version: {VERSION} from: {CODE_DATE}")
+    logger.info("Decoding aircraft.json with %s", select_json_decoder(JSON_DECODER))
+    logger.info(
+        "Selecting rotorcraft with the %s engine", select_batch_engine(BATCH_ENGINE)
+    )
     start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     if server and port:
-        AIRCRAFT_URL = f"http://{server}:{port}/data/aircraft.json"
+        AIRCRAFT_URL = f"http://{server}:{port}/data/{AIRCRAFT_FILE}"
 
         validation = validators.url(AIRCRAFT_URL)
 
@@ -2101,8 +5756,117 @@ if __name__ == "__main__":
 
         # probably need to have an option for different file names
 
+    if INGEST_MODE == "sbs":
+        sbs_host = config.get("SBS_HOST") or server or "localhost"
+        _sbs_feed = SbsFeed(
+            sbs_host, SBS_PORT, SBS_MIN_SPACING_SECS, SBS_STATE_TTL_SECS
+        )
+        atexit.register(_sbs_feed.close)
+        logger.info("Using SBS feed at %s:%d", sbs_host, SBS_PORT)
+
+    SUPPRESS_REPEATS = parse_bool_config(
+        config.get("SUPPRESS_REPEATS"), DEFAULT_SUPPRESS_REPEATS
+    )
+    UPLOAD_FILTER = parse_choice_config(
+        config.get("UPLOAD_FILTER"),
+        DEFAULT_UPLOAD_FILTER,
+        UPLOAD_FILTERS,
+        "UPLOAD_FILTER",
+    )
+    CHANGE_MIN_DISTANCE_M = parse_non_negative_int_config(
+        config.get("CHANGE_MIN_DISTANCE_M"),
+        DEFAULT_CHANGE_MIN_DISTANCE_M,
+        "CHANGE_MIN_DISTANCE_M",
+    )
+    CHANGE_MIN_ALTITUDE_FT = parse_non_negative_int_config(
+        config.get("CHANGE_MIN_ALTITUDE_FT"),
+        DEFAULT_CHANGE_MIN_ALTITUDE_FT,
+        "CHANGE_MIN_ALTITUDE_FT",
+    )
+    CHANGE_MIN_HEADING_DEG = parse_non_negative_int_config(
+        config.get("CHANGE_MIN_HEADING_DEG"),
+        DEFAULT_CHANGE_MIN_HEADING_DEG,
+        "CHANGE_MIN_HEADING_DEG",
+    )
+    CHANGE_HEARTBEAT_SECS = parse_positive_int_config(
+        config.get("CHANGE_HEARTBEAT_SECS"),
+        DEFAULT_CHANGE_HEARTBEAT_SECS,
+        "CHANGE_HEARTBEAT_SECS",
+    )
+    DEADRECKON_TOLERANCE_M = parse_positive_int_config(
+        config.get("DEADRECKON_TOLERANCE_M"),
+        DEFAULT_DEADRECKON_TOLERANCE_M,
+        "DEADRECKON_TOLERANCE_M",
+    )
+    DEADRECKON_ALTITUDE_FT = parse_non_negative_int_config(
+        config.get("DEADRECKON_ALTITUDE_FT"),
+        DEFAULT_DEADRECKON_ALTITUDE_FT,
+        "DEADRECKON_ALTITUDE_FT",
+    )
+    DEADRECKON_TURN_DEG = parse_non_negative_int_config(
+        config.get("DEADRECKON_TURN_DEG"),
+        DEFAULT_DEADRECKON_TURN_DEG,
+        "DEADRECKON_TURN_DEG",
+    )
+    DEADRECKON_HEARTBEAT_SECS = parse_positive_int_config(
+        config.get("DEADRECKON_HEARTBEAT_SECS"),
+        DEFAULT_DEADRECKON_HEARTBEAT_SECS,
+        "DEADRECKON_HEARTBEAT_SECS",
+    )
+    _upload_filter = create_upload_filter(UPLOAD_FILTER)
+    if _upload_filter is not None:
+        logger.info("Upload filter: %s", UPLOAD_FILTER)
+    RECENT_FLIGHTS_MAX = parse_positive_int_config(
+        config.get("RECENT_FLIGHTS_MAX"),
+        DEFAULT_RECENT_FLIGHTS_MAX,
+        "RECENT_FLIGHTS_MAX",
+    )
+    RECENT_FLIGHTS_TTL_SECS = parse_positive_int_config(
+        config.get("RECENT_FLIGHTS_TTL_SECS"),
+        DEFAULT_RECENT_FLIGHTS_TTL_SECS,
+        "RECENT_FLIGHTS_TTL_SECS",
+    )
+    RECENT_DUMP_WINDOW_SECS = parse_positive_int_config(
+        config.get("RECENT_DUMP_WINDOW_SECS"),
+        DEFAULT_RECENT_DUMP_WINDOW_SECS,
+        "RECENT_DUMP_WINDOW_SECS",
+    )
+
+    RX_METRICS = parse_choice_config(
+        config.get("RX_METRICS"), DEFAULT_RX_METRICS, RX_METRICS_MODES, "RX_METRICS"
+    )
+    RX_SERIES_LIMIT = parse_positive_int_config(
+        config.get("RX_SERIES_LIMIT"), DEFAULT_RX_SERIES_LIMIT, "RX_SERIES_LIMIT"
+    )
+    RX_SERIES_TOP_K = parse_non_negative_int_config(
+        config.get("RX_SERIES_TOP_K"), DEFAULT_RX_SERIES_TOP_K, "RX_SERIES_TOP_K"
+    )
+    if RX_SERIES_TOP_K >= RX_SERIES_LIMIT:
+        logger.warning(
+            "RX_SERIES_TOP_K (%d) must be below RX_SERIES_LIMIT (%d) - using %d",
+            RX_SERIES_TOP_K,
+            RX_SERIES_LIMIT,
+            RX_SERIES_LIMIT // 2,
+        )
+        RX_SERIES_TOP_K = RX_SERIES_LIMIT // 2
+    RX_SERIES_TTL_SECS = parse_positive_int_config(
+        config.get("RX_SERIES_TTL_SECS"),
+        DEFAULT_RX_SERIES_TTL_SECS,
+        "RX_SERIES_TTL_SECS",
+    )
+    if RX_METRICS == "bounded":
+        _rx_series = RxSeriesTracker(
+            RX_SERIES_LIMIT, RX_SERIES_TOP_K, RX_SERIES_TTL_SECS
+        )
+        logger.info(
+            "fcs_rx bounded to %d series (top %d kept, idle %ds expired)",
+            RX_SERIES_LIMIT,
+            RX_SERIES_TOP_K,
+            RX_SERIES_TTL_SECS,
+        )
+
     heli_types = {}
-    recent_flights = {}
+    recent_flights = RecentFlights(RECENT_FLIGHTS_MAX, RECENT_FLIGHTS_TTL_SECS)
 
     logger.debug("Using bills_operators as : %s", bills_operators)
 
@@ -2123,9 +5887,15 @@ if __name__ == "__main__":
         raise FileNotFoundError
 
     logger.info("Loaded %s helis from Bills", str(len(heli_types)))
+    rebuild_rotorcraft_classifier(heli_types)
 
     if args.once:
-        fcs_update_helidb(99999)
+        # Metrics are recorded but not served: there is no scrape in one cycle
+        init_prometheus()
+        if _sbs_feed is not None:
+            _sbs_feed.run_for(args.interval, 99999)
+        else:
+            fcs_update_helidb(99999)
         sys.exit()
 
     if args.daemon:
@@ -2145,7 +5915,10 @@ if __name__ == "__main__":
             signal.signal(signal.SIGTERM, handle_sigterm)
             init_prometheus()
             start_http_server(PROM_PORT)
+            start_position_spool(SPOOL_DIR)
+            start_mongo_writer()
             run_loop(args.interval, heli_types)
+            shutdown()
 
     else:
         try:
@@ -2153,7 +5926,10 @@ if __name__ == "__main__":
             signal.signal(signal.SIGTERM, handle_sigterm)
             init_prometheus()
             start_http_server(PROM_PORT)
+            start_position_spool(SPOOL_DIR)
+            start_mongo_writer()
             run_loop(args.interval, heli_types)
+            shutdown()
 
         except KeyboardInterrupt:
             logger.warning("Received Keyboard Interrupt -- Exiting...")
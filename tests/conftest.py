@@ -0,0 +1,20 @@
+"""
+Shared setup for the fcs tests: import fcs from the repository root and create
+its Prometheus metrics once (the default registry rejects a second set).
+"""
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fcs  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+fcs.FEEDER_ID = "test"
+fcs.heli_types = {}
+fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+fcs.logger.setLevel(logging.WARNING)
+fcs.init_prometheus()
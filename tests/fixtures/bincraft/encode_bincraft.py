@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Write aircraft.binCraft and aircraft.binCraft.zst from aircraft.json.
+
+The byte offsets follow tar1090's binCraft reader (html/script.js, wqi()), not
+fcs.BINCRAFT_RECORD_FORMAT, so the fixtures check fcs's record layout against an
+independent description of it. Replace all three files with a capture from a live
+receiver when one is available (see README.md); the tests need no change.
+
+Usage:
+    python tests/fixtures/bincraft/encode_bincraft.py
+"""
+
+import json
+import math
+import os
+import struct
+
+import zstandard
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STRIDE = 112
+VERSION = 20240218
+ADDR_TYPES = (
+    "adsb_icao",
+    "adsb_icao_nt",
+    "adsr_icao",
+    "tisb_icao",
+    "adsc",
+    "mlat",
+    "other",
+    "mode_s",
+    "adsb_other",
+    "adsr_other",
+    "tisb_trackfile",
+    "tisb_other",
+    "mode_ac",
+)
+
+
+def encode_header(snapshot: dict) -> bytes:
+    header = bytearray(STRIDE)
+    now_ms = round(snapshot["now"] * 1000)
+    with_pos = sum(1 for plane in snapshot["aircraft"] if "lat" in plane)
+    struct.pack_into(
+        "<IIII", header, 0, now_ms & 0xFFFFFFFF, now_ms >> 32, STRIDE, with_pos
+    )
+    struct.pack_into("<I", header, 16, 0)  # globe index
+    struct.pack_into("<hhhh", header, 20, -90, -180, 90, 180)
+    struct.pack_into("<I", header, 28, snapshot["messages"] & 0xFFFFFFFF)
+    struct.pack_into("<ii", header, 32, 38890000, -77030000)  # receiver lat, lon
+    struct.pack_into("<I", header, 40, VERSION)
+    struct.pack_into("<I", header, 44, 1825)  # message rate x10
+    return bytes(header)
+
+
+def encode_plane(plane: dict) -> bytes:
+    record = bytearray(STRIDE)
+    hex_id = plane["hex"]
+    addr = int(hex_id.lstrip("~"), 16) | (1 << 24 if hex_id.startswith("~") else 0)
+    struct.pack_into("<i", record, 0, addr)
+    struct.pack_into("<H", record, 6, round(plane["seen"] * 10))
+    valid = [0, 0, 0, 0, 0]
+    if "lat" in plane:
+        struct.pack_into("<H", record, 4, round(plane["seen_pos"] * 10))
+        struct.pack_into(
+            "<ii", record, 8, round(plane["lon"] * 1e6), round(plane["lat"] * 1e6)
+        )
+        valid[0] |= 64
+    if plane.get("alt_baro") == "ground":
+        record[68] = 1
+    elif "alt_baro" in plane:
+        struct.pack_into("<h", record, 20, round(plane["alt_baro"] / 25))
+        valid[0] |= 16
+    if "alt_geom" in plane:
+        struct.pack_into("<h", record, 22, round(plane["alt_geom"] / 25))
+        valid[0] |= 32
+    if "squawk" in plane:
+        struct.pack_into("<H", record, 32, int(plane["squawk"], 16))
+        valid[3] |= 4
+    if "gs" in plane:
+        struct.pack_into("<h", record, 34, round(plane["gs"] * 10))
+        valid[0] |= 128
+    if "track" in plane:
+        struct.pack_into("<h", record, 40, round(plane["track"] * 90))
+        valid[1] |= 8
+    struct.pack_into("<H", record, 62, min(plane["messages"], 0xFFFF))
+    if "category" in plane:
+        record[64] = int(plane["category"], 16)
+    record[65] = plane.get("nic", 0)
+    record[67] = ADDR_TYPES.index(plane["type"]) << 4
+    if "flight" in plane:
+        record[78:86] = plane["flight"].encode().ljust(8, b"\0")
+        valid[0] |= 8
+    record[73:78] = bytes(valid)
+    struct.pack_into("<H", record, 86, plane.get("dbFlags", 0))
+    record[88:92] = plane.get("t", "").encode().ljust(4, b"\0")
+    record[92:104] = plane.get("r", "").encode().ljust(12, b"\0")
+    record[104] = 1
+    record[105] = round(math.sqrt((10 ** (plane["rssi"] / 10) - 1.125e-5) * 65025))
+    return bytes(record)
+
+
+def main() -> None:
+    with open(os.path.join(HERE, "aircraft.json"), encoding="UTF-8") as json_file:
+        snapshot = json.load(json_file)
+    raw = encode_header(snapshot) + b"".join(map(encode_plane, snapshot["aircraft"]))
+    with open(os.path.join(HERE, "aircraft.binCraft"), "wb") as bincraft_file:
+        bincraft_file.write(raw)
+    with open(os.path.join(HERE, "aircraft.binCraft.zst"), "wb") as bincraft_file:
+        bincraft_file.write(zstandard.ZstdCompressor(level=1).compress(raw))
+
+
+if __name__ == "__main__":
+    main()
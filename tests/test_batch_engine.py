@@ -0,0 +1,62 @@
+"""
+BATCH_ENGINE: the numpy and python engines build identical documents from the
+binCraft fixtures (tests/fixtures/bincraft).
+"""
+
+import os
+
+import pytest
+
+import fcs
+from conftest import FIXTURES
+
+np = pytest.importorskip("numpy")
+
+# A fixed-wing hex listed in Bills, so the Bills column of the numpy mask is used
+BILLS = {"a8f9e0": {"hex": "a8f9e0", "type": "C172", "tail": "N8112Q"}}
+
+
+@pytest.fixture
+def bills(monkeypatch):
+    monkeypatch.setattr(fcs, "heli_types", dict(BILLS))
+    fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+    yield
+    fcs.rebuild_rotorcraft_classifier({})
+    fcs.select_batch_engine("python")
+
+
+def build_documents(raw: bytes, engine: str) -> tuple:
+    assert fcs.select_batch_engine(engine) == engine
+    snapshot = (
+        fcs.decode_bincraft_numpy(raw)
+        if engine == "numpy"
+        else fcs.decode_bincraft(raw)
+    )
+    context = fcs.SnapshotContext(snapshot["now"])
+    docs = []
+    for plane in snapshot["aircraft"]:
+        doc = fcs.build_heli_document(plane, context, 15)
+        if doc is not None:
+            docs.append(doc)
+    return snapshot, docs
+
+
+@pytest.mark.parametrize("name", ["aircraft.binCraft", "aircraft.binCraft.zst"])
+def test_engines_build_identical_documents(bills, name):
+    with open(os.path.join(FIXTURES, "bincraft", name), "rb") as fixture_file:
+        raw = fixture_file.read()
+
+    python_snapshot, python_docs = build_documents(raw, "python")
+    numpy_snapshot, numpy_docs = build_documents(raw, "numpy")
+
+    assert numpy_snapshot["scanned"] == len(python_snapshot["aircraft"])
+    assert numpy_snapshot["now"] == python_snapshot["now"]
+    assert numpy_docs == python_docs
+    assert sorted(mydict["properties"]["icao"] for mydict, _ in numpy_docs) == [
+        "a0b1c2",
+        "a33e5c",
+        "a4c3d1",
+        "a8f9e0",
+        "ac9f65",
+        "ae0123",
+    ]
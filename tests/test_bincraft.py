@@ -0,0 +1,129 @@
+"""
+binCraft decoding against the aircraft.json of the same snapshot (see
+tests/fixtures/bincraft/README.md), rejection of a too-short stride, and a
+warning for a binCraftVersion that has not been checked.
+"""
+
+import json
+import logging
+import os
+
+import pytest
+
+import fcs
+from conftest import FIXTURES
+
+BINCRAFT_FIXTURES = os.path.join(FIXTURES, "bincraft")
+
+# aircraft.json field -> largest difference binCraft's fixed-point encoding allows
+# (rssi is a scaled byte, several dB apart for weak signals)
+NUMERIC_TOLERANCES = {
+    "seen_pos": 0.05,
+    "seen": 0.05,
+    "lat": 5e-7,
+    "lon": 5e-7,
+    "alt_baro": 12.5,
+    "alt_geom": 12.5,
+    "gs": 0.05,
+    "track": 0.01,
+    "rssi": 1.5,
+}
+EXACT_FIELDS = ("type", "category", "flight", "squawk", "dbFlags", "t", "r")
+DOCUMENT_TOLERANCES = {
+    "date": 0.051,
+    "heading": 0.01,
+    "groundspeed": 0.05,
+    "rssi": 1.5,
+}
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(BINCRAFT_FIXTURES, name), "rb") as fixture_file:
+        return fixture_file.read()
+
+
+def aircraft_json() -> dict:
+    return json.loads(read_fixture("aircraft.json"))
+
+
+@pytest.mark.parametrize("name", ["aircraft.binCraft", "aircraft.binCraft.zst"])
+def test_decode_matches_aircraft_json(name):
+    expected = aircraft_json()
+    decoded = fcs.decode_bincraft(read_fixture(name))
+
+    assert decoded["now"] == pytest.approx(expected["now"], abs=1e-3)
+    by_hex = {plane["hex"]: plane for plane in decoded["aircraft"]}
+    assert sorted(by_hex) == sorted(plane["hex"] for plane in expected["aircraft"])
+
+    for plane in expected["aircraft"]:
+        got = by_hex[plane["hex"]]
+        for field, tolerance in NUMERIC_TOLERANCES.items():
+            if field == "alt_baro" and plane.get(field) == "ground":
+                assert got[field] == "ground", plane["hex"]
+            elif field in plane:
+                assert got[field] == pytest.approx(plane[field], abs=tolerance), (
+                    plane["hex"],
+                    field,
+                )
+            else:
+                assert field not in got, (plane["hex"], field)
+        for field in EXACT_FIELDS:
+            if plane.get(field) not in (None, "", 0):
+                assert got.get(field) == plane[field], (plane["hex"], field)
+            else:
+                assert field not in got, (plane["hex"], field)
+
+
+def test_rotorcraft_documents_match_aircraft_json():
+    expected = aircraft_json()
+    decoded = fcs.decode_bincraft(read_fixture("aircraft.binCraft.zst"))
+
+    def documents(snapshot):
+        context = fcs.SnapshotContext(expected["now"])
+        docs = {}
+        for plane in snapshot["aircraft"]:
+            doc = fcs.build_heli_document(plane, context, 15)
+            if doc is not None:
+                docs[doc[0]["properties"]["icao"]] = doc
+        return docs
+
+    from_json = documents(expected)
+    from_bincraft = documents(decoded)
+    assert sorted(from_bincraft) == sorted(from_json)
+    assert len(from_json) == 5
+    for icao_hex, (mydict, dbFlags) in from_json.items():
+        other, other_flags = from_bincraft[icao_hex]
+        assert other_flags == dbFlags
+        assert other["geometry"]["coordinates"] == pytest.approx(
+            mydict["geometry"]["coordinates"], abs=5e-7
+        )
+        for field, value in mydict["properties"].items():
+            if field in DOCUMENT_TOLERANCES:
+                assert other["properties"][field] == pytest.approx(
+                    value, abs=DOCUMENT_TOLERANCES[field]
+                ), (icao_hex, field)
+            elif field not in ("jsDate", "createdDate"):
+                assert other["properties"][field] == value, (icao_hex, field)
+
+
+@pytest.mark.parametrize("version", [0, 20210101, 99999999])
+def test_unknown_version_is_decoded_with_one_warning(version, caplog, monkeypatch):
+    monkeypatch.setattr(fcs, "_bincraft_unknown_versions", set())
+    raw = read_fixture("aircraft.binCraft")
+    expected = fcs.decode_bincraft(raw)
+    patched = bytearray(raw)
+    patched[40:44] = version.to_bytes(4, "little")
+
+    with caplog.at_level(logging.WARNING, logger=fcs.logger.name):
+        assert fcs.decode_bincraft(bytes(patched)) == expected
+        assert fcs.decode_bincraft(bytes(patched)) == expected
+    warnings = [r for r in caplog.records if "binCraft version" in r.getMessage()]
+    assert len(warnings) == 1
+    assert str(version) in warnings[0].getMessage()
+
+
+def test_short_stride_is_rejected():
+    raw = bytearray(read_fixture("aircraft.binCraft"))
+    raw[8:12] = (64).to_bytes(4, "little")
+    with pytest.raises(ValueError, match="stride"):
+        fcs.decode_bincraft(bytes(raw))
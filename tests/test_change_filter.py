@@ -0,0 +1,152 @@
+"""
+ChangeFilter: an aircraft's position is uploaded when it moved, climbed, turned,
+took off or landed by at least the configured amounts, or when the heartbeat is
+due; prune forgets aircraft once their heartbeat has passed.
+"""
+
+import math
+
+import pytest
+
+import fcs
+
+INTERVAL = 15
+NOW = 1792192824.0
+LAT = 38.8977
+LON = -77.0365
+
+MIN_DISTANCE_M = 100
+MIN_ALTITUDE_FT = 200
+MIN_HEADING_DEG = 15
+HEARTBEAT_SECS = 60
+
+
+def north(meters: float) -> float:
+    """Latitude offset in degrees for meters due north."""
+    return math.degrees(meters / fcs.EARTH_RADIUS_M)
+
+
+def heli(icao_hex="a00001", lat=LAT, alt_baro=1200, track=271.3) -> dict:
+    return {
+        "hex": icao_hex,
+        "t": sorted(fcs.ROTORCRAFT_TYPES)[0],
+        "category": "A7",
+        "alt_baro": alt_baro,
+        "gs": 80.5,
+        "track": track,
+        "lat": lat,
+        "lon": LON,
+        "seen_pos": 0,
+    }
+
+
+def uploaded(change_filter, now: float, *planes) -> list:
+    context = fcs.SnapshotContext(now)
+    docs = [fcs.build_heli_document(plane, context, INTERVAL) for plane in planes]
+    return [mydict["properties"]["icao"] for mydict, _ in change_filter.filter(docs)]
+
+
+@pytest.fixture
+def change_filter():
+    change_filter = fcs.ChangeFilter(
+        MIN_DISTANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    assert uploaded(change_filter, NOW, heli()) == ["a00001"]
+    return change_filter
+
+
+def test_unchanged_position_suppressed(change_filter):
+    assert uploaded(change_filter, NOW + 5, heli()) == []
+    assert uploaded(change_filter, NOW + 10, heli()) == []
+
+
+@pytest.mark.parametrize(
+    "meters, expected", [(MIN_DISTANCE_M - 5, []), (MIN_DISTANCE_M + 5, ["a00001"])]
+)
+def test_distance_threshold(change_filter, meters, expected):
+    assert uploaded(change_filter, NOW + 5, heli(lat=LAT + north(meters))) == expected
+
+
+def test_distance_measured_from_last_upload(change_filter):
+    # Creeping in steps below the threshold still uploads once the total passes it
+    steps = [
+        uploaded(change_filter, NOW + 5 * n, heli(lat=LAT + north(40 * n)))
+        for n in range(1, 4)
+    ]
+    assert steps == [[], [], ["a00001"]]
+
+
+@pytest.mark.parametrize(
+    "alt_baro, expected",
+    [
+        (1200 + MIN_ALTITUDE_FT - 25, []),
+        (1200 + MIN_ALTITUDE_FT, ["a00001"]),
+        (1200 - MIN_ALTITUDE_FT, ["a00001"]),
+    ],
+)
+def test_altitude_threshold(change_filter, alt_baro, expected):
+    assert uploaded(change_filter, NOW + 5, heli(alt_baro=alt_baro)) == expected
+
+
+@pytest.mark.parametrize(
+    "track, expected",
+    [
+        (271.3 + MIN_HEADING_DEG - 1, []),
+        (271.3 + MIN_HEADING_DEG, ["a00001"]),
+        (271.3 - MIN_HEADING_DEG, ["a00001"]),
+    ],
+)
+def test_heading_threshold(change_filter, track, expected):
+    assert uploaded(change_filter, NOW + 5, heli(track=track)) == expected
+
+
+def test_heading_change_wraps_through_north():
+    change_filter = fcs.ChangeFilter(
+        MIN_DISTANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    assert uploaded(change_filter, NOW, heli(track=355)) == ["a00001"]
+    # 355 -> 5 is a 10 degree turn, not 350
+    assert uploaded(change_filter, NOW + 5, heli(track=5)) == []
+    assert uploaded(change_filter, NOW + 10, heli(track=15)) == ["a00001"]
+
+
+def test_heartbeat(change_filter):
+    assert uploaded(change_filter, NOW + HEARTBEAT_SECS - 1, heli()) == []
+    assert uploaded(change_filter, NOW + HEARTBEAT_SECS, heli()) == ["a00001"]
+    # The next heartbeat counts from the position just uploaded
+    assert uploaded(change_filter, NOW + 2 * HEARTBEAT_SECS - 1, heli()) == []
+    assert uploaded(change_filter, NOW + 2 * HEARTBEAT_SECS, heli()) == ["a00001"]
+
+
+def test_landing_and_takeoff(change_filter):
+    # readsb reports alt_baro "ground" on the ground, which builds as None
+    assert uploaded(change_filter, NOW + 5, heli(alt_baro="ground")) == ["a00001"]
+    assert uploaded(change_filter, NOW + 10, heli(alt_baro="ground")) == []
+    assert uploaded(change_filter, NOW + 15, heli(alt_baro=50)) == ["a00001"]
+    assert uploaded(change_filter, NOW + 20, heli(alt_baro=50)) == []
+
+
+def test_aircraft_filtered_independently(change_filter):
+    moved = heli(lat=LAT + north(MIN_DISTANCE_M + 5))
+    assert uploaded(change_filter, NOW + 5, heli("a00002"), moved) == [
+        "a00002",
+        "a00001",
+    ]
+    assert uploaded(change_filter, NOW + 10, heli("a00002"), moved) == []
+
+
+def test_prune_forgets_aircraft_once_heartbeat_passed(change_filter):
+    assert uploaded(change_filter, NOW + 30, heli("a00002")) == ["a00002"]
+    assert len(change_filter) == 2
+
+    change_filter.prune(NOW + HEARTBEAT_SECS)
+    assert len(change_filter) == 2
+
+    change_filter.prune(NOW + HEARTBEAT_SECS + 1)
+    assert len(change_filter) == 1
+
+    change_filter.prune(NOW + 30 + HEARTBEAT_SECS + 1)
+    assert len(change_filter) == 0
+
+    # A pruned aircraft is a first sighting again
+    assert uploaded(change_filter, NOW + 100, heli()) == ["a00001"]
@@ -0,0 +1,193 @@
+"""
+DeadReckoningFilter: every dropped position stays within tolerance_m of the track
+dead-reckoned from the last upload, an aircraft without groundspeed or heading
+is filtered like ChangeFilter, and a position that was never written is not
+predicted from.
+"""
+
+import math
+import random
+from collections import deque
+
+import pytest
+
+import fcs
+
+INTERVAL = 15
+NOW = 1792192824.0
+LAT = 38.8977
+LON = -77.0365
+
+TOLERANCE_M = 100
+MIN_ALTITUDE_FT = 100
+MIN_HEADING_DEG = 20
+HEARTBEAT_SECS = 300
+
+
+def heli(icao_hex="a00001", lat=LAT, lon=LON, gs=90.0, track=45.0) -> dict:
+    plane = {
+        "hex": icao_hex,
+        "t": sorted(fcs.ROTORCRAFT_TYPES)[0],
+        "category": "A7",
+        "alt_baro": 1200,
+        "lat": lat,
+        "lon": lon,
+        "seen_pos": 0,
+    }
+    if gs is not None:
+        plane["gs"] = gs
+    if track is not None:
+        plane["track"] = track
+    return plane
+
+
+def build(now: float, *planes) -> list:
+    context = fcs.SnapshotContext(now)
+    return [fcs.build_heli_document(plane, context, INTERVAL) for plane in planes]
+
+
+def icaos(docs) -> list:
+    return [mydict["properties"]["icao"] for mydict, _ in docs]
+
+
+def flight(seed: int, steps: int = 600, step_secs: float = 2.0) -> list:
+    """
+    A wandering flight as (date, aircraft) pairs: groundspeed and heading drift
+    and jump, and the reported values are noisy, as from a real receiver.
+    """
+    rng = random.Random(seed)
+    lat, lon, gs, track = LAT, LON, 90.0, 45.0
+    snapshots = []
+    for step in range(steps):
+        if rng.random() < 0.02:
+            track = (track + rng.uniform(-90, 90)) % 360
+        if rng.random() < 0.02:
+            gs = rng.uniform(0, 140)
+        track = (track + rng.gauss(0, 2)) % 360
+        gs = max(0.0, gs + rng.gauss(0, 2))
+        distance = gs * fcs.METERS_PER_SEC_PER_KNOT * step_secs
+        heading = math.radians(track)
+        lat += math.degrees(distance * math.cos(heading) / fcs.EARTH_RADIUS_M)
+        lon += math.degrees(
+            distance
+            * math.sin(heading)
+            / (fcs.EARTH_RADIUS_M * math.cos(math.radians(lat)))
+        )
+        plane = heli(
+            lat=lat,
+            lon=lon,
+            gs=round(gs + rng.gauss(0, 1), 1),
+            track=round((track + rng.gauss(0, 1)) % 360, 1),
+        )
+        snapshots.append((NOW + step * step_secs, plane))
+    return snapshots
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dropped_positions_within_tolerance_of_dead_reckoning(seed):
+    dr_filter = fcs.DeadReckoningFilter(
+        TOLERANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    last_uploaded = None
+    dropped = 0
+    for now, plane in flight(seed):
+        docs = build(now, plane)
+        if dr_filter.filter(docs):
+            last_uploaded = fcs.LastPosition.from_doc(docs[0])
+            continue
+        dropped += 1
+        position = fcs.LastPosition.from_doc(docs[0])
+        lat, lon = fcs.dead_reckon(last_uploaded, position.date)
+        error = fcs.position_distance_m(lat, lon, position.lat, position.lon)
+        assert error <= TOLERANCE_M
+    # The flight is compressible, or the bound above was never exercised
+    assert dropped > 150
+
+
+@pytest.mark.parametrize(
+    "missing", [{"gs": None}, {"track": None}, {"gs": None, "track": None}]
+)
+def test_without_groundspeed_or_heading_filters_like_change(missing):
+    dr_filter = fcs.DeadReckoningFilter(
+        TOLERANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    change_filter = fcs.ChangeFilter(
+        TOLERANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    decisions = []
+    for now, plane in flight(7, steps=300, step_secs=0.5):
+        for key in missing:
+            del plane[key]
+        docs = build(now, plane)
+        decisions.append(bool(dr_filter.filter(docs)))
+        assert decisions[-1] == bool(change_filter.filter(docs))
+    # Predicted to stay put, so it uploads on every TOLERANCE_M moved, no more
+    assert 1 < decisions.count(True) < len(decisions) / 2
+
+
+def test_zero_groundspeed_predicts_staying_put():
+    dr_filter = fcs.DeadReckoningFilter(
+        TOLERANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    assert icaos(dr_filter.filter(build(NOW, heli(gs=0)))) == ["a00001"]
+    assert icaos(dr_filter.filter(build(NOW + 60, heli(gs=0)))) == []
+
+
+@pytest.fixture
+def upload_filter(monkeypatch):
+    dr_filter = fcs.DeadReckoningFilter(
+        TOLERANCE_M, MIN_ALTITUDE_FT, MIN_HEADING_DEG, HEARTBEAT_SECS
+    )
+    monkeypatch.setattr(fcs, "_upload_filter", dr_filter)
+    monkeypatch.setattr(fcs, "_unwritten_positions", deque())
+    monkeypatch.setattr(fcs, "SUPPRESS_REPEATS", False)
+    monkeypatch.setattr(fcs, "_position_spool", None)
+    monkeypatch.setattr(fcs, "_shutdown_requested", False)
+    return dr_filter
+
+
+def on_track(now: float, *icao_hexes) -> list:
+    """Each aircraft where its first position, dead-reckoned, puts it at now."""
+    lat, lon = fcs.dead_reckon(fcs.LastPosition(NOW, LAT, LON, 1200, 45.0, 90.0), now)
+    return build(now, *(heli(icao_hex, lat, lon) for icao_hex in icao_hexes))
+
+
+def test_position_dropped_by_writer_is_not_predicted_from(upload_filter):
+    writer = fcs.MongoWriter(maxsize=1, policy="drop_newest", threads=1)
+    uploaded = fcs.filter_positions(on_track(NOW, "a00001", "a00002"))
+    assert icaos(uploaded) == ["a00001", "a00002"]
+    # a00002 does not fit in the queue
+    assert writer.put_many(uploaded) == 1
+
+    uploaded = fcs.filter_positions(on_track(NOW + 10, "a00001", "a00002"))
+    assert icaos(uploaded) == ["a00002"]
+    assert icaos(fcs.filter_positions(on_track(NOW + 20, "a00001", "a00002"))) == []
+
+
+def test_position_lost_by_failed_write_is_not_predicted_from(
+    monkeypatch, upload_filter
+):
+    statuses = {"a00001": 201, "a00002": 400, "a00003": 503}
+    monkeypatch.setattr(
+        fcs,
+        "mongo_https_insert",
+        lambda mydict, dbFlags: statuses[mydict["properties"]["icao"]],
+    )
+    uploaded = fcs.filter_positions(on_track(NOW, "a00001", "a00002", "a00003"))
+    # Rejected, and unavailable with no spool to keep it
+    assert fcs.mongo_https_insert_many(uploaded) == [201, None, None]
+
+    uploaded = fcs.filter_positions(on_track(NOW + 10, "a00001", "a00002", "a00003"))
+    assert icaos(uploaded) == ["a00002", "a00003"]
+
+
+def test_spooled_position_is_predicted_from(monkeypatch, tmp_path, upload_filter):
+    monkeypatch.setattr(
+        fcs, "_position_spool", fcs.PositionSpool(str(tmp_path), fsync_interval_secs=0)
+    )
+    monkeypatch.setattr(fcs, "mongo_https_insert", lambda mydict, dbFlags: 503)
+    uploaded = fcs.filter_positions(on_track(NOW, "a00001"))
+    assert fcs.mongo_https_insert_many(uploaded) == [None]
+
+    # Replay writes it later, so the next position is still predicted from it
+    assert fcs.filter_positions(on_track(NOW + 10, "a00001")) == []
@@ -0,0 +1,114 @@
+"""
+fetch_aircraft_url: conditional requests keep using the one pooled connection,
+and a snapshot's validators are only kept once its body has been decoded.
+"""
+
+import http.server
+import json
+import threading
+
+import pytest
+
+import fcs
+
+BODY = json.dumps(
+    {
+        "now": 1792192824.5,
+        "messages": 1,
+        "aircraft": [
+            {
+                "hex": "ac9f65",
+                "t": "EC45",
+                "category": "A7",
+                "lat": 38.9,
+                "lon": -77.0,
+                "alt_baro": 1200,
+                "seen_pos": 1.2,
+            }
+        ],
+    }
+).encode()
+
+
+@pytest.fixture
+def receiver():
+    connections = set()
+    # Body served with ETag "1"; a test may swap in a truncated one
+    served = [BODY]
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            connections.add(self.client_address)
+            if self.headers.get("If-None-Match") == '"1"':
+                self.send_response(304)
+                self.send_header("ETag", '"1"')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", '"1"')
+            self.send_header("Content-Length", str(len(served[0])))
+            self.end_headers()
+            self.wfile.write(served[0])
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    fcs.close_aircraft_session()
+    fcs._aircraft_etag = None
+    fcs._aircraft_last_modified = None
+    url = "http://127.0.0.1:%d/data/aircraft.json" % httpd.server_port
+    yield url, connections, served
+    fcs.close_aircraft_session()
+    fcs._aircraft_etag = None
+    fcs._aircraft_last_modified = None
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_not_modified_reuses_the_pooled_connection(receiver, stream):
+    url, connections, _ = receiver
+    statuses = []
+    for _ in range(3):
+        parser = fcs.StreamingAircraftParser() if stream else None
+        response = fcs.fetch_aircraft_url(url, parser=parser)
+        if response.status_code == 200:
+            fcs.remember_aircraft_validators(response)
+        statuses.append(response.status_code)
+    assert statuses == [200, 304, 304]
+    assert len(connections) == 1
+
+
+@pytest.mark.parametrize("mode", ["json", "stream"])
+def test_truncated_snapshot_is_fetched_again(receiver, monkeypatch, mode):
+    url, _, served = receiver
+    captured = []
+    monkeypatch.setattr(fcs, "AIRCRAFT_URL", url, raising=False)
+    monkeypatch.setattr(fcs, "INGEST_MODE", mode)
+    monkeypatch.setattr(
+        fcs,
+        "mongo_insert_many",
+        lambda docs: captured.extend(docs) or docs,
+        raising=False,
+    )
+    monkeypatch.setattr(fcs, "_last_processed_now", None)
+    fcs.reset_position_filters()
+
+    # The receiver's write is cut short, but the response still carries its ETag
+    served[0] = BODY[: len(BODY) // 2]
+    assert isinstance(fcs.fcs_update_helidb(15), ValueError)
+    assert fcs._aircraft_etag is None
+
+    served[0] = BODY
+    fcs.fcs_update_helidb(15)
+    assert [doc[0]["properties"]["icao"] for doc in captured] == ["ac9f65"]
+    assert fcs._aircraft_etag == '"1"'
+
+    # Decoded now, so the next poll is a 304
+    fcs.fcs_update_helidb(15)
+    assert len(captured) == 1
@@ -0,0 +1,61 @@
+"""
+--readlocalfiles: a snapshot is skipped on an unchanged mtime only once it has
+been decoded.
+"""
+
+import json
+import os
+
+import fcs
+
+SNAPSHOT = {
+    "now": 1792192824.5,
+    "messages": 1,
+    "aircraft": [
+        {
+            "hex": "ac9f65",
+            "t": "EC45",
+            "category": "A7",
+            "lat": 38.9,
+            "lon": -77.0,
+            "alt_baro": 1200,
+            "seen_pos": 1.2,
+            "type": "adsb_icao",
+        }
+    ],
+}
+
+
+def test_half_written_file_is_read_again_at_same_mtime(tmp_path, monkeypatch):
+    path = str(tmp_path / "aircraft.json")
+    captured = []
+    monkeypatch.setattr(fcs, "AIRCRAFT_URL", None, raising=False)
+    monkeypatch.setattr(fcs, "INGEST_MODE", "json")
+    monkeypatch.setattr(fcs, "find_local_aircraft_file", lambda: path)
+    monkeypatch.setattr(
+        fcs,
+        "mongo_insert_many",
+        lambda docs: captured.extend(docs) or docs,
+        raising=False,
+    )
+    monkeypatch.setattr(fcs, "_last_processed_now", None)
+    fcs._aircraft_file_mtimes.clear()
+    fcs.reset_position_filters()
+
+    body = json.dumps(SNAPSHOT).encode()
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(body[: len(body) // 2])
+    os.utime(path, ns=(1792192824500000000, 1792192824500000000))
+    fcs.fcs_update_helidb(15)
+    assert captured == []
+
+    # The receiver finishes the write within the same mtime tick
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(body)
+    os.utime(path, ns=(1792192824500000000, 1792192824500000000))
+    fcs.fcs_update_helidb(15)
+    assert [doc[0]["properties"]["icao"] for doc in captured] == ["ac9f65"]
+
+    # Decoded now, so the same mtime is skipped
+    fcs.fcs_update_helidb(15)
+    assert len(captured) == 1
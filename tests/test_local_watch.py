@@ -0,0 +1,100 @@
+"""
+--readlocalfiles: a failed inotify watch is retried with backoff instead of
+falling back to fixed sleeps for good.
+"""
+
+import pytest
+
+import fcs
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class Watcher:
+    """Stands in for AircraftFileWatcher; fails while failures is positive."""
+
+    failures = 0
+    created = 0
+
+    def __init__(self, directory, filename):
+        if Watcher.failures > 0:
+            Watcher.failures -= 1
+            raise OSError(28, "No space left on device", directory)
+        Watcher.created += 1
+        self.directory = directory
+        self.gone = False
+
+    def wait(self, timeout):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fcs, "time", clock.time)
+    monkeypatch.setattr(fcs, "sleep", clock.sleep)
+    monkeypatch.setattr(fcs, "AircraftFileWatcher", Watcher)
+    monkeypatch.setattr(fcs, "load_inotify", lambda: object())
+    monkeypatch.setattr(fcs, "LOCAL_WATCH", True)
+    monkeypatch.setattr(fcs, "_active_airplanes_folder", "readsb")
+    monkeypatch.setattr(fcs, "_aircraft_watcher", None)
+    monkeypatch.setattr(fcs, "_aircraft_watch_retry_at", 0.0)
+    monkeypatch.setattr(fcs, "_aircraft_watch_backoff", fcs.LOCAL_WATCH_RETRY_SECS)
+    Watcher.failures = 0
+    Watcher.created = 0
+    yield clock
+    fcs.close_aircraft_watcher()
+
+
+def test_failed_watch_is_retried_with_backoff(clock):
+    Watcher.failures = 2
+    delays = []
+    for _ in range(300):
+        attempted_at = clock.now
+        retry_at = fcs._aircraft_watch_retry_at
+        fcs.wait_for_local_snapshot(15)
+        if fcs._aircraft_watch_retry_at != retry_at:
+            delays.append(fcs._aircraft_watch_retry_at - attempted_at)
+        if fcs._aircraft_watcher is not None:
+            break
+
+    assert Watcher.created == 1
+    assert fcs.LOCAL_WATCH
+    # Fixed sleeps in between; the second retry waits twice as long
+    assert delays == [60, 120]
+    assert fcs._aircraft_watch_backoff == fcs.LOCAL_WATCH_RETRY_SECS
+    slept = len(clock.slept)
+    fcs.wait_for_local_snapshot(15)
+    assert len(clock.slept) == slept
+
+
+def test_backoff_is_capped(clock):
+    Watcher.failures = 100
+    for _ in range(2000):
+        fcs.wait_for_local_snapshot(60)
+    assert fcs._aircraft_watch_backoff == fcs.LOCAL_WATCH_RETRY_MAX_SECS
+    assert fcs._aircraft_watcher is None
+    assert fcs.LOCAL_WATCH
+
+
+def test_no_inotify_falls_back_for_good(clock, monkeypatch, caplog):
+    monkeypatch.setattr(fcs, "load_inotify", lambda: None)
+    fcs.wait_for_local_snapshot(15)
+    fcs.wait_for_local_snapshot(15)
+    assert not fcs.LOCAL_WATCH
+    assert clock.slept == [15, 15]
+    assert "rest of the run" in caplog.text
@@ -0,0 +1,66 @@
+"""
+RepeatFilter: an aircraft whose position stopped updating is uploaded once, however
+its millisecond now and seen_pos subtract as floats from cycle to cycle.
+"""
+
+import fcs
+
+INTERVAL = 15
+NOW_MS = 1792192824517
+NOW = NOW_MS / 1000
+
+
+def heli(icao_hex: str, seen_pos: float, lat: float = 38.8977) -> dict:
+    return {
+        "hex": icao_hex,
+        "t": sorted(fcs.ROTORCRAFT_TYPES)[0],
+        "category": "A7",
+        "alt_baro": 1200,
+        "gs": 80.5,
+        "track": 271.3,
+        "lat": lat,
+        "lon": -77.0365,
+        "seen_pos": seen_pos,
+    }
+
+
+def cycle(repeat_filter, now: float, planes: list) -> list:
+    context = fcs.SnapshotContext(now)
+    docs = [fcs.build_heli_document(plane, context, INTERVAL) for plane in planes]
+    return [
+        mydict["properties"]["icao"]
+        for mydict, _ in repeat_filter.filter([doc for doc in docs if doc])
+    ]
+
+
+def test_stale_aircraft_uploaded_once():
+    repeat_filter = fcs.RepeatFilter()
+    uploaded = []
+    dates = set()
+    for step in range(12):
+        # readsb derives both from millisecond clocks: now, and now - last position
+        now_ms = NOW_MS + 2000 + step * 1013
+        seen_pos = (now_ms - NOW_MS) / 1000
+        planes = [
+            heli("a00001", seen_pos),
+            heli("a00002", 0.1, lat=38.8977 + step * 0.001),
+        ]
+        dates.add(now_ms / 1000 - seen_pos)
+        uploaded.extend(cycle(repeat_filter, now_ms / 1000, planes))
+
+    # The float dates differ, or this test would not exercise the rounding
+    assert len(dates) > 1
+    assert uploaded.count("a00001") == 1
+    assert uploaded.count("a00002") == 12
+
+
+def test_prune_forgets_old_positions():
+    repeat_filter = fcs.RepeatFilter()
+    assert cycle(repeat_filter, NOW, [heli("a00001", 2.0)]) == ["a00001"]
+    assert len(repeat_filter) == 1
+
+    repeat_filter.prune(NOW - 2.0)
+    assert len(repeat_filter) == 1
+    repeat_filter.prune(NOW - 2.0 + 0.001)
+    assert len(repeat_filter) == 0
+    assert cycle(repeat_filter, NOW, [heli("a00001", 2.0)]) == ["a00001"]
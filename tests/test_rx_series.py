@@ -0,0 +1,104 @@
+"""
+RX_METRICS=bounded: the fcs_rx (icao, cs) series limit, "other" bucket, idle
+expiry and top-K selection, and what reaches the OTel mirror.
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+
+import fcs
+
+
+class RecordingCounter:
+    """Stands in for an OTel counter and keeps every add()."""
+
+    def __init__(self):
+        self.adds = []
+
+    def add(self, amount, attributes):
+        self.adds.append((amount, attributes))
+
+
+@pytest.fixture
+def bounded(monkeypatch):
+    tracker = fcs.RxSeriesTracker(limit=3, top_k=1, ttl=60)
+    monkeypatch.setattr(fcs, "_rx_series", tracker)
+    fcs._cycle_rx_counts.clear()
+    yield tracker
+    fcs._cycle_rx_counts.clear()
+
+
+def rx_value(icao_hex: str, callsign: str):
+    return REGISTRY.get_sample_value(
+        "fcs_rx_msgs_total", {"icao": icao_hex, "cs": callsign, "feeder_id": "test"}
+    )
+
+
+def test_pairs_past_the_limit_go_to_other():
+    tracker = fcs.RxSeriesTracker(limit=2, top_k=1, ttl=60)
+    assert tracker.labels_for("a00001", "ONE", 0.0) == ("a00001", "ONE")
+    assert tracker.labels_for("a00002", "TWO", 0.0) == ("a00002", "TWO")
+    assert tracker.labels_for("a00003", "THREE", 0.0) == fcs.RX_OTHER_LABELS
+    # A known pair keeps its own series at the limit
+    assert tracker.labels_for("a00001", "ONE", 1.0) == ("a00001", "ONE")
+    assert tracker.cardinality() == 3
+
+
+def test_unbounded_tracker_never_uses_other():
+    tracker = fcs.RxSeriesTracker()
+    for n in range(50):
+        assert tracker.labels_for("%06x" % n, "", 0.0) == ("%06x" % n, "")
+    assert tracker.prune(1e9) == []
+    assert tracker.cardinality() == 50
+
+
+def test_prune_expires_idle_pairs():
+    tracker = fcs.RxSeriesTracker(limit=10, top_k=5, ttl=60)
+    tracker.labels_for("a00001", "ONE", 0.0)
+    tracker.labels_for("a00002", "TWO", 50.0)
+    assert tracker.prune(100.0) == [("a00001", "ONE")]
+    assert tracker.prune(100.0) == []
+    assert tracker.cardinality() == 1
+
+
+def test_prune_keeps_top_k_at_the_limit():
+    tracker = fcs.RxSeriesTracker(limit=3, top_k=1, ttl=3600)
+    for icao_hex, sightings in (("a00001", 1), ("a00002", 5), ("a00003", 2)):
+        for _ in range(sightings):
+            tracker.labels_for(icao_hex, "", 0.0)
+    assert sorted(tracker.prune(1.0)) == [("a00001", ""), ("a00003", "")]
+    # Room again for new pairs
+    assert tracker.labels_for("a00004", "", 2.0) == ("a00004", "")
+    assert tracker.cardinality() == 2
+
+
+def test_expire_removes_series_from_the_registry(bounded):
+    fcs.count_rx("b00001", "ONE", 0.0)
+    fcs.count_rx("b00002", "TWO", 30.0)
+    fcs.flush_cycle_metrics()
+    assert rx_value("b00001", "ONE") == 1
+    assert rx_value("b00002", "TWO") == 1
+
+    fcs.expire_rx_series(70.0)
+    assert rx_value("b00001", "ONE") is None
+    assert rx_value("b00002", "TWO") == 1
+    assert REGISTRY.get_sample_value("fcs_rx_series", {"feeder_id": "test"}) == 1
+
+
+def test_bounded_otel_mirror_is_per_feeder(bounded, monkeypatch):
+    otel_rx = RecordingCounter()
+    monkeypatch.setattr(fcs, "_otel_fcs_rx", otel_rx)
+    for n in range(5):
+        fcs.count_rx("c0000%d" % n, "", 0.0)
+    fcs.count_rx("c00000", "", 0.0)
+    fcs.flush_cycle_metrics()
+    assert otel_rx.adds == [(6, {"feeder_id": "test"})]
+
+
+def test_full_otel_mirror_is_per_aircraft(monkeypatch):
+    otel_rx = RecordingCounter()
+    monkeypatch.setattr(fcs, "_otel_fcs_rx", otel_rx)
+    monkeypatch.setattr(fcs, "_rx_series", fcs.RxSeriesTracker())
+    fcs.count_rx("d00001", "ONE", 0.0)
+    fcs.flush_cycle_metrics()
+    assert otel_rx.adds == [(1, {"icao": "d00001", "cs": "ONE", "feeder_id": "test"})]
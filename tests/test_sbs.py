@@ -0,0 +1,131 @@
+"""
+SbsFeed: a short MSG stream in readsb's SBS output format, served from a
+localhost socket into run_for, covering field folding, min_spacing, reconnects
+and connect backoff.
+
+tests/fixtures/sbs/stream.sbs ends mid-line, as a feed cut off by the server does.
+"""
+
+import os
+import socket
+import threading
+
+import pytest
+
+import fcs
+from conftest import FIXTURES
+
+with open(os.path.join(FIXTURES, "sbs", "stream.sbs"), "rb") as stream_file:
+    STREAM = stream_file.read()
+
+BILLS = {
+    "ac9f65": {"hex": "ac9f65", "type": "EC45", "tail": "N911LF"},
+    "a4c3d1": {"hex": "a4c3d1", "type": "R44", "tail": "N44RH"},
+}
+
+
+class StreamServer:
+    """Sends STREAM to every connection, then closes it."""
+
+    def __init__(self):
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.connections = 0
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn:
+                conn.sendall(STREAM)
+
+    def close(self):
+        self.listener.close()
+
+
+@pytest.fixture
+def sbs(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(fcs, "heli_types", dict(BILLS))
+    fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+    monkeypatch.setattr(fcs, "_mongo_writer", None)
+    monkeypatch.setattr(
+        fcs,
+        "mongo_insert_many",
+        lambda docs: submitted.extend(docs) or docs,
+        raising=False,
+    )
+    fcs.reset_position_filters()
+    fcs.recent_flights.clear()
+    server = StreamServer()
+    yield server, submitted
+    server.close()
+    fcs.rebuild_rotorcraft_classifier({})
+
+
+def properties(submitted) -> list:
+    return [mydict["properties"] for mydict, _ in submitted]
+
+
+def test_stream_emits_bills_rotorcraft_once_per_spacing(sbs):
+    server, submitted = sbs
+    feed = fcs.SbsFeed("127.0.0.1", server.port, min_spacing=5)
+    feed.run_for(0.5, 15)
+    feed.close()
+
+    docs = properties(submitted)
+    assert [doc["icao"] for doc in docs] == ["ac9f65", "a4c3d1"]
+    heli, on_ground = docs
+    assert heli["type"] == "EC45"
+    assert heli["call"] == "N911LF"
+    assert heli["altitude_baro"] == 1200
+    assert submitted[0][0]["geometry"]["coordinates"] == [-77.03651, 38.89762]
+    assert on_ground["altitude_baro"] is None
+    assert on_ground["type"] == "R44"
+
+
+def test_every_position_without_spacing(sbs):
+    server, submitted = sbs
+    feed = fcs.SbsFeed("127.0.0.1", server.port, min_spacing=0)
+    feed.run_for(0.5, 15)
+    feed.close()
+
+    docs = [doc for doc in properties(submitted) if doc["icao"] == "ac9f65"]
+    assert [doc["altitude_baro"] for doc in docs] == [1200, 1225, 1250]
+    # MSG 4 and 6 fields carry over to later positions
+    assert docs[0]["groundspeed"] is None
+    assert docs[1]["groundspeed"] == 112.4
+    assert docs[1]["heading"] == 87.6
+    assert docs[1]["squawk"] == "1200"
+    # The partial last line was never folded in
+    assert len(docs) == 3
+
+
+def test_reconnects_after_peer_closes_and_keeps_spacing(sbs):
+    server, submitted = sbs
+    feed = fcs.SbsFeed("127.0.0.1", server.port, min_spacing=5)
+    feed.run_for(2.5, 15)
+    feed.close()
+
+    assert server.connections >= 2
+    # The replayed stream arrived within min_spacing of the first emit
+    assert [doc["icao"] for doc in properties(submitted)] == ["ac9f65", "a4c3d1"]
+
+
+def test_connect_failures_back_off_exponentially():
+    # A port nothing listens on
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    feed = fcs.SbsFeed("127.0.0.1", port)
+    feed.run_for(1.5, 15)
+    feed.close()
+
+    # Attempts at 0s and 1s; the next waits 4s
+    assert feed._backoff == 4
+    assert feed._sock is None
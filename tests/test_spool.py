@@ -0,0 +1,238 @@
+"""
+PositionSpool: crash recovery, replay order, pausing on an unavailable sink and
+idempotent replay; HTTPS inserts only count 2xx as written.
+"""
+
+import os
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+import fcs
+
+
+def make_docs(count: int, first: int = 0) -> list:
+    return [
+        (
+            {
+                "_id": ObjectId(),
+                "type": "Feature",
+                "properties": {
+                    "icao": "a%05d" % index,
+                    "date": 1792192824.5 + index,
+                    "jsDate": datetime.fromtimestamp(
+                        1792192824.5 + index, tz=timezone.utc
+                    ),
+                },
+            },
+            None,
+        )
+        for index in range(first, first + count)
+    ]
+
+
+def icaos(pairs) -> list:
+    return [mydict["properties"]["icao"] for mydict, _ in pairs]
+
+
+class RecordingSink:
+    """insert_many stand-in: writes everything, or answers INSERT_RETRY from retry_at."""
+
+    def __init__(self, retry_at=None):
+        self.written = []
+        self.retry_at = retry_at
+
+    def __call__(self, pairs):
+        results = []
+        for pair in pairs:
+            if self.retry_at is not None and len(self.written) >= self.retry_at:
+                results.append(fcs.INSERT_RETRY)
+            else:
+                self.written.append(pair)
+                results.append(pair[0]["_id"])
+        return results
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = fcs.PositionSpool(
+        str(tmp_path), segment_bytes=600, fsync_interval_secs=0, replay_batch_size=4
+    )
+    spool.open()
+    yield spool
+    spool.close()
+
+
+def test_replay_keeps_order_across_segments(spool):
+    docs = make_docs(10)
+    spool.append(docs[:6])
+    spool.append(docs[6:])
+    assert len(spool._sealed_segments()) > 1
+
+    sink = RecordingSink()
+    assert spool.replay(sink) == 10
+    assert icaos(sink.written) == icaos(docs)
+    assert spool.backlog() == (0, 0)
+    # _id and timezone-aware datetimes survive the round trip
+    assert [mydict["_id"] for mydict, _ in sink.written] == [
+        mydict["_id"] for mydict, _ in docs
+    ]
+    assert (
+        sink.written[0][0]["properties"]["jsDate"] == docs[0][0]["properties"]["jsDate"]
+    )
+
+
+def test_crash_recovery_trims_partial_record(tmp_path):
+    spool = fcs.PositionSpool(str(tmp_path), fsync_interval_secs=0)
+    spool.open()
+    docs = make_docs(3)
+    spool.append(docs)
+    # Simulate a crash mid-append: no close(), half a record at the end
+    spool._active.write(b'{"doc": {"properties": {"ic')
+    spool._active.flush()
+    open_segments = [name for name in os.listdir(tmp_path) if name.endswith(".open")]
+    assert len(open_segments) == 1
+
+    recovered = fcs.PositionSpool(str(tmp_path), fsync_interval_secs=0)
+    recovered.open()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".open")]
+    assert recovered.backlog()[0] == 3
+
+    sink = RecordingSink()
+    assert recovered.replay(sink) == 3
+    assert icaos(sink.written) == icaos(docs)
+    recovered.close()
+
+
+def test_replay_resumes_after_restart_from_cursor(tmp_path):
+    spool = fcs.PositionSpool(str(tmp_path), fsync_interval_secs=0, replay_batch_size=2)
+    spool.open()
+    docs = make_docs(5)
+    spool.append(docs)
+
+    first = RecordingSink(retry_at=3)
+    assert spool.replay(first) == 3
+    spool.close()
+
+    restarted = fcs.PositionSpool(str(tmp_path), fsync_interval_secs=0)
+    restarted.open()
+    assert restarted.backlog()[0] == 2
+    second = RecordingSink()
+    assert restarted.replay(second) == 2
+    assert icaos(first.written + second.written) == icaos(docs)
+    restarted.close()
+
+
+def test_replay_pauses_at_first_retry_and_keeps_the_rest(spool):
+    docs = make_docs(4)
+    spool.append(docs)
+
+    sink = RecordingSink(retry_at=1)
+    assert spool.replay(sink) == 1
+    assert spool.backlog()[0] == 3
+
+    sink.retry_at = None
+    assert spool.replay(sink) == 3
+    assert icaos(sink.written) == icaos(docs)
+    assert spool.backlog() == (0, 0)
+
+
+def test_replay_survives_segment_discarded_mid_batch(spool):
+    spool.append(make_docs(3))
+
+    def discard_then_write(pairs):
+        # The caps drop the segment while its batch is being inserted
+        with spool._lock:
+            spool._max_bytes = 0
+            spool._enforce_caps()
+        return [mydict["_id"] for mydict, _ in pairs]
+
+    assert spool.replay(discard_then_write) == 3
+    assert spool.backlog() == (0, 0)
+    assert spool._sealed_segments() == []
+
+
+def test_https_insert_counts_only_2xx_and_spools_unavailable(monkeypatch, spool):
+    statuses = {"a00000": 201, "a00001": 503, "a00002": 400, "a00003": 429}
+    monkeypatch.setattr(
+        fcs,
+        "mongo_https_insert",
+        lambda mydict, dbFlags: statuses[mydict["properties"]["icao"]],
+    )
+    monkeypatch.setattr(fcs, "_position_spool", spool)
+    docs = make_docs(4)
+
+    assert fcs.mongo_https_insert_many(docs) == [201, None, None, None]
+    assert spool.backlog()[0] == 2
+    sink = RecordingSink()
+    spool.replay(sink)
+    assert icaos(sink.written) == ["a00001", "a00003"]
+
+
+def test_https_replay_stops_posting_when_unavailable(monkeypatch):
+    posted = []
+
+    def unavailable(mydict, dbFlags):
+        posted.append(mydict["properties"]["icao"])
+        return 503
+
+    monkeypatch.setattr(fcs, "mongo_https_insert", unavailable)
+    results = fcs.mongo_https_insert_many(make_docs(3), spool_on_failure=False)
+    assert results == [fcs.INSERT_RETRY] * 3
+    assert posted == ["a00000"]
+
+
+def test_client_replay_of_already_written_document_is_not_a_copy(monkeypatch):
+    from pymongo.errors import BulkWriteError
+
+    docs = make_docs(2)
+    written_before = docs[0][0]["_id"]
+
+    class Collection:
+        def insert_many(self, batch, ordered):
+            raise BulkWriteError(
+                {
+                    "writeErrors": [
+                        {"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}
+                    ]
+                }
+            )
+
+    class Client(dict):
+        def __getitem__(self, name):
+            return {"ADSB": Collection()}
+
+    monkeypatch.setattr(fcs, "build_mongo_uri", lambda: "mongodb://test")
+    monkeypatch.setattr(fcs, "get_mongo_client", lambda uri, app_name: Client())
+    results = fcs.mongo_client_insert_many(docs, spool_on_failure=False)
+    assert results == [written_before, docs[1][0]["_id"]]
+
+
+@pytest.mark.parametrize("failure", ["operation", "unexpected", "unacknowledged"])
+def test_client_replay_keeps_a_batch_that_failed_as_a_whole(monkeypatch, failure):
+    from pymongo.errors import OperationFailure
+
+    class Result:
+        acknowledged = False
+
+    class Collection:
+        def insert_many(self, batch, ordered):
+            if failure == "operation":
+                raise OperationFailure("not primary", code=10107)
+            if failure == "unexpected":
+                raise RuntimeError("pool closed")
+            return Result()
+
+    class Client(dict):
+        def __getitem__(self, name):
+            return {"ADSB": Collection()}
+
+    monkeypatch.setattr(fcs, "build_mongo_uri", lambda: "mongodb://test")
+    monkeypatch.setattr(fcs, "get_mongo_client", lambda uri, app_name: Client())
+    results = fcs.mongo_client_insert_many(make_docs(2), spool_on_failure=False)
+    assert results == [fcs.INSERT_RETRY] * 2
+
+    # Live inserts keep logging and counting these as before
+    results = fcs.mongo_client_insert_many(make_docs(2), spool_on_failure=True)
+    assert results == [None, None]
@@ -0,0 +1,139 @@
+"""
+A poll cycle runs before init_prometheus() has created the metrics, as --once
+does. conftest creates them for every other test, so each run here gets a fresh
+interpreter.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+PRELUDE = """
+import logging
+import fcs
+
+fcs.FEEDER_ID = "test"
+fcs.heli_types = {}
+fcs.rebuild_rotorcraft_classifier(fcs.heli_types)
+fcs.logger.setLevel(logging.CRITICAL)
+fcs.AIRCRAFT_URL = None
+fcs.INGEST_MODE = "json"
+fcs.recent_flights = fcs.RecentFlights(100, 3600)
+fcs.mongo_insert_many = lambda docs: docs
+assert fcs.fcs_cycle_stage is None
+"""
+
+
+def run_cycle(script: str) -> str:
+    """Run PRELUDE then script in a new interpreter and return its stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", PRELUDE + script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_cycle_without_aircraft_data():
+    script = """
+fcs.find_local_aircraft_file = lambda: None
+print(fcs.fcs_update_helidb(15))
+"""
+    assert run_cycle(script).split() == ["None"]
+
+
+SERVE = """
+import http.server
+import json
+import threading
+
+BODY = json.dumps(
+    {
+        "now": 1792192824.5,
+        "messages": 1,
+        "aircraft": [
+            {
+                "hex": "ac9f65",
+                "t": "EC45",
+                "category": "A7",
+                "lat": 38.9,
+                "lon": -77.0,
+                "alt_baro": 1200,
+                "seen_pos": 1.2,
+            }
+        ],
+    }
+).encode()
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=httpd.serve_forever, daemon=True).start()
+url = "http://127.0.0.1:%d/data/aircraft.json" % httpd.server_port
+"""
+
+
+def test_fetch_without_metrics():
+    script = SERVE + """
+print(fcs.fetch_aircraft_url(url).status_code)
+parser = fcs.StreamingAircraftParser()
+print(fcs.fetch_aircraft_url(url, parser=parser).status_code, parser.scanned)
+"""
+    assert run_cycle(script).split() == ["200", "200", "1"]
+
+
+def test_recent_flights_without_metrics():
+    script = """
+flights = fcs.RecentFlights(1, 60)
+flights.touch("ac9f65", "TEST1", 1000.0)
+flights.touch("a00001", "TEST2", 1001.0)
+print(len(flights), flights.expire(1100.0), len(flights))
+"""
+    assert run_cycle(script).split() == ["1", "1", "0"]
+
+
+def test_rx_series_without_metrics():
+    script = """
+fcs._rx_series = fcs.RxSeriesTracker(10, 5, 60)
+fcs._rx_series.labels_for("ac9f65", "TEST1", 1000.0)
+fcs.expire_rx_series(1010.0)
+print(fcs._rx_series.cardinality())
+"""
+    assert run_cycle(script).split() == ["1"]
+
+
+def test_full_cycle_without_metrics(tmp_path):
+    script = SERVE + """
+inserted = []
+fcs.mongo_insert_many = lambda docs: inserted.extend(docs) or docs
+fcs.AIRCRAFT_URL = url
+for mode in ("json", "stream"):
+    fcs.INGEST_MODE = mode
+    fcs._last_processed_now = None
+    fcs.reset_position_filters()
+    print(fcs.fcs_update_helidb(15))
+fcs.AIRCRAFT_URL = None
+fcs.find_local_aircraft_file = lambda: %r
+with open(%r, "wb") as snapshot_file:
+    snapshot_file.write(BODY)
+fcs._last_processed_now = None
+fcs.reset_position_filters()
+print(fcs.fcs_update_helidb(15), fcs.fcs_update_helidb(15))
+print(len(inserted))
+""" % ((str(tmp_path / "aircraft.json"),) * 2)
+    assert run_cycle(script).split() == ["None", "None", "None", "None", "3"]
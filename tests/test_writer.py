@@ -0,0 +1,127 @@
+"""
+MongoWriter: overflow policies, draining on stop, the shutdown timeout, and a
+SIGTERM that leaves the shutdown to the main loop.
+"""
+
+import os
+import signal
+import threading
+from time import perf_counter, sleep
+
+import pytest
+
+import fcs
+
+
+def docs(count: int, start: int = 0) -> list:
+    return [({"n": n}, None) for n in range(start, start + count)]
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    """Documents written by the writer threads, in insert order."""
+    written = []
+    monkeypatch.setattr(
+        fcs,
+        "mongo_insert_many",
+        lambda batch: written.extend(mydict["n"] for mydict, _ in batch) or batch,
+        raising=False,
+    )
+    monkeypatch.setattr(fcs, "_shutdown_requested", False)
+    return written
+
+
+def queued(writer) -> list:
+    return [mydict["n"] for mydict, _, _ in writer._queue]
+
+
+def test_drop_newest_keeps_the_queued_documents(inserted):
+    writer = fcs.MongoWriter(maxsize=3, policy="drop_newest", threads=1)
+    assert writer.put_many(docs(5)) == 3
+    assert queued(writer) == [0, 1, 2]
+
+
+def test_drop_oldest_makes_room_for_new_documents(inserted):
+    writer = fcs.MongoWriter(maxsize=3, policy="drop_oldest", threads=1)
+    assert writer.put_many(docs(5)) == 5
+    assert queued(writer) == [2, 3, 4]
+
+
+def test_block_waits_for_the_writer(inserted, monkeypatch):
+    def slow_insert(batch):
+        sleep(0.02)
+        inserted.extend(mydict["n"] for mydict, _ in batch)
+        return batch
+
+    monkeypatch.setattr(fcs, "mongo_insert_many", slow_insert, raising=False)
+    writer = fcs.MongoWriter(maxsize=2, policy="block", threads=1, batch_size=1)
+    writer.start()
+    assert writer.put_many(docs(8)) == 8
+    assert writer.depth() <= 2
+    writer.stop(timeout=5)
+    assert inserted == list(range(8))
+
+
+def test_stop_drains_the_queue(inserted):
+    writer = fcs.MongoWriter(maxsize=100, policy="drop_oldest", threads=2)
+    writer.start()
+    assert writer.put_many(docs(50)) == 50
+    writer.stop(timeout=5)
+    assert sorted(inserted) == list(range(50))
+    assert writer.depth() == 0
+    # Stopped: nothing more is accepted
+    assert writer.put_many(docs(1, 50)) == 0
+
+
+def test_stop_gives_up_after_the_timeout(inserted, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(
+        fcs, "mongo_insert_many", lambda batch: release.wait(10), raising=False
+    )
+    writer = fcs.MongoWriter(maxsize=10, policy="drop_oldest", threads=1, batch_size=1)
+    writer.start()
+    writer.put_many(docs(3))
+    start = perf_counter()
+    writer.stop(timeout=0.2)
+    assert perf_counter() - start < 2
+    assert writer.depth() > 0
+    release.set()
+
+
+def test_sigterm_while_holding_the_writer_lock_only_sets_the_flag(inserted):
+    writer = fcs.MongoWriter(maxsize=10, policy="block", threads=1)
+    with writer._cond:
+        # The old handler called writer.stop() here and deadlocked
+        fcs.handle_sigterm(signal.SIGTERM, None)
+    assert fcs._shutdown_requested
+
+
+def test_sigterm_ends_a_blocked_put(inserted, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(
+        fcs, "mongo_insert_many", lambda batch: release.wait(10), raising=False
+    )
+    writer = fcs.MongoWriter(maxsize=1, policy="block", threads=1, batch_size=1)
+    writer.start()
+    threading.Timer(0.2, fcs.handle_sigterm, (signal.SIGTERM, None)).start()
+    # The writer is stuck: only the shutdown request lets put_many return
+    assert writer.put_many(docs(4)) == 4
+    release.set()
+    writer.stop(timeout=5)
+
+
+def test_sigterm_interrupts_an_idle_wait(inserted):
+    previous = signal.signal(signal.SIGTERM, fcs.handle_sigterm)
+    try:
+        threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+        start = perf_counter()
+        fcs.idle(sleep, 10)
+        assert perf_counter() - start < 5
+        assert fcs._shutdown_requested
+        assert not fcs._shutdown_interruptible
+        # Already requested: the next wait returns at once
+        start = perf_counter()
+        fcs.idle(sleep, 10)
+        assert perf_counter() - start < 1
+    finally:
+        signal.signal(signal.SIGTERM, previous)